@@ -1,15 +1,9 @@
 """
 Flask application factory
 """
-import logging
 from flask import Flask
 from flask_cors import CORS
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 
 def create_app():
     """Create and configure Flask application"""
@@ -22,14 +16,17 @@ def create_app():
     # Enable CORS
     CORS(app)
 
+    # Prometheus /metrics (request latency per route)
+    from app.services import metrics
+    metrics.init_app(app)
+
     # Register blueprints
     from app.routes import dashboard, api
     app.register_blueprint(dashboard.bp)
     app.register_blueprint(api.bp, url_prefix='/api')
 
-    # Initialize database
-    from app.services.scraper_service import TwitterScraperService
-    scraper = TwitterScraperService()
-    scraper.init_database()
+    # Create or migrate the schema (once per process)
+    from app.storage import get_storage
+    get_storage().ensure_schema()
 
     return app
@@ -1,18 +1,123 @@
 """
-API endpoints for async scraping operations
+API endpoints for async scraping operations and reading tweets
 """
+import json
+import gzip
+import base64
+import hashlib
 import logging
-from flask import Blueprint, jsonify, request
-from celery.result import AsyncResult
-from celery_app.celery_config import celery_app
-from celery_app.tasks import scrape_profile_task, health_check
-from app.services.driver_pool import get_driver_pool
+from datetime import datetime, timezone
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from redis.exceptions import RedisError
+from celery_app.client import scrape_profile_task, async_result
+from app.services import cluster_status, pool_stats, export, changes, cache
+from app.storage import get_storage
+from config.settings import (
+    CLUSTER_STATUS_INTERVAL, CHANGES_PAGE_SIZE, CHANGES_MAX_PAGE_SIZE,
+    API_PAGE_SIZE, API_MAX_PAGE_SIZE, API_GZIP_MIN_BYTES
+)
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('api', __name__)
 
 
+def _profiles_arg():
+    """Usernames from repeated and/or comma-separated ?profile= parameters"""
+    return [
+        username.strip().replace('@', '')
+        for value in request.args.getlist('profile')
+        for username in value.split(',') if username.strip()
+    ]
+
+
+def _page_args():
+    """
+    limit, keyset position and field projection of a tweets page.
+
+    Raises:
+        ValueError: bad limit, page token or field name
+    """
+    limit = max(min(int(request.args.get('limit', API_PAGE_SIZE)), API_MAX_PAGE_SIZE), 1)
+
+    after = None
+    token = request.args.get('after')
+    if token:
+        try:
+            value, tweet_id = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            after = (value, int(tweet_id))
+        except (ValueError, TypeError):
+            raise ValueError('Invalid page token')
+
+    fields = None
+    if request.args.get('fields'):
+        fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+        unknown = [field for field in fields if field not in export.EXPORT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    return limit, after, fields
+
+
+def _page(rows, limit, sort, fields):
+    """Page body: rows projected to fields, next token if there are more"""
+    next_token = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        position = [last['likes'] if sort == 'likes' else last['scraped_date'], last['tweet_id']]
+        next_token = base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii').rstrip('=')
+
+    if fields:
+        rows = [{field: row[field] for field in fields} for row in rows]
+    return {'tweets': rows, 'count': len(rows), 'next': next_token}
+
+
+def _etag(*state):
+    """
+    Weak ETag of the request's representation (path and query) at a
+    given data state, so different pages or projections never share one.
+    """
+    key = json.dumps([request.path, sorted(request.args.items(multi=True)), state], default=str)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:24]
+
+
+def _http_date(value):
+    """Stored UTC timestamp as an aware datetime (second precision), None if unknown"""
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value)).replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified and request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def _conditional(response, etag, last_modified):
+    response.set_etag(etag, weak=True)  # weak: same for gzip and identity encodings
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True  # cache, but revalidate every time
+    return response
+
+
+def _json_response(payload, etag, last_modified):
+    """JSON body, gzipped when the client accepts it and it is worth it"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    response = Response(body, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+
+    if len(body) >= API_GZIP_MIN_BYTES and 'gzip' in request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+
+    return _conditional(response, etag, last_modified)
+
+
 @bp.route('/scrape', methods=['POST'])
 def scrape_profile():
     """
@@ -59,7 +164,7 @@ def get_task_status(task_id):
     Returns:
         {"status": "PENDING|PROGRESS|SUCCESS|FAILURE", "result": {...}}
     """
-    task = AsyncResult(task_id, app=celery_app)
+    task = async_result(task_id)
 
     if task.state == 'PENDING':
         response = {
@@ -71,7 +176,9 @@ def get_task_status(task_id):
             'status': 'progress',
             'current': task.info.get('current', 0),
             'total': task.info.get('total', 100),
-            'message': task.info.get('status', 'Processing...')
+            'message': task.info.get('status', 'Processing...'),
+            'phase': task.info.get('phase'),
+            'tweets': task.info.get('tweets')
         }
     elif task.state == 'SUCCESS':
         response = {
@@ -92,19 +199,197 @@ def get_task_status(task_id):
     return jsonify(response)
 
 
+@bp.route('/profiles/<username>/tweets', methods=['GET'])
+def get_profile_tweets(username):
+    """
+    Tweets of a profile, newest first, with keyset pagination.
+    ETag and Last-Modified follow the profile's last tweet change, so a
+    conditional request (If-None-Match / If-Modified-Since) gets a 304
+    without reading the tweets.
+
+    GET /api/profiles/elonmusk/tweets?limit=50&fields=tweet_id,text,likes&after=<next>
+
+    Returns:
+        {"username": "elonmusk", "tweets": [...], "count": 50, "next": "<token>" | null}
+    """
+    username = username.strip().replace('@', '')
+    storage = get_storage()
+
+    try:
+        limit, after, fields = _page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    validators = storage.profile_validators(username)
+    if validators is None:
+        return jsonify({'error': f'Unknown profile: {username}'}), 404
+
+    profile_id, change_seq, changed = validators
+    etag = _etag(profile_id, change_seq)
+    last_modified = _http_date(changed)
+    if _not_modified(etag, last_modified):
+        return _conditional(Response(status=304), etag, last_modified)
+
+    def page():
+        rows = storage.page_tweets(author=username, limit=limit + 1, after=after)
+        return dict(_page(rows, limit, 'date', fields), username=username)
+
+    # The ETag already covers the request and the data state
+    return _json_response(cache.get_or_set('api', (etag,), page), etag, last_modified)
+
+
+@bp.route('/search', methods=['GET'])
+def search_tweets():
+    """
+    Filtered tweets (same filters as /search), newest or most liked first,
+    with keyset pagination, field projection and conditional requests.
+
+    GET /api/search?q=python&author=elonmusk&lang=en&date_from=2025-01-01&date_to=2025-12-31&sort=likes&limit=100
+
+    Returns:
+        {"tweets": [...], "count": 100, "next": "<token>" | null}
+    """
+    args = request.args
+    sort = 'likes' if args.get('sort') == 'likes' else 'date'
+    author = args.get('author', '').strip().replace('@', '')
+    storage = get_storage()
+
+    try:
+        limit, after, fields = _page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # One profile's state is enough when filtering by author
+    validators = storage.profile_validators(author) if author else None
+    if validators is not None:
+        etag = _etag(*validators[:2])
+        last_modified = _http_date(validators[2])
+    else:
+        state = storage.search_validators()
+        etag = _etag(*state[:3])
+        last_modified = _http_date(state[3])
+
+    if _not_modified(etag, last_modified):
+        return _conditional(Response(status=304), etag, last_modified)
+
+    def page():
+        rows = storage.page_tweets(
+            args.get('q', '').strip(), author, args.get('lang', ''),
+            args.get('date_from', ''), args.get('date_to', ''), sort, limit + 1, after
+        )
+        return _page(rows, limit, sort, fields)
+
+    return _json_response(cache.get_or_set('api', (etag,), page), etag, last_modified)
+
+
+@bp.route('/export', methods=['GET'])
+def export_tweets():
+    """
+    Stream tweets as NDJSON, CSV or Parquet, read from storage in chunks.
+
+    GET /api/export?format=ndjson&compression=gzip&profile=elonmusk&date_from=2025-01-01&date_to=2025-12-31
+
+    Returns:
+        Download (tweets.ndjson.gz) sent with chunked transfer encoding
+    """
+    fmt = request.args.get('format', 'ndjson')
+    compression = request.args.get('compression') or None
+    profiles = _profiles_arg()
+
+    try:
+        blocks = export.stream_export(
+            fmt, compression, profiles,
+            request.args.get('date_from', ''), request.args.get('date_to', '')
+        )
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    mimetype, filename = export.content_type(fmt, compression)
+    logger.info(f"Export started: {filename}, profiles={profiles or 'all'}")
+
+    return Response(
+        stream_with_context(blocks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@bp.route('/changes', methods=['GET'])
+def get_changes():
+    """
+    Tweets inserted or updated after a position, in change order.
+    Pass next_since as since to get the next page, or use a named consumer
+    and commit its position with PUT /api/cursors/<consumer> once processed.
+
+    GET /api/changes?since=0&limit=1000&profile=elonmusk
+    GET /api/changes?consumer=warehouse
+
+    Returns:
+        {"since": "0", "next_since": "1:1862...", "has_more": true, "changes": [...]}
+    """
+    consumer = request.args.get('consumer')
+    since = request.args.get('since')
+    if since is None and not consumer:
+        return jsonify({'error': 'Missing since or consumer'}), 400
+
+    try:
+        limit = min(int(request.args.get('limit', CHANGES_PAGE_SIZE)), CHANGES_MAX_PAGE_SIZE)
+        page = changes.pull(consumer, since, max(limit, 1), _profiles_arg())
+    except ValueError as e:
+        return jsonify({'error': f'Invalid since or limit: {e}'}), 400
+
+    return jsonify(page)
+
+
+@bp.route('/cursors', methods=['GET'])
+def list_cursors():
+    """
+    Change feed consumers.
+
+    GET /api/cursors
+
+    Returns:
+        {"cursors": [{"name": "warehouse", "position": "1042", "lag": 57, "updated_at": "..."}]}
+    """
+    return jsonify({'cursors': get_storage().list_cursors()})
+
+
+@bp.route('/cursors/<consumer>', methods=['PUT', 'DELETE'])
+def update_cursor(consumer):
+    """
+    Commit (PUT) or delete (DELETE) the position of a consumer.
+
+    PUT /api/cursors/warehouse
+    Body: {"position": "1042"}
+    """
+    if request.method == 'DELETE':
+        get_storage().delete_cursor(consumer)
+        return jsonify({'name': consumer, 'deleted': True})
+
+    data = request.get_json(silent=True)
+    if not data or 'position' not in data:
+        return jsonify({'error': 'Missing position'}), 400
+
+    try:
+        changes.commit(consumer, data['position'])
+    except ValueError as e:
+        return jsonify({'error': f'Invalid position: {e}'}), 400
+
+    return jsonify({'name': consumer, 'position': str(data['position'])})
+
+
 @bp.route('/pool/stats', methods=['GET'])
 def get_pool_stats():
     """
-    Get driver pool statistics.
+    Get driver pool statistics, summed over the pools of all workers.
 
     GET /api/pool/stats
 
     Returns:
-        {"pool_size": 3, "available": 2, "active": 1, ...}
+        {"pool_size": 3, "available": 2, "active": 1, ..., "workers": [...]}
     """
     try:
-        pool = get_driver_pool()
-        stats = pool.get_stats()
+        stats = pool_stats.read_fleet()
         return jsonify(stats)
     except Exception as e:
         logger.error(f"Error getting pool stats: {e}")
@@ -115,25 +400,39 @@ def get_pool_stats():
 def health():
     """
     Health check endpoint.
+    Serves the snapshot collected by the collect_cluster_status beat task.
 
     GET /api/health
 
     Returns:
-        {"status": "healthy", ...}
+        {"status": "healthy", "age_seconds": 3.2, ...}; driver_pool is
+        {"status": "unavailable", ...} when the fleet cannot be read
     """
     try:
-        # Check Celery
-        result = health_check.delay()
-        celery_health = result.get(timeout=5)
+        status, age = cluster_status.get_status()
+
+        # Driver pools as published by the workers; informational only,
+        # so a Redis error here does not fail the probe
+        try:
+            fleet_stats = pool_stats.get_fleet()
+        except RedisError as e:
+            logger.warning(f"Driver pool stats unavailable: {e}")
+            fleet_stats = {'status': 'unavailable', 'error': str(e)}
 
-        # Check driver pool
-        pool = get_driver_pool()
-        pool_stats = pool.get_stats()
+        if status is None or age > CLUSTER_STATUS_INTERVAL * 3 or not status['workers']:
+            return jsonify({
+                'status': 'unhealthy',
+                'error': 'No recent status from Celery workers',
+                'age_seconds': round(age, 1) if age is not None else None,
+                'driver_pool': fleet_stats
+            }), 503
 
         return jsonify({
             'status': 'healthy',
-            'celery': celery_health,
-            'driver_pool': pool_stats
+            'celery': status['health'],
+            'workers': status['workers'],
+            'age_seconds': round(age, 1),
+            'driver_pool': fleet_stats
         })
     except Exception as e:
         logger.error(f"Health check failed: {e}")
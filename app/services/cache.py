@@ -0,0 +1,126 @@
+"""
+Cache for rendered pages and query results
+
+Two tiers: an in-process LRU and, with CACHE_REDIS=True, Redis shared by
+all web processes. Entries are never invalidated explicitly: every key
+includes the generation of the data it was built from (per-profile
+last_change_seq, bumped in the same transaction that inserts or refreshes
+tweets), so a write makes the old keys unreachable and a hit is always
+fresh. Stale entries age out of the LRU and expire in Redis.
+"""
+import json
+import time
+import hashlib
+import logging
+from threading import Lock
+from collections import OrderedDict
+
+from app.services import metrics
+from config.settings import CACHE_ENABLED, CACHE_MAX_ENTRIES, CACHE_REDIS, CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = 'cache:'
+REDIS_RETRY_AFTER = 30  # seconds without the Redis tier after an error
+
+
+class LRUCache:
+    """Thread-safe in-process LRU of at most max_entries values"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+_local = LRUCache(CACHE_MAX_ENTRIES)
+_redis_down_until = 0
+
+
+def _redis():
+    """Redis client for the shared tier, None when disabled or recently failing"""
+    if not CACHE_REDIS or time.monotonic() < _redis_down_until:
+        return None
+    from app.services.redis_client import get_redis
+    return get_redis()
+
+
+def _redis_failed(e):
+    global _redis_down_until
+    _redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+    logger.warning(f"Response cache: Redis tier unavailable for {REDIS_RETRY_AFTER}s: {e}")
+
+
+def make_key(namespace, *parts):
+    """Key of a value built from parts (request arguments and data generations)"""
+    digest = hashlib.sha1(json.dumps(parts, default=str, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+def get_or_set(namespace, parts, compute):
+    """
+    Cached value for (namespace, parts), computed and stored on a miss.
+    Values must be JSON-serializable (str for rendered HTML).
+    """
+    if not CACHE_ENABLED:
+        return compute()
+
+    key = make_key(namespace, *parts)
+
+    value = _local.get(key)
+    if value is not None:
+        metrics.CACHE_REQUESTS.labels(namespace=namespace, result='local').inc()
+        return value
+
+    client = _redis()
+    if client is not None:
+        try:
+            stored = client.get(REDIS_PREFIX + key)
+        except Exception as e:
+            _redis_failed(e)
+            stored = None
+
+        if stored is not None:
+            value = json.loads(stored)
+            _local.set(key, value)
+            metrics.CACHE_REQUESTS.labels(namespace=namespace, result='redis').inc()
+            return value
+
+    metrics.CACHE_REQUESTS.labels(namespace=namespace, result='miss').inc()
+    value = compute()
+    _local.set(key, value)
+
+    client = _redis()
+    if client is not None:
+        try:
+            client.set(REDIS_PREFIX + key, json.dumps(value), ex=CACHE_TTL)
+        except Exception as e:
+            _redis_failed(e)
+
+    return value
+
+
+def clear():
+    """Drop the in-process tier (Redis entries expire on their own)"""
+    _local.clear()
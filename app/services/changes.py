@@ -0,0 +1,126 @@
+"""
+Change feed for downstream pipelines
+
+Every new tweet and every engagement refresh gets the next value of the
+tweets change sequence (tweets.change_seq). A consumer reads the changes
+after its last position and, once it has processed them, stores the new
+position under its name (consumer_cursors), so each run costs the delta
+since the previous one. Used by GET /api/changes and from the command line:
+
+    python -m app.services.changes --consumer warehouse --output changes.ndjson
+    python -m app.services.changes --list
+"""
+import sys
+import json
+import argparse
+
+from config.settings import CHANGES_PAGE_SIZE
+
+
+def pull(consumer=None, since=None, limit=CHANGES_PAGE_SIZE, profiles=None, storage=None):
+    """
+    One page of changes after `since`, or after the stored position of
+    `consumer`. Nothing is committed: call commit() once the page is processed.
+
+    Raises:
+        ValueError: malformed position
+
+    Returns:
+        dict: changes, since, next_since, has_more
+    """
+    from app.storage.base import parse_change_position
+
+    if storage is None:
+        from app.storage import get_storage
+        storage = get_storage()
+
+    if since is None:
+        since = storage.get_cursor(consumer) if consumer else '0'
+
+    changes, next_since = storage.tweet_changes(parse_change_position(since), limit, profiles or None)
+    return {
+        'since': str(since),
+        'next_since': next_since,
+        'has_more': len(changes) == limit,
+        'changes': changes
+    }
+
+
+def commit(consumer, position, storage=None):
+    """Store the position a consumer has processed up to"""
+    if storage is None:
+        from app.storage import get_storage
+        storage = get_storage()
+    storage.set_cursor(consumer, position)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--consumer', help='Named cursor to read from and advance')
+    parser.add_argument('--since', help="Start position instead of the stored one ('0': everything)")
+    parser.add_argument('--profile', action='append', help='Only this username (repeatable)')
+    parser.add_argument('--limit', type=int, default=CHANGES_PAGE_SIZE, help='Rows per query')
+    parser.add_argument('--output', help='NDJSON output file (default: stdout)')
+    parser.add_argument('--no-commit', action='store_true', help='Do not advance the consumer cursor')
+    parser.add_argument('--list', action='store_true', help='Show consumer cursors and exit')
+    parser.add_argument('--reset', action='store_true', help='Delete the consumer cursor and exit')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    from app.storage import get_storage
+    storage = get_storage()
+    storage.init_schema()
+
+    if args.list:
+        for cursor in storage.list_cursors():
+            print(f"{cursor['name']:<24} position {cursor['position']:<28} lag {cursor['lag']:>10,}  "
+                  f"updated {cursor['updated_at']}")
+        return 0
+
+    if args.reset:
+        if not args.consumer:
+            print("Error: --reset needs --consumer", file=sys.stderr)
+            return 1
+        storage.delete_cursor(args.consumer)
+        print(f"Cursor '{args.consumer}' deleted", file=sys.stderr)
+        return 0
+
+    if not args.consumer and args.since is None:
+        print("Error: give --consumer or --since", file=sys.stderr)
+        return 1
+
+    since = args.since
+    written = 0
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        while True:
+            try:
+                page = pull(args.consumer, since, args.limit, args.profile, storage)
+            except ValueError as e:
+                print(f"Error: invalid position: {e}", file=sys.stderr)
+                return 1
+
+            for change in page['changes']:
+                output.write(json.dumps(change, ensure_ascii=False) + '\n')
+            written += len(page['changes'])
+            since = page['next_since']
+
+            if not page['has_more']:
+                break
+    finally:
+        if args.output:
+            output.close()
+
+    # Only once everything is written: a failed run is read again next time
+    if args.consumer and not args.no_commit:
+        commit(args.consumer, since, storage)
+
+    print(f"{written:,} changes, position {since}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
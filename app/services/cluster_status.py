@@ -0,0 +1,83 @@
+"""
+Cached Celery cluster status
+
+A periodic task collects worker health and the active/scheduled/reserved
+task lists and stores them in Redis with a TTL. Web endpoints read the
+snapshot instead of broadcasting to every worker on each request.
+"""
+import json
+import time
+import logging
+from threading import Lock
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+STATUS_KEY = 'cluster:status'
+
+# Keep one snapshot in process memory for a second: load balancer probes
+# then cost a dict lookup instead of a Redis round trip.
+LOCAL_TTL = 1.0
+
+_local = {'expires': 0.0, 'status': None}
+_local_lock = Lock()
+
+
+def collect(celery_app, hostname=None, timeout=1.0):
+    """
+    Query the workers once (one inspect round per list, bounded by timeout).
+
+    Args:
+        celery_app: Celery application
+        hostname: Worker running the collection; counted as alive even if
+                  it cannot answer its own broadcast (solo pool)
+
+    Returns:
+        dict: status snapshot with collected_at timestamp
+    """
+    inspect = celery_app.control.inspect(timeout=timeout)
+    active = inspect.active() or {}
+    scheduled = inspect.scheduled() or {}
+    reserved = inspect.reserved() or {}
+
+    workers = set(active) | set(scheduled) | set(reserved)
+    if hostname:
+        workers.add(hostname)
+
+    return {
+        'collected_at': time.time(),
+        'workers': sorted(workers),
+        'active_tasks': active,
+        'scheduled_tasks': scheduled,
+        'reserved_tasks': reserved
+    }
+
+
+def store(status, ttl):
+    """Save a snapshot; it disappears if collection stops for ttl seconds"""
+    get_redis().set(STATUS_KEY, json.dumps(status), ex=ttl)
+
+
+def get_status():
+    """
+    Latest snapshot with its age.
+
+    Returns:
+        tuple: (status dict or None, age in seconds or None)
+    """
+    now = time.time()
+
+    with _local_lock:
+        status = _local['status'] if _local['expires'] > now else None
+
+    if status is None:
+        raw = get_redis().get(STATUS_KEY)
+        status = json.loads(raw) if raw else None
+        with _local_lock:
+            _local['status'] = status
+            _local['expires'] = now + LOCAL_TTL
+
+    if status is None:
+        return None, None
+
+    return status, max(0.0, now - status['collected_at'])
@@ -3,17 +3,30 @@ Selenium WebDriver Pool for concurrent scraping
 Manages multiple Chrome instances safely
 """
 import os
+import re
+import shutil
+import socket
 import logging
 import time
 from queue import Queue, Empty
-from threading import Lock
+from threading import Lock, Thread, Event
 from contextlib import contextmanager
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import WebDriverException
+from app.services.profile_template import ProfileTemplate
+from app.services import metrics, pool_stats
 
 logger = logging.getLogger(__name__)
 
+# x.com session cookies: kept when a driver is cleaned, so clones of the
+# golden template stay logged in; auth_token is the login itself
+AUTH_COOKIES = {'auth_token', 'ct0', 'twid', 'kdt'}
+LOGIN_COOKIE = 'auth_token'
+
+# Fields of a CDP Network.Cookie accepted back by Network.setCookies
+COOKIE_PARAMS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
 
 class DriverPool:
     """
@@ -21,7 +34,9 @@ class DriverPool:
     Allows multiple concurrent scraping operations.
     """
 
-    def __init__(self, pool_size=3, headless=True, profile_dir='chrome_profiles'):
+    def __init__(self, pool_size=3, headless=True, profile_dir='chrome_profiles',
+                 template_dir=None, template_max_age=0, namespace=None,
+                 stats_heartbeat=None):
         """
         Initialize driver pool.
 
@@ -29,21 +44,31 @@ class DriverPool:
             pool_size: Number of Chrome instances to maintain
             headless: Run Chrome in headless mode
             profile_dir: Directory for Chrome user profiles
+            template_dir: Golden profile cloned into new/recycled drivers
+            template_max_age: Seconds before the template is refreshed on shutdown
+            namespace: Per-process profile subdirectory (default: <hostname>_<pid>)
+            stats_heartbeat: Publish stats to Redis on change and every N seconds
+                             (None = don't publish)
         """
         self.pool_size = pool_size
         self.headless = headless
         self.profile_dir = profile_dir
+        self.namespace = namespace or f'{socket.gethostname()}_{os.getpid()}'
+        self.template = ProfileTemplate(template_dir, template_max_age) if template_dir else None
         self.drivers = Queue(maxsize=pool_size)
         self.lock = Lock()
         self.active_count = 0
         self.total_created = 0
         self.total_acquired = 0
         self.total_released = 0
+        self.stats_heartbeat = stats_heartbeat
+        self._stop_heartbeat = Event()
 
         # Create profile directory if it doesn't exist
         os.makedirs(profile_dir, exist_ok=True)
+        self._prune_stale_namespaces()
 
-        logger.info(f"Initializing DriverPool with {pool_size} drivers")
+        logger.info(f"Initializing DriverPool with {pool_size} drivers (namespace: {self.namespace})")
 
         # Pre-populate pool with drivers
         for i in range(pool_size):
@@ -55,17 +80,97 @@ class DriverPool:
             except Exception as e:
                 logger.error(f"Failed to create driver {i}: {e}")
 
-    def _create_driver(self, driver_id):
+        self._observe()
+
+        if stats_heartbeat:
+            Thread(target=self._heartbeat, name='driver-pool-stats', daemon=True).start()
+
+    def _profile_path(self, driver_id):
+        """
+        Profile directory used by a driver.
+        Namespaced per process so prefork children never share a profile.
+        """
+        return os.path.abspath(
+            os.path.join(self.profile_dir, self.namespace, f'profile_{driver_id}')
+        )
+
+    def _prune_stale_namespaces(self):
+        """
+        Remove profile namespaces left behind by dead processes on this host.
+        Kept while the template is not seeded: they may hold the only login.
+        """
+        if os.name != 'posix':
+            # os.kill(pid, 0) is not a liveness probe on Windows
+            return
+        if self.template and not self.template.exists():
+            return
+
+        pattern = re.compile(rf'^{re.escape(socket.gethostname())}_(\d+)$')
+        for entry in os.listdir(self.profile_dir):
+            match = pattern.match(entry)
+            if not match or int(match.group(1)) == os.getpid():
+                continue
+            try:
+                os.kill(int(match.group(1)), 0)
+            except ProcessLookupError:
+                logger.info(f"Removing stale profile namespace {entry}")
+                shutil.rmtree(os.path.join(self.profile_dir, entry), ignore_errors=True)
+            except PermissionError:
+                pass
+
+    def _prepare_profile(self, profile_path, recycle=False):
+        """
+        Clone the golden template into a driver's profile.
+        New profiles are always cloned; recycled ones are reset to the template.
+        """
+        if not self.template:
+            return
+
+        if recycle or not os.path.isdir(profile_path):
+            try:
+                self.template.clone_to(profile_path)
+            except Exception as e:
+                logger.warning(f"Could not clone profile template into {profile_path}: {e}")
+
+    def _create_driver(self, driver_id, recycle=False):
         """
         Create a new Chrome WebDriver instance.
         Each driver gets its own user profile to avoid conflicts.
-        """
-        chrome_options = Options()
 
+        Args:
+            driver_id: Driver slot number
+            recycle: Replacing a dead driver (profile is reset from the template)
+        """
         # Each driver gets its own profile directory
-        profile_path = os.path.abspath(
-            os.path.join(self.profile_dir, f'profile_{driver_id}')
-        )
+        profile_path = self._profile_path(driver_id)
+        self._prepare_profile(profile_path, recycle=recycle)
+
+        # The debugging port is picked per launch and another process may
+        # grab it before Chrome binds it - retry with a fresh one.
+        for attempt in range(3):
+            debug_port = _free_port()
+            chrome_options = self._chrome_options(profile_path, debug_port)
+            try:
+                driver = webdriver.Chrome(options=chrome_options)
+                break
+            except WebDriverException as e:
+                if attempt == 2:
+                    raise
+                logger.warning(f"Driver {driver_id} failed to start on port {debug_port}, retrying: {e}")
+
+        driver.set_page_load_timeout(60)
+
+        # Store driver ID for tracking
+        driver.driver_id = driver_id
+        driver.debug_port = debug_port
+        driver.profile_path = profile_path
+        driver.rate_limit_session = f'{self.namespace}/profile_{driver_id}'  # not session_id: Selenium's own
+
+        return driver
+
+    def _chrome_options(self, profile_path, debug_port):
+        """Chrome options for one driver launch"""
+        chrome_options = Options()
         chrome_options.add_argument(f'--user-data-dir={profile_path}')
 
         if self.headless:
@@ -76,17 +181,10 @@ class DriverPool:
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument(f'--remote-debugging-port={9223 + driver_id}')
+        chrome_options.add_argument(f'--remote-debugging-port={debug_port}')
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
 
-        # Create driver
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.set_page_load_timeout(60)
-
-        # Store driver ID for tracking
-        driver.driver_id = driver_id
-
-        return driver
+        return chrome_options
 
     @contextmanager
     def acquire(self, timeout=30):
@@ -104,13 +202,16 @@ class DriverPool:
             WebDriver instance
         """
         driver = None
+        wait_started = time.perf_counter()
         try:
             # Get driver from pool (blocks if all busy)
             driver = self.drivers.get(timeout=timeout)
+            metrics.DRIVER_ACQUIRE_WAIT.labels(outcome='acquired').observe(time.perf_counter() - wait_started)
 
             with self.lock:
                 self.active_count += 1
                 self.total_acquired += 1
+            self._observe()
 
             driver_id = getattr(driver, 'driver_id', 'unknown')
             logger.debug(f"Acquired driver {driver_id} (active: {self.active_count})")
@@ -124,11 +225,12 @@ class DriverPool:
                     driver.quit()
                 except:
                     pass
-                driver = self._create_driver(driver_id)
+                driver = self._create_driver(driver_id, recycle=True)
 
             yield driver
 
         except Empty:
+            metrics.DRIVER_ACQUIRE_WAIT.labels(outcome='timeout').observe(time.perf_counter() - wait_started)
             logger.error(f"Timeout waiting for driver (timeout={timeout}s)")
             raise TimeoutError(f"No driver available within {timeout} seconds")
 
@@ -139,16 +241,17 @@ class DriverPool:
                     self.active_count -= 1
                     self.total_released += 1
 
-                # Clean up driver state before returning to pool
-                try:
-                    # Clear cookies and cache
-                    driver.delete_all_cookies()
-                    # Navigate to blank page to free resources
-                    driver.get('about:blank')
-                except Exception as e:
-                    logger.warning(f"Error cleaning driver: {e}")
+                if getattr(driver, 'evicted', False):
+                    driver = self._replace_evicted(driver)
+                else:
+                    # Clean up driver state before returning to pool
+                    try:
+                        self._clean_driver(driver)
+                    except Exception as e:
+                        logger.warning(f"Error cleaning driver: {e}")
 
                 self.drivers.put(driver)
+                self._observe()
                 driver_id = getattr(driver, 'driver_id', 'unknown')
                 logger.debug(f"Released driver {driver_id} (active: {self.active_count})")
 
@@ -160,12 +263,15 @@ class DriverPool:
         Returns:
             WebDriver instance
         """
+        wait_started = time.perf_counter()
         try:
             driver = self.drivers.get(timeout=timeout)
+            metrics.DRIVER_ACQUIRE_WAIT.labels(outcome='acquired').observe(time.perf_counter() - wait_started)
 
             with self.lock:
                 self.active_count += 1
                 self.total_acquired += 1
+            self._observe()
 
             # Verify driver is functional
             try:
@@ -177,11 +283,12 @@ class DriverPool:
                     driver.quit()
                 except:
                     pass
-                driver = self._create_driver(driver_id)
+                driver = self._create_driver(driver_id, recycle=True)
 
             return driver
 
         except Empty:
+            metrics.DRIVER_ACQUIRE_WAIT.labels(outcome='timeout').observe(time.perf_counter() - wait_started)
             raise TimeoutError(f"No driver available within {timeout} seconds")
 
     def release_driver(self, driver):
@@ -193,20 +300,75 @@ class DriverPool:
                 self.active_count -= 1
                 self.total_released += 1
 
-            # Clean driver state
-            try:
-                driver.delete_all_cookies()
-                driver.get('about:blank')
-            except:
-                pass
+            if getattr(driver, 'evicted', False):
+                driver = self._replace_evicted(driver)
+            else:
+                # Clean driver state
+                try:
+                    self._clean_driver(driver)
+                except:
+                    pass
 
             self.drivers.put(driver)
+            self._observe()
+
+    def _clean_driver(self, driver):
+        """
+        Clear every cookie except the x.com session (AUTH_COOKIES), then
+        navigate to a blank page to free resources. Three CDP round trips
+        however many cookies there are.
+        """
+        cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        keep = [
+            {field: cookie[field] for field in COOKIE_PARAMS
+             if field in cookie and not (field == 'expires' and cookie.get('session'))}
+            for cookie in cookies if cookie.get('name') in AUTH_COOKIES
+        ]
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        if keep:
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': keep})
+        driver.get('about:blank')
+
+    @staticmethod
+    def _is_logged_in(driver):
+        """True if the driver holds an x.com login cookie (any page, via CDP)"""
+        try:
+            cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        except Exception as e:
+            logger.debug(f"Could not read cookies of driver {getattr(driver, 'driver_id', 'unknown')}: {e}")
+            return False
+        return any(cookie.get('name') == LOGIN_COOKIE for cookie in cookies)
+
+    def evict(self, driver):
+        """
+        Mark a driver as unusable (dead session, crashed tab). On release it
+        is quit and replaced by a fresh one instead of going back to the pool.
+        """
+        driver.evicted = True
+        logger.warning(f"Driver {getattr(driver, 'driver_id', 'unknown')} evicted")
+
+    def _replace_evicted(self, driver):
+        """Quit an evicted driver and create its replacement (same id and slot)"""
+        driver_id = getattr(driver, 'driver_id', 0)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+        try:
+            return self._create_driver(driver_id, recycle=True)
+        except Exception as e:
+            # Keep the slot: the liveness check on the next acquire retries
+            logger.error(f"Could not replace evicted driver {driver_id}: {e}")
+            driver.evicted = False
+            return driver
 
     def shutdown(self):
         """
         Shutdown all drivers in the pool.
         """
         logger.info("Shutting down DriverPool...")
+        self._stop_heartbeat.set()
 
         drivers_to_close = []
 
@@ -218,19 +380,85 @@ class DriverPool:
             except Empty:
                 break
 
-        # Close all drivers
+        # Close all drivers, noting which ones are still logged in: only
+        # those may become the new template
+        logged_in = []
         for driver in drivers_to_close:
+            if self.template and self._is_logged_in(driver):
+                logged_in.append(getattr(driver, 'driver_id', None))
             try:
                 driver.quit()
                 logger.info(f"Closed driver {getattr(driver, 'driver_id', 'unknown')}")
             except Exception as e:
                 logger.error(f"Error closing driver: {e}")
 
+        self._refresh_template(logged_in)
+
+        # Per-process profiles are never reused once this process exits, but
+        # until a template is seeded they are the only copy of the login
+        namespace_dir = os.path.join(self.profile_dir, self.namespace)
+        if self.template and not self.template.exists():
+            logger.warning(f"No profile template seeded, keeping {namespace_dir}: seed one with "
+                           f"python -m app.services.profile_template {namespace_dir}/profile_0")
+        else:
+            shutil.rmtree(namespace_dir, ignore_errors=True)
+
+        metrics.observe_pool({'available': 0, 'active': 0, 'total_created': 0})
+        if self.stats_heartbeat:
+            try:
+                pool_stats.unpublish(self.namespace)
+            except Exception as e:
+                logger.debug(f"Could not unpublish pool stats: {e}")
+
         logger.info(f"DriverPool shutdown complete. Stats: "
                    f"created={self.total_created}, "
                    f"acquired={self.total_acquired}, "
                    f"released={self.total_released}")
 
+    def _refresh_template(self, logged_in):
+        """
+        Snapshot a profile back into the template once it is stale, or
+        into an empty template to seed it.
+        Only called after the drivers have quit, so the profile is consistent,
+        and only from a driver confirmed logged in just before it quit, so
+        a logged-out session never replaces the golden login.
+
+        Args:
+            logged_in: driver ids whose x.com session was still valid
+        """
+        if not self.template or (self.template.exists() and not self.template.is_stale()):
+            return
+
+        if not logged_in:
+            logger.warning("No logged-in driver at shutdown, profile template not refreshed")
+            return
+
+        for driver_id in logged_in:
+            profile_path = self._profile_path(driver_id)
+            if os.path.isdir(profile_path):
+                try:
+                    self.template.refresh_from(profile_path)
+                except Exception as e:
+                    logger.error(f"Error refreshing profile template: {e}")
+                return
+
+    def _observe(self):
+        """Publish current stats to the pool gauges and Redis"""
+        stats = self.get_stats()
+        metrics.observe_pool(stats)
+
+        if self.stats_heartbeat:
+            try:
+                pool_stats.publish(stats, ttl=self.stats_heartbeat * 3)
+            except Exception as e:
+                # Stats are best-effort; never fail a scrape over them
+                logger.debug(f"Could not publish pool stats: {e}")
+
+    def _heartbeat(self):
+        """Republish stats periodically so the Redis hash outlives its TTL"""
+        while not self._stop_heartbeat.wait(self.stats_heartbeat):
+            self._observe()
+
     def get_stats(self):
         """
         Get pool statistics.
@@ -239,6 +467,7 @@ class DriverPool:
             dict with pool stats
         """
         return {
+            'namespace': self.namespace,
             'pool_size': self.pool_size,
             'available': self.drivers.qsize(),
             'active': self.active_count,
@@ -254,26 +483,43 @@ class DriverPool:
         self.shutdown()
 
 
+def _free_port():
+    """Ask the OS for a currently unused TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
 # Global driver pool instance (lazy initialization)
 _driver_pool = None
+_driver_pool_pid = None
 _pool_lock = Lock()
 
 
-def get_driver_pool(pool_size=3, headless=True, profile_dir='chrome_profiles'):
+def get_driver_pool(pool_size=3, headless=True, profile_dir='chrome_profiles',
+                    template_dir=None, template_max_age=0, stats_heartbeat=None):
     """
     Get or create the global driver pool instance.
     Thread-safe singleton pattern.
     """
-    global _driver_pool
+    global _driver_pool, _driver_pool_pid
+
+    # A pool inherited through fork belongs to the parent's Chrome processes
+    if _driver_pool is not None and _driver_pool_pid != os.getpid():
+        _driver_pool = None
 
     if _driver_pool is None:
         with _pool_lock:
             # Double-check locking
             if _driver_pool is None:
+                _driver_pool_pid = os.getpid()
                 _driver_pool = DriverPool(
                     pool_size=pool_size,
                     headless=headless,
-                    profile_dir=profile_dir
+                    profile_dir=profile_dir,
+                    template_dir=template_dir,
+                    template_max_age=template_max_age,
+                    stats_heartbeat=stats_heartbeat
                 )
 
     return _driver_pool
@@ -0,0 +1,251 @@
+"""
+Streaming tweet export (NDJSON, CSV, Parquet)
+
+Rows come from Storage.iter_tweets in chunks and each chunk is encoded and
+compressed before the next one is read, so memory stays flat whatever the
+size of the export. Used by GET /api/export and from the command line:
+
+    python -m app.services.export --format ndjson --compression gzip --output tweets.ndjson.gz
+    python -m app.services.export --format csv --profile elonmusk --date-from 2025-01-01 > tweets.csv
+"""
+import io
+import sys
+import csv
+import json
+import time
+import zlib
+import argparse
+
+try:
+    import zstandard
+except ImportError:  # Only needed for compression=zstd
+    zstandard = None
+
+from config.settings import EXPORT_CHUNK_SIZE
+
+# Column order of the CSV header and the Parquet schema (Storage._export_row)
+EXPORT_FIELDS = (
+    'tweet_id', 'author', 'text', 'url', 'timestamp', 'created_at', 'language',
+    'likes', 'retweets', 'replies', 'is_retweet', 'original_author', 'scraped_date', 'change_seq'
+)
+
+# format -> (mimetype, file extension)
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# compression -> (mimetype, file extension); Parquet compresses its column
+# chunks instead of the whole file
+COMPRESSIONS = {
+    'gzip': ('application/gzip', 'gz'),
+    'zstd': ('application/zstd', 'zst'),
+}
+
+
+def _ndjson(chunks):
+    for rows in chunks:
+        yield ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+
+
+def _csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():  # Header only, no rows
+        yield buffer.getvalue().encode('utf-8')
+
+
+class _Drain:
+    """Write-only file whose bytes are taken out after every row group"""
+
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _pyarrow():
+    """
+    pyarrow, or None if not installed. Imported on the first Parquet export
+    rather than at module load: it takes longer to import than the rest of
+    the web app.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:  # Only needed for format=parquet
+        return None
+    return pyarrow
+
+
+def _parquet_schema(pyarrow):
+    strings = ('tweet_id', 'author', 'text', 'url', 'timestamp', 'created_at',
+               'language', 'original_author', 'scraped_date')
+    types = {'likes': pyarrow.int64(), 'retweets': pyarrow.int64(), 'replies': pyarrow.int64(),
+             'is_retweet': pyarrow.bool_(), 'change_seq': pyarrow.int64()}
+    return pyarrow.schema([
+        (field, pyarrow.string() if field in strings else types[field]) for field in EXPORT_FIELDS
+    ])
+
+
+def _parquet(chunks, compression):
+    pyarrow = _pyarrow()
+    schema = _parquet_schema(pyarrow)
+    sink = _Drain()
+    writer = pyarrow.parquet.ParquetWriter(
+        pyarrow.PythonFile(sink, mode='w'), schema, compression=compression or 'snappy'
+    )
+
+    # One row group per chunk; the footer is written on close
+    for rows in chunks:
+        writer.write_table(pyarrow.Table.from_pylist(rows, schema=schema))
+        yield sink.take()
+
+    writer.close()
+    yield sink.take()
+
+
+def _gzip(blocks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for block in blocks:
+        data = compressor.compress(block)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _zstd(blocks):
+    compressor = zstandard.ZstdCompressor().compressobj()
+    for block in blocks:
+        data = compressor.compress(block)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def check_options(fmt, compression=None):
+    """
+    Raises:
+        ValueError: unknown format or compression
+        RuntimeError: the optional library it needs is not installed
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}' (expected one of: {', '.join(FORMATS)})")
+    if compression and compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}' (expected one of: {', '.join(COMPRESSIONS)})")
+    if fmt == 'parquet' and _pyarrow() is None:
+        raise RuntimeError("pyarrow is required for Parquet export (pip install pyarrow)")
+    if compression == 'zstd' and fmt != 'parquet' and zstandard is None:
+        raise RuntimeError("zstandard is required for zstd compression (pip install zstandard)")
+
+
+def content_type(fmt, compression=None):
+    """
+    Returns:
+        tuple: (mimetype, filename) of the export
+    """
+    mimetype, extension = FORMATS[fmt]
+    filename = f"tweets.{extension}"
+    if compression and fmt != 'parquet':
+        mimetype, compressed_extension = COMPRESSIONS[compression]
+        filename += f".{compressed_extension}"
+    return mimetype, filename
+
+
+def stream_export(fmt='ndjson', compression=None, profiles=None, date_from='', date_to='',
+                  chunk_size=EXPORT_CHUNK_SIZE, storage=None):
+    """
+    Encoded export as an iterator of bytes.
+    Options are checked up front (check_options); rows are only read
+    from storage as the iterator is consumed.
+    """
+    check_options(fmt, compression)
+
+    if storage is None:
+        from app.storage import get_storage
+        storage = get_storage()
+
+    chunks = storage.iter_tweets(profiles or None, date_from, date_to, chunk_size)
+
+    if fmt == 'parquet':
+        return _parquet(chunks, compression)
+
+    blocks = _ndjson(chunks) if fmt == 'ndjson' else _csv(chunks)
+    if compression == 'gzip':
+        return _gzip(blocks)
+    if compression == 'zstd':
+        return _zstd(blocks)
+    return blocks
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--format', choices=list(FORMATS), default='ndjson')
+    parser.add_argument('--compression', choices=list(COMPRESSIONS), help='gzip or zstd (Parquet: column codec)')
+    parser.add_argument('--profile', action='append', help='Only this username (repeatable)')
+    parser.add_argument('--date-from', default='', help='Scraped on or after YYYY-MM-DD')
+    parser.add_argument('--date-to', default='', help='Scraped on or before YYYY-MM-DD')
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='Rows read per query')
+    parser.add_argument('--output', help='Output file (default: stdout)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        blocks = stream_export(args.format, args.compression, args.profile,
+                               args.date_from, args.date_to, args.chunk_size)
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    written = 0
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for block in blocks:
+            output.write(block)
+            written += len(block)
+    finally:
+        if args.output:
+            output.close()
+
+    print(f"Exported {written:,} bytes in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
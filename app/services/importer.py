@@ -0,0 +1,355 @@
+"""
+Bulk import of tweets from older versions and dumps
+
+Sources, detected by extension:
+
+- .db / .sqlite: SQLite databases of older versions (tweets.db,
+  twitter_scraper.db with the legacy or compact schema)
+- .json: dumps grouped by username ({"user": [{"text", "timestamp",
+  "likes", ...}]}, as tweets_export.json and mis_tweets.json), read with
+  an incremental parser so the file is never loaded whole
+- .ndjson / .jsonl: one tweet per line (GET /api/export)
+
+Profiles are created as they appear, including those without tweets.
+Rows are written in large transactions with the secondary indexes
+rebuilt once at the end (Storage.bulk_load). Tweets without an ID get a
+stable snowflake-shaped one (see synthetic_tweet_id), so importing the
+same source twice adds nothing.
+
+    python -m app.services.importer tweets.db tweets_export.json mis_tweets.json
+"""
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import argparse
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+from app.storage.base import TWITTER_EPOCH_MS
+
+logger = logging.getLogger(__name__)
+
+STATUS_ID = re.compile(r'/status/(\d+)')
+WHITESPACE = re.compile(r'\s*')
+
+
+def _epoch_ms(value):
+    """Milliseconds of an ISO timestamp (naive values are taken as UTC), None if unparseable"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def synthetic_tweet_id(username, text, timestamp):
+    """
+    ID for tweets stored without one: the timestamp in the snowflake time
+    bits and a hash of author and text in the low 22 bits. Stable across
+    imports, and ordered by time like real IDs.
+    """
+    ms = _epoch_ms(timestamp) or TWITTER_EPOCH_MS
+    digest = hashlib.blake2b(f"{username}\0{text}".encode('utf-8'), digest_size=8).digest()
+    return (max(ms - TWITTER_EPOCH_MS, 0) << 22) | (int.from_bytes(digest, 'big') & 0x3FFFFF)
+
+
+def _tweet_id(record):
+    """Real tweet ID of a record (ID field or status URL), else a synthetic one"""
+    for key in ('tweet_id', 'id'):
+        value = record.get(key)
+        if value is not None and str(value).isdigit():
+            return int(value)
+
+    match = STATUS_ID.search(record.get('tweet_url') or record.get('url') or '')
+    if match:
+        return int(match.group(1))
+
+    return synthetic_tweet_id(record['username'], record.get('text') or '', record.get('timestamp'))
+
+
+class _JSONStream:
+    """
+    Incremental JSON reader: values are decoded one at a time with
+    raw_decode from a buffer refilled in blocks.
+    """
+
+    def __init__(self, file, block_size=1 << 20):
+        self.file = file
+        self.block_size = block_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        block = self.file.read(self.block_size)
+        if not block:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + block
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ('' at the end)"""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}', found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+
+            # A number at the end of the buffer may continue in the next block
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+
+            self.pos = end
+            return value
+
+    def items(self):
+        """Elements of a JSON array"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() != ',':
+                break
+            self.pos += 1
+        self.expect(']')
+
+
+def read_grouped_json(path):
+    """Records of a {"username": [tweet, ...], ...} dump"""
+    with open(path, encoding='utf-8') as file:
+        stream = _JSONStream(file)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+
+        while True:
+            username = stream.value()
+            stream.expect(':')
+            yield {'username': username, 'profile_only': True}
+            for tweet in stream.items():
+                yield dict(tweet, username=username)
+            if stream.peek() != ',':
+                break
+            stream.pos += 1
+        stream.expect('}')
+
+
+def read_ndjson(path):
+    """Records of a one-tweet-per-line file (author in 'author' or 'username')"""
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                record.setdefault('username', record.get('author'))
+                yield record
+
+
+def read_sqlite(path, chunk_size=10000):
+    """Records of the tweets table of an older database, whatever its columns"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(tweets)")}
+        if not columns:
+            raise ValueError(f"{path} has no tweets table")
+
+        for (username,) in conn.execute("SELECT username FROM profiles ORDER BY id"):
+            yield {'username': username, 'profile_only': True}
+
+        def column(name, alias=None):
+            return f"t.{name} AS {alias or name}" if name in columns else f"NULL AS {alias or name}"
+
+        author = "COALESCE(p.username, t.author)" if 'author' in columns else "p.username"
+        cursor = conn.execute(f"""
+            SELECT {author} AS username, {column('tweet_id')}, {column('tweet_url')},
+                   {column('tweet_text', 'text')}, {column('timestamp')}, {column('language')},
+                   {column('likes')}, {column('retweets')}, {column('replies')},
+                   {column('is_retweet')}, {column('original_author')}, {column('scraped_date')}
+            FROM tweets t
+            LEFT JOIN profiles p ON p.id = t.profile_id
+        """)
+        names = [description[0] for description in cursor.description]
+
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(names, row))
+    finally:
+        conn.close()
+
+
+def read_source(path):
+    lower = str(path).lower()
+    if lower.endswith(('.ndjson', '.jsonl')):
+        return read_ndjson(path)
+    if lower.endswith('.json'):
+        return read_grouped_json(path)
+    if lower.endswith(('.db', '.sqlite', '.sqlite3')):
+        return read_sqlite(path)
+    raise ValueError(f"Unknown source type: {path}")
+
+
+class Importer:
+    """Maps records onto profiles/tweets and writes them in batches"""
+
+    def __init__(self, storage=None, batch_size=50000, defer_indexes=True, progress=True):
+        if storage is None:
+            from app.storage import get_storage
+            storage = get_storage()
+
+        self.storage = storage
+        self.batch_size = batch_size
+        self.defer_indexes = defer_indexes
+        self.progress = progress
+        self.profile_ids = {}
+        self.stats = {'profiles': 0, 'read': 0, 'inserted': 0, 'skipped': 0}
+        self.started = None
+
+    def _row(self, conn, record):
+        username = (record.get('username') or '').strip().lstrip('@')
+        if not username:
+            return None
+
+        profile_id = self.profile_ids.get(username)
+        if profile_id is None:
+            profile_id = self.profile_ids[username] = self.storage.ensure_profile(conn, username)
+            self.stats['profiles'] += 1
+
+        if record.get('profile_only'):
+            return None
+
+        record['username'] = username
+        timestamp = record.get('timestamp')
+        return [
+            _tweet_id(record), profile_id, record.get('text'), timestamp,
+            record.get('language') or record.get('lang'),
+            record.get('likes') or 0, record.get('retweets') or 0, record.get('replies') or 0,
+            bool(record.get('is_retweet')), record.get('original_author'),
+            None,  # change_seq, set per batch
+            record.get('scraped_date') or timestamp or datetime.now().isoformat(sep=' ', timespec='seconds')
+        ]
+
+    def _write(self, records):
+        with self.storage.transaction() as conn:
+            rows = []
+            for record in records:
+                row = self._row(conn, record)
+                if row is not None:
+                    rows.append(row)
+                elif not record.get('profile_only'):
+                    self.stats['skipped'] += 1
+
+            if rows:
+                # Oldest first: appends to the tweet_id B-tree
+                rows.sort(key=lambda row: row[0])
+                first_seq = self.storage.reserve_change_seq(conn, len(rows))
+                for i, row in enumerate(rows):
+                    row[10] = first_seq + i
+
+                # One insert per profile, so only profiles that gained tweets
+                # are marked changed (cached responses, ETags, change feed)
+                by_profile = {}
+                for row in rows:
+                    by_profile.setdefault(row[1], []).append(row)
+                for profile_id, profile_rows in by_profile.items():
+                    inserted = self.storage.import_tweets(conn, profile_rows)
+                    if inserted:
+                        self.storage.mark_profile_changed(conn, profile_id, profile_rows[-1][10])
+                    self.stats['inserted'] += inserted
+                    self.stats['skipped'] += len(profile_rows) - inserted
+
+        if self.progress:
+            elapsed = time.perf_counter() - self.started
+            print(f"\r  {self.stats['read']:,} read, {self.stats['inserted']:,} new "
+                  f"({self.stats['read'] / max(elapsed, 1e-9):,.0f} rows/s)",
+                  end='', file=sys.stderr, flush=True)
+
+    def run(self, paths):
+        """
+        Import every source (in order) inside one bulk_load.
+
+        Returns:
+            dict: profiles seen, read/inserted/skipped rows, seconds and rows per second
+        """
+        self.started = time.perf_counter()
+
+        with self.storage.bulk_load() if self.defer_indexes else nullcontext():
+            for path in paths:
+                logger.info(f"Importing {path}")
+                batch = []
+                for record in read_source(path):
+                    batch.append(record)
+                    if not record.get('profile_only'):
+                        self.stats['read'] += 1
+                    if len(batch) >= self.batch_size:
+                        self._write(batch)
+                        batch = []
+                if batch:
+                    self._write(batch)
+
+            if self.progress:
+                print(file=sys.stderr)
+
+        seconds = time.perf_counter() - self.started
+        summary = dict(self.stats, seconds=round(seconds, 2),
+                       rows_per_second=round(self.stats['read'] / max(seconds, 1e-9)))
+        logger.info(f"Import finished: {summary}")
+        return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sources', nargs='+', help='.db, .json or .ndjson files')
+    parser.add_argument('--batch-size', type=int, default=50000, help='Rows per transaction')
+    parser.add_argument('--keep-indexes', action='store_true',
+                        help='Maintain indexes row by row (slower, but searches stay fast during the import)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    from app.storage import get_storage
+    storage = get_storage()
+    storage.init_schema()
+
+    try:
+        summary = Importer(storage, args.batch_size, not args.keep_indexes).run(args.sources)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{summary['profiles']:,} profiles, {summary['read']:,} rows read, {summary['inserted']:,} new, {summary['skipped']:,} skipped "
+          f"in {summary['seconds']}s ({summary['rows_per_second']:,} rows/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Prometheus metrics for the web app, Celery workers and DriverPool
+
+Metrics are no-ops when ENABLE_METRICS is off or prometheus_client is not
+installed. Set PROMETHEUS_MULTIPROC_DIR to aggregate across processes
+(prefork Celery children, multi-worker web servers).
+"""
+import os
+import time
+import logging
+from config.settings import ENABLE_METRICS
+
+try:
+    from prometheus_client import (
+        Counter, Gauge, Histogram, CollectorRegistry, start_http_server, multiprocess
+    )
+except ImportError:  # Monitoring is optional
+    Counter = Gauge = Histogram = None
+
+logger = logging.getLogger(__name__)
+
+METRICS_AVAILABLE = ENABLE_METRICS and Counter is not None
+MULTIPROCESS = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+# Scrapes take minutes; phases range from milliseconds to a couple of minutes
+TASK_BUCKETS = (5, 15, 30, 60, 90, 120, 180, 240, 300, 450, 600)
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 180)
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1, 5, 10, 30, 60)
+WRITE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class _NoopMetric:
+    """Stand-in for a metric when metrics are disabled"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+def _metric(factory, name, documentation, labelnames=(), **kwargs):
+    if not METRICS_AVAILABLE:
+        return _NoopMetric()
+    return factory(name, documentation, labelnames, **kwargs)
+
+
+def _gauge(name, documentation):
+    # livesum: sum over live processes in multiprocess mode
+    if not METRICS_AVAILABLE:
+        return _NoopMetric()
+    return Gauge(name, documentation, multiprocess_mode='livesum')
+
+
+# Celery tasks
+SCRAPE_TASK_DURATION = _metric(
+    Histogram, 'scrape_task_duration_seconds',
+    'Duration of scrape_profile_task', ['outcome'], buckets=TASK_BUCKETS
+)
+SCRAPE_TASKS = _metric(
+    Counter, 'scrape_tasks_total',
+    'Finished scrape_profile_task runs', ['outcome']
+)
+SCRAPE_PHASE_DURATION = _metric(
+    Histogram, 'scrape_phase_duration_seconds',
+    'Duration of each scrape_profile phase', ['phase', 'outcome'], buckets=PHASE_BUCKETS
+)
+SCRAPES_RATE_LIMITED = _metric(
+    Counter, 'scrapes_rate_limited_total',
+    'Scrapes re-queued by the rate limiter', ['scope']
+)
+SCRAPE_ERRORS = _metric(
+    Counter, 'scrape_errors_total',
+    'Failed scrape attempts by error class and what was done about them', ['error_class', 'action']
+)
+TWEETS_INSERTED = _metric(
+    Counter, 'tweets_inserted_total',
+    'Tweets inserted into the database'
+)
+
+# Write-behind persistence
+PERSIST_WRITE_DURATION = _metric(
+    Histogram, 'persist_write_duration_seconds',
+    'Duration of one write-behind transaction', buckets=WRITE_BUCKETS
+)
+PERSIST_QUEUE_DELAY = _metric(
+    Histogram, 'persist_queue_delay_seconds',
+    'Time from enqueue to commit of a scraped batch', buckets=WAIT_BUCKETS
+)
+PERSIST_BATCHES = _metric(
+    Counter, 'persist_batches_total',
+    'Scraped batches written by the write-behind writer'
+)
+PERSIST_DEAD_LETTERS = _metric(
+    Counter, 'persist_dead_letters_total',
+    'Scraped batches moved to the dead-letter list after failing every write retry'
+)
+
+# Response cache (result: local, redis or miss)
+CACHE_REQUESTS = _metric(
+    Counter, 'response_cache_requests_total',
+    'Response cache lookups', ['namespace', 'result']
+)
+
+# DriverPool
+DRIVER_POOL_AVAILABLE = _gauge('driver_pool_available', 'Idle drivers in the pool')
+DRIVER_POOL_ACTIVE = _gauge('driver_pool_active', 'Drivers currently checked out')
+DRIVER_POOL_CREATED = _gauge('driver_pool_total_created', 'Drivers created by the pool')
+DRIVER_ACQUIRE_WAIT = _metric(
+    Histogram, 'driver_pool_acquire_wait_seconds',
+    'Time spent waiting for a driver', ['outcome'], buckets=WAIT_BUCKETS
+)
+
+
+def observe_pool(stats):
+    """Publish a DriverPool.get_stats() snapshot to the pool gauges"""
+    DRIVER_POOL_AVAILABLE.set(stats['available'])
+    DRIVER_POOL_ACTIVE.set(stats['active'])
+    DRIVER_POOL_CREATED.set(stats['total_created'])
+
+
+def observe_scrape(result, duration):
+    """Record one finished scrape_profile_task"""
+    outcome = result.get('status', 'unknown')
+    SCRAPE_TASKS.labels(outcome=outcome).inc()
+    SCRAPE_TASK_DURATION.labels(outcome=outcome).observe(duration)
+
+    durations = (result.get('metrics') or {}).get('durations', {})
+    for phase, seconds in durations.items():
+        SCRAPE_PHASE_DURATION.labels(phase=phase, outcome=outcome).observe(seconds)
+
+
+def observe_write(batches, duration):
+    """Record one write-behind transaction over the given batches"""
+    PERSIST_WRITE_DURATION.observe(duration)
+    PERSIST_BATCHES.inc(len(batches))
+
+    now = time.time()
+    for batch in batches:
+        PERSIST_QUEUE_DELAY.observe(now - batch['queued_at'])
+
+
+def init_app(app):
+    """
+    Expose /metrics with per-route request latency on a Flask app.
+    """
+    if not METRICS_AVAILABLE:
+        return None
+
+    try:
+        if MULTIPROCESS:
+            from prometheus_flask_exporter.multiprocess import MultiprocessInternalPrometheusMetrics
+            return MultiprocessInternalPrometheusMetrics(app, group_by='url_rule')
+
+        from prometheus_flask_exporter import PrometheusMetrics
+        return PrometheusMetrics(app, group_by='url_rule')
+    except ImportError:
+        logger.warning("prometheus-flask-exporter not installed, /metrics disabled")
+        return None
+
+
+def start_worker_server(port):
+    """
+    Serve worker metrics over HTTP (Celery main process).
+    In multiprocess mode the endpoint aggregates all prefork children.
+    """
+    if not METRICS_AVAILABLE:
+        return
+
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(port, registry=registry)
+    else:
+        start_http_server(port)
+
+    logger.info(f"Worker metrics exposed on :{port}/metrics")
+
+
+def reset_multiprocess_dir():
+    """
+    Remove metric files left by a previous run. Call once in the parent
+    process before children start; do not share the directory between
+    the web tier and the workers.
+    """
+    path = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if not (METRICS_AVAILABLE and path and os.path.isdir(path)):
+        return
+
+    for name in os.listdir(path):
+        if name.endswith('.db'):
+            os.remove(os.path.join(path, name))
+
+
+def mark_process_dead(pid):
+    """Drop a dead child's live gauges from the multiprocess directory"""
+    if METRICS_AVAILABLE and MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
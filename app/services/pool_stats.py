@@ -0,0 +1,107 @@
+"""
+Fleet-wide DriverPool statistics through Redis
+
+Each worker process publishes its pool snapshot to a hash with a TTL
+(on every change and on a heartbeat). The web tier aggregates them
+instead of probing a pool of its own.
+"""
+import time
+import logging
+from threading import Lock
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'driver_pool:stats:'
+INDEX_KEY = 'driver_pool:workers'
+
+# Counters summed across workers
+SUMMED_FIELDS = (
+    'pool_size', 'available', 'active',
+    'total_created', 'total_acquired', 'total_released'
+)
+
+# Keep the aggregated fleet in process memory for a few seconds: health
+# probes then cost a dict lookup instead of SMEMBERS plus HGETALLs.
+LOCAL_TTL = 5.0
+
+_local = {'expires': 0.0, 'fleet': None}
+_local_lock = Lock()
+
+
+def publish(stats, ttl):
+    """
+    Publish one pool's stats; the hash expires if the worker stops
+    heartbeating for ttl seconds.
+    """
+    namespace = stats['namespace']
+    key = KEY_PREFIX + namespace
+
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.hset(key, mapping=dict(stats, updated_at=time.time()))
+    pipe.expire(key, ttl)
+    pipe.sadd(INDEX_KEY, namespace)
+    pipe.execute()
+
+
+def unpublish(namespace):
+    """Remove a pool that shut down cleanly"""
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.delete(KEY_PREFIX + namespace)
+    pipe.srem(INDEX_KEY, namespace)
+    pipe.execute()
+
+
+def read_fleet():
+    """
+    Aggregate the stats of every live worker pool.
+    One SMEMBERS plus one pipelined HGETALL for all workers.
+
+    Returns:
+        dict: summed counters plus a 'workers' list of per-pool snapshots
+    """
+    client = get_redis()
+    namespaces = sorted(client.smembers(INDEX_KEY))
+
+    pipe = client.pipeline(transaction=False)
+    for namespace in namespaces:
+        pipe.hgetall(KEY_PREFIX + namespace)
+    snapshots = pipe.execute() if namespaces else []
+
+    fleet = {field: 0 for field in SUMMED_FIELDS}
+    workers = []
+    expired = []
+
+    for namespace, snapshot in zip(namespaces, snapshots):
+        if not snapshot:
+            expired.append(namespace)
+            continue
+
+        worker = {'namespace': namespace, 'updated_at': float(snapshot.get('updated_at', 0))}
+        for field in SUMMED_FIELDS:
+            worker[field] = int(snapshot.get(field, 0))
+            fleet[field] += worker[field]
+        workers.append(worker)
+
+    # Workers that died without unpublishing
+    if expired:
+        client.srem(INDEX_KEY, *expired)
+
+    fleet['workers'] = workers
+    return fleet
+
+
+def get_fleet():
+    """read_fleet(), memoized for LOCAL_TTL seconds"""
+    now = time.time()
+
+    with _local_lock:
+        fleet = _local['fleet'] if _local['expires'] > now else None
+
+    if fleet is None:
+        fleet = read_fleet()
+        with _local_lock:
+            _local['fleet'] = fleet
+            _local['expires'] = now + LOCAL_TTL
+
+    return fleet
@@ -0,0 +1,185 @@
+"""
+Golden Chrome profile template
+Clones a warmed profile (HTTP cache, service workers, login) into new drivers
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import subprocess
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, clones/refreshes are not serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Marker written last on refresh; its mtime is the template age
+READY_MARKER = '.template_ready'
+
+# Files Chrome uses to claim a running profile - never part of a snapshot
+SKIP_NAMES = {
+    'SingletonLock',
+    'SingletonCookie',
+    'SingletonSocket',
+    'DevToolsActivePort',
+    'lockfile',
+    'Crashpad',
+}
+
+
+class ProfileTemplate:
+    """
+    A "golden" Chrome user-data-dir that drivers are cloned from.
+
+    Clones take a shared lock and refreshes an exclusive one, so a refresh
+    never swaps the directory out from under a clone in progress.
+    """
+
+    def __init__(self, template_dir, max_age=0):
+        """
+        Args:
+            template_dir: Directory holding the golden profile
+            max_age: Seconds before the template is considered stale
+                     (0 = never refresh automatically)
+        """
+        self.template_dir = os.path.abspath(str(template_dir))
+        self.max_age = max_age
+        self.lock_path = self.template_dir + '.lock'
+
+    def exists(self):
+        """True if a complete snapshot is available"""
+        return os.path.isfile(os.path.join(self.template_dir, READY_MARKER))
+
+    def age(self):
+        """Seconds since the last refresh (None if there is no template)"""
+        try:
+            return time.time() - os.path.getmtime(os.path.join(self.template_dir, READY_MARKER))
+        except OSError:
+            return None
+
+    def is_stale(self):
+        """True if auto-refresh is enabled and the template is missing or too old"""
+        if not self.max_age:
+            return False
+        age = self.age()
+        return age is None or age > self.max_age
+
+    @contextmanager
+    def _lock(self, exclusive=False):
+        """Advisory lock on the template (no-op where fcntl is unavailable)"""
+        if fcntl is None:
+            yield
+            return
+
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def clone_to(self, dest):
+        """
+        Replace dest with a copy of the template.
+
+        Returns:
+            bool: True if the profile was cloned
+        """
+        with self._lock():
+            if not self.exists():
+                return False
+
+            start = time.time()
+            if os.path.exists(dest):
+                shutil.rmtree(dest, ignore_errors=True)
+            method = _copy_tree(self.template_dir, dest)
+
+        logger.info(f"Cloned profile template into {dest} ({method}, {time.time() - start:.2f}s)")
+        return True
+
+    def refresh_from(self, source, force=False):
+        """
+        Snapshot a profile directory into the template.
+        The source profile must not be in use by a running Chrome.
+
+        Returns:
+            bool: True if the template was replaced
+        """
+        source = os.path.abspath(str(source))
+        if not os.path.isdir(source):
+            logger.warning(f"Cannot refresh template, {source} does not exist")
+            return False
+
+        with self._lock(exclusive=True):
+            # Another process may have refreshed while we waited for the lock
+            if not force and self.exists() and not self.is_stale():
+                return False
+
+            staging = f'{self.template_dir}.tmp-{os.getpid()}'
+            retired = f'{self.template_dir}.old-{os.getpid()}'
+            shutil.rmtree(staging, ignore_errors=True)
+
+            shutil.copytree(
+                source, staging, symlinks=True,
+                ignore=shutil.ignore_patterns(*SKIP_NAMES)
+            )
+            open(os.path.join(staging, READY_MARKER), 'w').close()
+
+            if os.path.exists(self.template_dir):
+                os.rename(self.template_dir, retired)
+            os.rename(staging, self.template_dir)
+            shutil.rmtree(retired, ignore_errors=True)
+
+        logger.info(f"Profile template refreshed from {source}")
+        return True
+
+
+def _copy_tree(src, dst):
+    """
+    Copy a profile directory, using copy-on-write clones when the
+    filesystem supports them (btrfs/XFS reflinks, APFS clonefile).
+
+    Hardlinks are deliberately not used: Chrome rewrites its SQLite and
+    LevelDB files in place, which would write through to the template.
+
+    Returns:
+        str: Copy method used
+    """
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+
+    if sys.platform.startswith('linux'):
+        cmd = ['cp', '-a', '--reflink=auto', src, dst]
+    elif sys.platform == 'darwin':
+        cmd = ['cp', '-c', '-R', src, dst]
+    else:
+        cmd = None
+
+    if cmd:
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
+            return ' '.join(cmd[:3])
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.debug(f"Copy-on-write clone failed, falling back to copy: {e}")
+            shutil.rmtree(dst, ignore_errors=True)
+
+    shutil.copytree(src, dst, symlinks=True)
+    return 'copy'
+
+
+if __name__ == '__main__':
+    # Seed the template from a profile you logged into manually:
+    #   python -m app.services.profile_template chrome_profiles/login
+    from config.settings import CHROME_PROFILE_TEMPLATE_DIR
+
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) != 2:
+        print("Usage: python -m app.services.profile_template <profile_dir>")
+        sys.exit(1)
+
+    ProfileTemplate(CHROME_PROFILE_TEMPLATE_DIR).refresh_from(sys.argv[1], force=True)
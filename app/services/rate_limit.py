@@ -0,0 +1,124 @@
+"""
+Scrape rate limiter shared by all workers
+
+Token buckets in Redis, checked and taken atomically by one Lua script:
+
+- global: every scrape in the cluster (RATE_LIMIT_PER_HOUR)
+- session: one browser profile directory, i.e. one X session
+  (RATE_LIMIT_SESSION_PER_HOUR)
+- profile: one target username (RATE_LIMIT_PROFILE_PER_HOUR)
+
+A scrape takes a token from each of its buckets or from none. When one is
+empty, acquire() returns the seconds until all of them have a token again,
+and the task is re-queued for that moment instead of failing.
+"""
+import random
+import logging
+
+from app.services import metrics
+from app.services.redis_client import get_redis
+from config.settings import (
+    RATE_LIMIT_ENABLED, RATE_LIMIT_PER_HOUR, RATE_LIMIT_BURST,
+    RATE_LIMIT_SESSION_PER_HOUR, RATE_LIMIT_PROFILE_PER_HOUR
+)
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'ratelimit:'
+
+# KEYS: one hash per bucket ({tokens, ts}); ARGV: per bucket, tokens per
+# second and capacity. Time comes from the Redis server, so worker clocks
+# do not matter. Returns {0, -1} when the tokens were taken, else
+# {milliseconds until every bucket has one, index of the slowest bucket}.
+TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+
+local tokens = {}
+local wait, slowest = 0, -1
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1]) / 1000
+    local capacity = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    tokens[i] = level
+    if level < 1 then
+        local needed = math.ceil((1 - level) / rate)
+        if needed > wait then
+            wait, slowest = needed, i - 1
+        end
+    end
+end
+
+if wait > 0 then
+    return {wait, slowest}
+end
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1]) / 1000
+    local capacity = tonumber(ARGV[2 * i])
+    redis.call('HSET', key, 'tokens', tokens[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate) + 1000)
+end
+return {0, -1}
+"""
+
+_script = None
+
+
+def buckets(username, session=None):
+    """
+    (scope, key, tokens per hour, capacity) of the buckets a scrape of
+    username takes from; the session bucket only once a driver is known.
+    """
+    result = [('global', f'{KEY_PREFIX}global', RATE_LIMIT_PER_HOUR, RATE_LIMIT_BURST)]
+    if session:
+        result.append(('session', f'{KEY_PREFIX}session:{session}',
+                       RATE_LIMIT_SESSION_PER_HOUR, RATE_LIMIT_BURST))
+    result.append(('profile', f'{KEY_PREFIX}profile:{username.lower()}', RATE_LIMIT_PROFILE_PER_HOUR, 1))
+    return [bucket for bucket in result if bucket[2] > 0]  # 0: unlimited
+
+
+def acquire(username, session=None):
+    """
+    Take one token from every bucket of this scrape, or none.
+
+    Returns:
+        tuple: (seconds to wait, limiting scope); (0, None) when the scrape
+        may run now. Fails open (0, None) if Redis is unavailable.
+    """
+    global _script
+
+    limits = buckets(username, session)
+    if not RATE_LIMIT_ENABLED or not limits:
+        return 0, None
+
+    args = []
+    for _, _, per_hour, capacity in limits:
+        args += [per_hour / 3600, capacity]
+
+    try:
+        if _script is None:
+            _script = get_redis().register_script(TOKEN_BUCKET_LUA)
+        wait_ms, index = _script(keys=[key for _, key, _, _ in limits], args=args)
+    except Exception as e:
+        logger.warning(f"Rate limiter unavailable, not limiting @{username}: {e}")
+        return 0, None
+
+    if not wait_ms:
+        return 0, None
+
+    scope = limits[int(index)][0]
+    metrics.SCRAPES_RATE_LIMITED.labels(scope=scope).inc()
+    return wait_ms / 1000, scope
+
+
+def countdown(wait):
+    """
+    Delay before a rate-limited task runs again: the exact wait plus up to
+    one global token interval of jitter, so tasks limited at the same
+    moment do not all come back for the same token.
+    """
+    return wait + random.uniform(0, 3600 / max(RATE_LIMIT_PER_HOUR, 1))
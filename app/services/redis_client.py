@@ -0,0 +1,29 @@
+"""
+Shared Redis client
+"""
+from threading import Lock
+
+_client = None
+_client_lock = Lock()
+
+
+def get_redis():
+    """
+    Get the process-wide Redis client (connection-pooled, thread-safe).
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import redis
+                from config.settings import REDIS_URL
+
+                _client = redis.Redis.from_url(
+                    REDIS_URL,
+                    socket_timeout=2,
+                    socket_connect_timeout=2,
+                    decode_responses=True
+                )
+
+    return _client
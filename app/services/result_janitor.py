@@ -0,0 +1,151 @@
+"""
+Result backend janitor
+
+Celery result keys (celery-task-meta-<id>) normally expire after
+result_expires, but keys written without a TTL (older settings, manual
+writes, backend errors) stay forever and Redis memory only grows. A
+periodic task walks the keys with SCAN, in batches of pipelined commands,
+and:
+
+- deletes keys without a TTL holding a finished result (READY_STATES)
+  older than max_age
+- gives the other finished results without a TTL the rest of their max_age
+- caps TTLs longer than max_age
+
+Keys of tasks still in flight (PENDING, STARTED, PROGRESS, RETRY) have no
+date_done and are never deleted: their progress is what pollers read.
+"""
+import json
+import logging
+from datetime import datetime, timezone
+
+from celery import states
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+
+def sweep(client, prefix, max_age, batch_size=500):
+    """
+    Expire stale result keys.
+
+    Args:
+        client: Redis client of the result backend
+        prefix: Key prefix of task results (e.g. 'celery-task-meta-')
+        max_age: Seconds a result is kept (result_expires, > 0; with 0
+                 Celery keeps results forever and there is nothing to sweep)
+        batch_size: Keys per SCAN page and per pipeline
+
+    Returns:
+        dict: scanned, deleted, expired (TTL set or capped) and
+        reclaimed_bytes (memory of the deleted keys), plus used_memory
+        before and after the sweep
+    """
+    if not max_age or max_age < 0:
+        raise ValueError(f"max_age must be positive, got {max_age!r}")
+
+    stats = {'scanned': 0, 'deleted': 0, 'expired': 0, 'reclaimed_bytes': 0}
+    used_before = _used_memory(client)
+    now = datetime.now(timezone.utc)
+
+    for keys in _scan(client, f'{prefix}*', batch_size):
+        stats['scanned'] += len(keys)
+
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.ttl(key)
+        ttls = pipe.execute()
+
+        # ttl -1: no expiry; -2: expired since SCAN returned it
+        persistent = [key for key, ttl in zip(keys, ttls) if ttl == -1]
+        capped = [key for key, ttl in zip(keys, ttls) if ttl > max_age]
+        delete, expire = _split_by_age(client, persistent, max_age, now)
+        expire += [(key, max_age) for key in capped]
+
+        if delete:
+            stats['reclaimed_bytes'] += sum(_sizes(client, delete))
+
+        pipe = client.pipeline(transaction=False)
+        if delete:
+            pipe.unlink(*delete)
+        for key, ttl in expire:
+            pipe.expire(key, ttl)
+        pipe.execute()
+
+        stats['deleted'] += len(delete)
+        stats['expired'] += len(expire)
+
+    stats['used_memory_before'] = used_before
+    stats['used_memory_after'] = _used_memory(client)
+    return stats
+
+
+def _scan(client, pattern, batch_size):
+    """SCAN pages of keys matching pattern (never blocks Redis like KEYS)"""
+    cursor = 0
+    while True:
+        cursor, keys = client.scan(cursor=cursor, match=pattern, count=batch_size)
+        if keys:
+            yield keys
+        if not cursor:
+            break
+
+
+def _split_by_age(client, keys, max_age, now):
+    """
+    Keys without TTL -> (keys to delete, [(key, ttl)] to expire), by the
+    date_done of finished results. Keys of unfinished tasks, or whose
+    result cannot be read, are in neither list.
+    """
+    if not keys:
+        return [], []
+
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.get(key)
+
+    delete, expire = [], []
+    for key, value in zip(keys, pipe.execute()):
+        age = _finished_age(value, now)
+        if age is None:
+            continue
+        if age >= max_age:
+            delete.append(key)
+        else:
+            expire.append((key, int(max_age - age) + 1))
+    return delete, expire
+
+
+def _finished_age(value, now):
+    """Seconds since a finished (READY_STATES) result was stored, else None"""
+    try:
+        meta = json.loads(value)
+        if meta.get('status') not in states.READY_STATES:
+            return None
+        done = datetime.fromisoformat(meta['date_done'])
+    except (TypeError, ValueError, KeyError, AttributeError):
+        return None
+    if done.tzinfo is None:
+        done = done.replace(tzinfo=timezone.utc)  # enable_utc
+    return (now - done).total_seconds()
+
+
+def _sizes(client, keys):
+    """Bytes used by each key: MEMORY USAGE, or the value length without it"""
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.memory_usage(key)
+    try:
+        return [size or 0 for size in pipe.execute()]
+    except ResponseError:
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.strlen(key)
+        return pipe.execute()
+
+
+def _used_memory(client):
+    try:
+        return client.info('memory').get('used_memory')
+    except Exception:
+        return None
@@ -2,18 +2,255 @@
 Twitter Scraper Service - Refactored for DriverPool compatibility
 Based on original twitter_web_app (5).py but optimized for concurrent use
 """
-import sqlite3
+import json
 import time
 import logging
+from contextlib import contextmanager
 from datetime import datetime
 from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from config.settings import DATABASE_PATH, MAX_TWEETS_PER_SCRAPE
+from selenium.common.exceptions import (
+    WebDriverException, TimeoutException, InvalidSessionIdException, NoSuchWindowException
+)
+from app.services import metrics as prometheus_metrics
+from app.storage import get_storage
+from config.settings import (
+    MAX_TWEETS_PER_SCRAPE, SCRAPE_SCROLL_COUNT, SCRAPE_SCROLL_DELAY, SCRAPE_PROGRESS_SCROLLS
+)
 
 logger = logging.getLogger(__name__)
 
+# Column order of the tweet rows in a collected batch (see collect_profile)
+BATCH_TWEET_FIELDS = (
+    'tweet_id', 'text', 'tweet_url', 'language', 'likes',
+    'retweets', 'replies', 'is_retweet', 'original_author'
+)
+
+# Error classes of failed scrapes ('error_class' of batches and results);
+# scrape_profile_task picks its retry policy from them
+ERROR_TRANSIENT = 'transient'        # network errors and timeouts
+ERROR_DRIVER = 'driver'              # the browser session is gone
+ERROR_AUTH_WALL = 'auth_wall'        # X asks to log in
+ERROR_RATE_LIMITED = 'rate_limited'  # X throttles us
+ERROR_EMPTY = 'empty_timeline'       # page loaded without tweets (no posts, protected, suspended)
+ERROR_UNKNOWN = 'unknown'
+
+# Lowercase messages of WebDriver errors after which the driver is unusable
+DEAD_DRIVER_MARKERS = (
+    'invalid session id', 'session deleted', 'no such window', 'chrome not reachable',
+    'disconnected', 'target window already closed', 'tab crashed'
+)
+TRANSIENT_MARKERS = ('timeout', 'timed out', 'connection', 'net::err_', 'temporarily')
+
+# Page texts (lowercase) that explain an empty timeline
+RATE_LIMIT_TEXTS = ('rate limit exceeded', 'too many requests')
+TRANSIENT_TEXTS = ('something went wrong', 'algo salió mal')
+
+# First characters of the visible page text, read when no tweets were found
+PAGE_TEXT_JS = "return document.body ? document.body.innerText.slice(0, 3000) : '';"
+
+
+def classify_error(exc):
+    """Error class (ERROR_*) of an exception raised while scraping"""
+    message = str(exc).lower()
+    if isinstance(exc, (InvalidSessionIdException, NoSuchWindowException)):
+        return ERROR_DRIVER
+    if isinstance(exc, WebDriverException) and any(marker in message for marker in DEAD_DRIVER_MARKERS):
+        return ERROR_DRIVER
+    if isinstance(exc, (TimeoutException, TimeoutError, ConnectionError)):
+        return ERROR_TRANSIENT
+    if any(marker in message for marker in TRANSIENT_MARKERS):
+        return ERROR_TRANSIENT
+    return ERROR_UNKNOWN
+
+
+def classify_page_text(text):
+    """Error class of a timeline page that rendered no tweets"""
+    text = (text or '').lower()
+    if any(marker in text for marker in RATE_LIMIT_TEXTS):
+        return ERROR_RATE_LIMITED
+    if any(marker in text for marker in TRANSIENT_TEXTS):
+        return ERROR_TRANSIENT
+    return ERROR_EMPTY
+
+
+# Whole scroll phase as one async script: warm-up scrolls, progressive
+# scrolling until the page height is stable 3 times, back to top.
+# Resumable for progress reports: a chunk without warm-up continues from
+# opts.lastHeight/opts.stable, and only the last chunk (opts.final, or
+# the page stopped growing) scrolls back to top.
+# Returns [height, article_count] per progressive scroll.
+SCROLL_TIMELINE_JS = """
+const opts = arguments[0];
+const done = arguments[arguments.length - 1];
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+const countTweets = () => document.querySelectorAll('article[data-testid="tweet"]').length;
+
+(async () => {
+    const iterations = [];
+    let lastHeight = opts.lastHeight || 0;
+    let stable = opts.stable || 0;
+    try {
+        if (opts.warmupScrolls > 0) {
+            for (let i = 0; i < opts.warmupScrolls; i++) {
+                window.scrollBy(0, 500);
+                await sleep(opts.warmupDelay);
+            }
+            window.scrollTo(0, 0);
+            await sleep(opts.settleDelay);
+        }
+
+        let finished = opts.final;
+        for (let i = 0; i < opts.maxScrolls; i++) {
+            window.scrollBy(0, 1000);
+            await sleep(opts.scrollDelay);
+
+            const height = document.body.scrollHeight;
+            iterations.push([height, countTweets()]);
+            if (height === lastHeight) {
+                if (++stable >= 3) {
+                    finished = true;
+                    break;
+                }
+            } else {
+                stable = 0;
+                lastHeight = height;
+            }
+        }
+
+        if (finished) {
+            window.scrollTo(0, 0);
+            await sleep(opts.finalDelay);
+        }
+        done({iterations: iterations, error: null, lastHeight: lastHeight, stable: stable, finished: finished});
+    } catch (e) {
+        done({iterations: iterations, error: String(e), finished: true});
+    }
+})();
+"""
+
+# Tweet extraction as a compact array-of-arrays: header row, then one row
+# per tweet. Reposts are detected through the socialContext element
+# ("X reposted") rather than a full-text scan of every article.
+EXTRACT_TWEETS_JS = """
+const rows = [['tweet_id', 'username', 'text', 'language', 'likes', 'retweets', 'replies', 'is_retweet']];
+const articles = document.querySelectorAll('article[data-testid="tweet"]');
+
+articles.forEach(article => {
+    try {
+        let tweetId = null;
+        let foundUsername = null;
+        for (const link of article.querySelectorAll('a[href*="/status/"]')) {
+            const match = link.getAttribute('href').match(/\\/([^/]+)\\/status\\/(\\d+)/);
+            if (match) {
+                foundUsername = match[1];
+                tweetId = match[2];
+                break;
+            }
+        }
+
+        if (!tweetId) return;
+
+        let text = '';
+        let lang = '';
+        const textDiv = article.querySelector('div[data-testid="tweetText"]');
+        if (textDiv) {
+            const spans = textDiv.querySelectorAll('span[lang]');
+            if (spans.length > 0) {
+                text = Array.from(spans).map(s => s.textContent).join(' ').trim();
+                lang = spans[0].getAttribute('lang') || '';
+            } else {
+                text = textDiv.textContent.trim();
+            }
+        }
+
+        if (!text || text.length <= 10) return;
+
+        let likes = 0, retweets = 0, replies = 0;
+        article.querySelectorAll('button[aria-label]').forEach(button => {
+            const ariaLabel = button.getAttribute('aria-label').toLowerCase();
+            const digits = ariaLabel.match(/\\d+/);
+            if (!digits) return;
+
+            const num = parseInt(digits[0]);
+            if (ariaLabel.includes('like') || ariaLabel.includes('me gusta')) {
+                likes = num;
+            } else if (ariaLabel.includes('repost') || ariaLabel.includes('retweet')) {
+                retweets = num;
+            } else if (ariaLabel.includes('repl') || ariaLabel.includes('respuesta')) {
+                replies = num;
+            }
+        });
+
+        // Reposts carry a linked socialContext; pinned tweets have an unlinked one
+        const context = article.querySelector('[data-testid="socialContext"]');
+        const isRetweet = !!(context && context.closest('a[href]'));
+
+        rows.push([tweetId, foundUsername, text, lang, likes, retweets, replies, isRetweet ? 1 : 0]);
+    } catch (e) {
+        console.error('Error processing article:', e);
+    }
+});
+
+return rows;
+"""
+
+
+class ScrapeMetrics:
+    """
+    Per-phase wall-clock timings and counters for one scrape_profile run.
+    """
+
+    PHASES = ('navigate', 'initial_wait', 'scroll', 'extract', 'persist')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = {}
+        self.articles_per_scroll = []
+        self.extract_bytes = 0
+        self._phase = None
+        self._phase_started = None
+
+    def start_phase(self, name):
+        """Start timing a phase (ends the current one)"""
+        self.end_phase()
+        self._phase = name
+        self._phase_started = time.perf_counter()
+
+    def end_phase(self):
+        """Stop timing the current phase; repeated phases accumulate"""
+        if self._phase is None:
+            return
+        elapsed = time.perf_counter() - self._phase_started
+        self.durations[self._phase] = self.durations.get(self._phase, 0.0) + elapsed
+        self._phase = None
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block as one phase"""
+        self.start_phase(name)
+        try:
+            yield
+        finally:
+            self.end_phase()
+
+    def total(self):
+        """Seconds since the scrape started"""
+        return time.perf_counter() - self.started
+
+    def as_dict(self):
+        """JSON-serializable snapshot (seconds rounded to microseconds)"""
+        self.end_phase()
+        return {
+            'durations': {name: round(seconds, 6) for name, seconds in self.durations.items()},
+            'total': round(self.total(), 6),
+            'scroll_iterations': len(self.articles_per_scroll),
+            'articles_per_scroll': self.articles_per_scroll,
+            'extract_bytes': self.extract_bytes
+        }
+
 
 class TwitterScraperService:
     """
@@ -21,6 +258,10 @@ class TwitterScraperService:
     Thread-safe and designed for concurrent use.
     """
 
+    # Fixed waits around page load (seconds); the offline benchmarks zero them
+    INITIAL_LOAD_WAIT = 8
+    TWEETS_SETTLE_WAIT = 12
+
     def __init__(self, driver=None):
         """
         Initialize scraper.
@@ -32,70 +273,9 @@ class TwitterScraperService:
         self.init_database()
 
     def init_database(self):
-        """Initialize database tables"""
+        """Create or migrate the schema; checked once per process (Storage.ensure_schema)"""
         try:
-            conn = sqlite3.connect(str(DATABASE_PATH))
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS profiles (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    profile_url TEXT,
-                    scrape_interval_hours INTEGER DEFAULT 12,
-                    last_scraped TIMESTAMP,
-                    is_active BOOLEAN DEFAULT 1,
-                    added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tweets (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    profile_id INTEGER,
-                    tweet_id TEXT UNIQUE,
-                    tweet_text TEXT,
-                    tweet_url TEXT,
-                    author TEXT,
-                    timestamp TEXT,
-                    language TEXT,
-                    likes INTEGER DEFAULT 0,
-                    retweets INTEGER DEFAULT 0,
-                    replies INTEGER DEFAULT 0,
-                    is_retweet BOOLEAN DEFAULT 0,
-                    original_author TEXT,
-                    scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (profile_id) REFERENCES profiles (id)
-                )
-            """)
-
-            # Add columns if they don't exist
-            try:
-                cursor.execute("ALTER TABLE tweets ADD COLUMN is_retweet BOOLEAN DEFAULT 0")
-            except sqlite3.OperationalError:
-                pass
-
-            try:
-                cursor.execute("ALTER TABLE tweets ADD COLUMN original_author TEXT")
-            except sqlite3.OperationalError:
-                pass
-
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS scrape_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    profile_id INTEGER,
-                    status TEXT,
-                    tweets_found INTEGER,
-                    tweets_new INTEGER,
-                    error_message TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (profile_id) REFERENCES profiles (id)
-                )
-            """)
-
-            conn.commit()
-            conn.close()
-            logger.info(f"Database initialized: {DATABASE_PATH}")
+            get_storage().ensure_schema()
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
             raise
@@ -103,117 +283,51 @@ class TwitterScraperService:
     def extract_tweet_data_from_dom_full(self, username):
         """
         Extract complete tweet data directly from DOM using JavaScript.
+
+        The script returns a compact array-of-arrays (header row first);
+        tweet URLs and original authors are derived here instead of being
+        serialized for every tweet.
+
+        Returns:
+            tuple: (dict of tweet_id -> tweet data, list of tweet_ids in page order)
         """
+        self.last_extract_bytes = 0
+
         try:
             if not self.driver:
                 return {}, []
 
             logger.debug("Extracting tweets from DOM using JavaScript...")
 
-            extract_js = """
-            (function() {
-                const tweetData = {};
-                const articles = document.querySelectorAll('article[data-testid="tweet"]');
-
-                articles.forEach((article, index) => {
-                    try {
-                        const links = article.querySelectorAll('a[href*="/status/"]');
-                        let tweetId = null;
-                        let tweetUrl = null;
-                        let foundUsername = null;
-
-                        for (let link of links) {
-                            const href = link.getAttribute('href');
-                            if (href && href.includes('/status/')) {
-                                const match = href.match(/\\/([^/]+)\\/status\\/(\\d+)/);
-                                if (match) {
-                                    foundUsername = match[1];
-                                    tweetId = match[2];
-                                    tweetUrl = href.startsWith('http') ? href : 'https://x.com' + href;
-                                    break;
-                                }
-                            }
-                        }
-
-                        if (!tweetId) return;
-
-                        let text = '';
-                        let lang = '';
-                        const textDiv = article.querySelector('div[data-testid="tweetText"]');
-                        if (textDiv) {
-                            const spans = textDiv.querySelectorAll('span[lang]');
-                            if (spans.length > 0) {
-                                text = Array.from(spans).map(s => s.textContent).join(' ').trim();
-                                lang = spans[0].getAttribute('lang') || '';
-                            } else {
-                                text = textDiv.textContent.trim();
-                            }
-                        }
-
-                        let likes = 0, retweets = 0, replies = 0;
-                        const buttons = article.querySelectorAll('button');
-                        buttons.forEach(button => {
-                            const ariaLabel = button.getAttribute('aria-label') || '';
-                            const digits = ariaLabel.match(/\\d+/);
-                            if (digits) {
-                                const num = parseInt(digits[0]);
-                                if (ariaLabel.toLowerCase().includes('like') || ariaLabel.toLowerCase().includes('me gusta')) {
-                                    likes = num;
-                                } else if (ariaLabel.toLowerCase().includes('repost') || ariaLabel.toLowerCase().includes('retweet')) {
-                                    retweets = num;
-                                } else if (ariaLabel.toLowerCase().includes('repl') || ariaLabel.toLowerCase().includes('respuesta')) {
-                                    replies = num;
-                                }
-                            }
-                        });
-
-                        let isRetweet = false;
-                        let originalAuthor = null;
-                        const articleText = article.textContent.toLowerCase();
-                        if (articleText.includes('retweeted') || articleText.includes('retuiteado') || articleText.includes('retweet')) {
-                            isRetweet = true;
-                            const authorLinks = article.querySelectorAll('a[href^="/"]');
-                            for (let link of authorLinks) {
-                                const href = link.getAttribute('href');
-                                if (href && !href.includes('/status/') && !href.includes('/i/')) {
-                                    const match = href.match(/\\/([^/]+)/);
-                                    if (match && match[1] !== foundUsername) {
-                                        originalAuthor = match[1];
-                                        break;
-                                    }
-                                }
-                            }
-                        }
-
-                        if (text && text.length > 10) {
-                            tweetData[tweetId] = {
-                                username: foundUsername || '""" + username + """',
-                                full_path: (foundUsername || '""" + username + """') + '/status/' + tweetId,
-                                href: tweetUrl || 'https://x.com/' + (foundUsername || '""" + username + """') + '/status/' + tweetId,
-                                text: text,
-                                language: lang,
-                                likes: likes,
-                                retweets: retweets,
-                                replies: replies,
-                                is_retweet: isRetweet,
-                                original_author: originalAuthor
-                            };
-                        }
-                    } catch (e) {
-                        console.error('Error processing article:', e);
-                    }
-                });
-
-                return tweetData;
-            })();
-            """
-
-            tweet_data_dict = self.driver.execute_script(extract_js)
-            if not tweet_data_dict:
+            rows = self.driver.execute_script(EXTRACT_TWEETS_JS)
+            if not rows or len(rows) < 2:
                 return {}, []
 
+            self.last_extract_bytes = len(json.dumps(rows, ensure_ascii=False).encode('utf-8'))
+
+            columns = {name: index for index, name in enumerate(rows[0])}
+            tweet_data_dict = {}
+            for row in rows[1:]:
+                tweet_id = row[columns['tweet_id']]
+                author = row[columns['username']] or username
+                is_retweet = bool(row[columns['is_retweet']])
+
+                tweet_data_dict[tweet_id] = {
+                    'username': author,
+                    'href': f"https://x.com/{author}/status/{tweet_id}",
+                    'text': row[columns['text']],
+                    'language': row[columns['language']],
+                    'likes': row[columns['likes']],
+                    'retweets': row[columns['retweets']],
+                    'replies': row[columns['replies']],
+                    'is_retweet': is_retweet,
+                    # The status link of a repost points at the original author
+                    'original_author': author if is_retweet and author.lower() != username.lower() else None
+                }
+
             tweet_ids = list(tweet_data_dict.keys())
-            logger.info(f"JavaScript extracted {len(tweet_ids)} tweets from DOM")
+            logger.info(f"JavaScript extracted {len(tweet_ids)} tweets from DOM "
+                        f"({self.last_extract_bytes} bytes)")
 
             return tweet_data_dict, tweet_ids
 
@@ -221,242 +335,285 @@ class TwitterScraperService:
             logger.error(f"Error extracting from DOM: {e}", exc_info=True)
             return {}, []
 
-    def scrape_profile(self, username, max_tweets=None):
+    def scroll_timeline(self, max_scrolls=None, scroll_delay=None, progress=None):
+        """
+        Scroll the timeline to load tweets.
+        The whole loop runs inside the page, so it costs one WebDriver
+        round trip instead of three per scroll, and progress is reported
+        once it ends. With SCRAPE_PROGRESS_SCROLLS > 0 and a progress
+        callback it runs in chunks of that many scrolls, reporting after
+        each one at the cost of two more WebDriver calls per chunk.
+
+        Args:
+            max_scrolls: Progressive scrolls (default from settings)
+            scroll_delay: Seconds to wait after each scroll (default from settings)
+            progress: Optional callback, see collect_profile
+
+        Returns:
+            list: [page_height, article_count] per scroll iteration
+        """
+        if max_scrolls is None:
+            max_scrolls = SCRAPE_SCROLL_COUNT
+        if scroll_delay is None:
+            scroll_delay = SCRAPE_SCROLL_DELAY
+
+        chunk = SCRAPE_PROGRESS_SCROLLS if progress and SCRAPE_PROGRESS_SCROLLS > 0 else max_scrolls
+        iterations = []
+        result = {}
+
+        while True:
+            remaining = max_scrolls - len(iterations)
+            opts = {
+                'warmupScrolls': 0 if iterations else 3,
+                'warmupDelay': 3000,
+                'settleDelay': 8000,
+                'maxScrolls': min(chunk, remaining),
+                'scrollDelay': int(scroll_delay * 1000),
+                'finalDelay': 10000,
+                'final': remaining <= chunk,
+                'lastHeight': result.get('lastHeight', 0),
+                'stable': result.get('stable', 0),
+            }
+            budget_ms = (opts['warmupScrolls'] * opts['warmupDelay'] + opts['settleDelay']
+                         + opts['maxScrolls'] * opts['scrollDelay'] + opts['finalDelay'])
+
+            try:
+                self.driver.set_script_timeout(budget_ms / 1000 + 30)
+                result = self.driver.execute_async_script(SCROLL_TIMELINE_JS, opts) or {}
+            except Exception as e:
+                logger.warning(f"Error during scrolling: {e}")
+                return iterations
+
+            iterations += result.get('iterations') or []
+            if progress and iterations:
+                progress('scroll', tweets=iterations[-1][1], iteration=len(iterations), iterations=max_scrolls)
+            if result.get('finished', True) or len(iterations) >= max_scrolls:
+                break
+
+        for i, (height, count) in enumerate(iterations):
+            logger.debug(f"Scroll {i+1}/{max_scrolls} - Height: {height} - Tweets: {count}")
+
+        if result.get('error'):
+            logger.warning(f"Error during scroll {len(iterations)+1}: {result['error']}")
+        elif len(iterations) < max_scrolls:
+            logger.info("No more content, stopping scrolls")
+
+        return iterations
+
+    def scrape_profile(self, username, max_tweets=None, progress=None):
         """
-        Scrape a Twitter/X profile.
+        Scrape a Twitter/X profile and save it to the database.
 
         Args:
             username: Twitter username (without @)
             max_tweets: Maximum tweets to scrape (default from settings)
 
         Returns:
-            dict: {'status': 'success'|'error', 'tweets_found': int, 'tweets_new': int}
+            dict: {'status': 'success'|'error', 'tweets_found': int, 'tweets_new': int,
+                   'metrics': per-phase timings and counters (see ScrapeMetrics),
+                   'error_class': ERROR_* on errors}
+        """
+        batch = self.collect_profile(username, max_tweets=max_tweets, progress=progress)
+        if not batch['log']:
+            return {"status": "error", "message": batch['message'], "metrics": batch['metrics'],
+                    "error_class": batch['error_class']}
+
+        try:
+            if progress:
+                progress('persist', tweets=batch['tweets_found'])
+            return self.persist_batches([batch])[0]
+        except Exception as e:
+            logger.error(f"Error saving scrape of @{username}: {e}", exc_info=True)
+            return {"status": "error", "message": str(e), "metrics": batch['metrics'],
+                    "error_class": classify_error(e)}
+
+    def collect_profile(self, username, max_tweets=None, progress=None):
+        """
+        Browser part of a scrape: load the profile, scroll and extract.
+        Does not touch the database; the returned batch is saved with
+        persist_batches (directly or through the write-behind queue).
+
+        progress, if given, is called as progress(phase, **info) when a
+        phase starts ('navigate', 'initial_wait', 'scroll', 'extract') and
+        after scroll chunks, with info among tweets (loaded so far),
+        iteration and iterations (scrolls done / planned).
+
+        Returns:
+            dict: batch with 'username', 'status', 'message', 'tweets'
+                  (rows in BATCH_TWEET_FIELDS order), 'tweets_found',
+                  'collected_at', 'metrics', 'error_class' (ERROR_*, None on
+                  success) and 'log' (False when there is nothing to record
+                  in scrape_logs)
         """
         if max_tweets is None:
             max_tweets = MAX_TWEETS_PER_SCRAPE
 
         url = f"https://x.com/{username}"
+        metrics = ScrapeMetrics()
+        report = progress or (lambda phase, **info: None)
+
+        def batch(status, message='', tweets=(), log=True, error_class=None):
+            return {
+                'username': username,
+                'status': status,
+                'message': message,
+                'error_class': error_class if status == 'error' else None,
+                'tweets': list(tweets),
+                'tweets_found': len(tweets),
+                'collected_at': datetime.now().isoformat(),
+                'metrics': metrics.as_dict(),
+                'log': log
+            }
 
         logger.info(f"Starting scrape for @{username}")
 
         try:
             if not self.driver:
-                return {"status": "error", "message": "No driver available"}
+                return batch('error', "No driver available", log=False, error_class=ERROR_DRIVER)
 
             # Navigate to profile
-            self.driver.get(url)
-            logger.info(f"Waiting for initial load of @{username}...")
-            time.sleep(8)
-
-            # Check if login required
-            if "login" in self.driver.current_url or "i/flow/login" in self.driver.current_url:
-                return {"status": "error", "message": "Authentication required"}
-
-            # Wait for tweets to load
-            wait = WebDriverWait(self.driver, 20)
-            try:
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "article[data-testid='tweet']")))
-                logger.info("Tweets detected on page")
-            except:
-                logger.warning("No tweets detected with data-testid='tweet'")
-
-            time.sleep(12)
-
-            # Do scrolling to load more tweets
-            logger.info("Scrolling to load tweets...")
-            for i in range(3):
+            report('navigate')
+            with metrics.phase('navigate'):
+                self.driver.get(url)
+
+            report('initial_wait')
+            with metrics.phase('initial_wait'):
+                logger.info(f"Waiting for initial load of @{username}...")
+                time.sleep(self.INITIAL_LOAD_WAIT)
+
+                # Check if login required
+                current_url = self.driver.current_url
+                if "login" in current_url or "i/flow/login" in current_url:
+                    return batch('error', "Authentication required", log=False, error_class=ERROR_AUTH_WALL)
+
+                # Wait for tweets to load
+                wait = WebDriverWait(self.driver, 20)
                 try:
-                    self.driver.execute_script("window.scrollBy(0, 500);")
-                    time.sleep(3)
-                except Exception as e:
-                    logger.warning(f"Error during scroll {i+1}: {e}")
-                    break
-
-            # Scroll back to top
-            try:
-                self.driver.execute_script("window.scrollTo(0, 0);")
-                time.sleep(8)
-            except Exception as e:
-                logger.warning(f"Error scrolling to top: {e}")
+                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "article[data-testid='tweet']")))
+                    logger.info("Tweets detected on page")
+                except:
+                    logger.warning("No tweets detected with data-testid='tweet'")
 
-            # Progressive scrolling
-            logger.info("Progressive scrolling to load more tweets...")
-            last_height = 0
-            scroll_attempts = 0
-            max_scrolls = 15
+                time.sleep(self.TWEETS_SETTLE_WAIT)
 
-            for i in range(max_scrolls):
-                try:
-                    self.driver.execute_script("window.scrollBy(0, 1000);")
-                    time.sleep(6)
-
-                    new_height = self.driver.execute_script("return document.body.scrollHeight")
-                    if new_height == last_height:
-                        scroll_attempts += 1
-                        if scroll_attempts >= 3:
-                            logger.info("No more content, stopping scrolls")
-                            break
-                    else:
-                        scroll_attempts = 0
-                        last_height = new_height
-
-                    current_count = self.driver.execute_script(
-                        'return document.querySelectorAll(\'article[data-testid="tweet"]\').length;'
-                    )
-                    logger.debug(f"Scroll {i+1}/{max_scrolls} - Height: {new_height} - Tweets: {current_count}")
-
-                except Exception as e:
-                    logger.warning(f"Error during scroll {i+1}: {e}")
-                    break
-
-            # Scroll back to top to process recent tweets
-            logger.info("Scrolling back to top to process tweets...")
-            try:
-                self.driver.execute_script("window.scrollTo(0, 0);")
-                time.sleep(10)
-            except Exception as e:
-                logger.warning(f"Error scrolling to top: {e}")
+            # Scroll to load more tweets (single round trip, runs in the page)
+            report('scroll', iteration=0, iterations=SCRAPE_SCROLL_COUNT)
+            with metrics.phase('scroll'):
+                logger.info("Scrolling to load tweets...")
+                iterations = self.scroll_timeline(progress=progress)
+            metrics.articles_per_scroll = [count for _, count in iterations]
 
             # Extract tweets from DOM
-            logger.info("Extracting tweets from DOM...")
-            tweet_data_dict_full, tweet_ids_full = self.extract_tweet_data_from_dom_full(username)
+            report('extract', tweets=iterations[-1][1] if iterations else 0)
+            with metrics.phase('extract'):
+                logger.info("Extracting tweets from DOM...")
+                tweet_data_dict_full, tweet_ids_full = self.extract_tweet_data_from_dom_full(username)
+            metrics.extract_bytes = self.last_extract_bytes
 
             if not tweet_ids_full:
-                logger.warning("No tweets found")
-
-                # Log error
-                conn = sqlite3.connect(str(DATABASE_PATH))
-                cursor = conn.cursor()
-                cursor.execute("SELECT id FROM profiles WHERE username = ?", (username,))
-                result = cursor.fetchone()
-                profile_id = result[0] if result else None
-                conn.close()
-
-                error_msg = "No tweets found in DOM"
-
-                if profile_id:
-                    conn = sqlite3.connect(str(DATABASE_PATH))
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        INSERT INTO scrape_logs (profile_id, status, error_message)
-                        VALUES (?, ?, ?)
-                    """, (profile_id, 'error', error_msg))
-                    conn.commit()
-                    conn.close()
-
-                return {"status": "error", "message": error_msg}
+                # One more round trip, only on failure: why is the timeline empty?
+                error_class = classify_page_text(self.driver.execute_script(PAGE_TEXT_JS))
+                logger.warning(f"No tweets found ({error_class})")
+                return batch('error', "No tweets found in DOM", error_class=error_class)
 
             logger.info(f"Found {len(tweet_ids_full)} tweets")
 
-            # Limit to max_tweets
-            tweet_ids = tweet_ids_full[:max_tweets]
-
-            # Save to database
-            conn = sqlite3.connect(str(DATABASE_PATH))
-            cursor = conn.cursor()
-            cursor.execute("SELECT id FROM profiles WHERE username = ?", (username,))
-            result = cursor.fetchone()
-            if not result:
-                conn.close()
-                return {"status": "error", "message": "Profile not found in database"}
-            profile_id = result[0]
-
-            tweets_found = 0
-            tweets_new = 0
+            # Limit to max_tweets, drop duplicates, empty texts and translations
+            rows = []
             seen_ids = set()
-
-            logger.info(f"Processing {len(tweet_ids)} tweets...")
-            for idx, tweet_id in enumerate(tweet_ids):
-                try:
-                    if tweet_id in seen_ids:
-                        continue
-                    seen_ids.add(tweet_id)
-
-                    # Check if exists
-                    cursor.execute("SELECT id FROM tweets WHERE tweet_id = ?", (tweet_id,))
-                    if cursor.fetchone():
-                        if idx < 10:
-                            logger.debug(f"Tweet {idx+1}: Already in DB (ID: {tweet_id})")
-                        continue
-
-                    # Get tweet data
-                    if tweet_id not in tweet_data_dict_full:
-                        continue
-
-                    tweet_data = tweet_data_dict_full[tweet_id]
-                    text = tweet_data.get('text', '').strip()
-                    lang = tweet_data.get('language', '')
-                    likes = tweet_data.get('likes', 0)
-                    retweets = tweet_data.get('retweets', 0)
-                    replies = tweet_data.get('replies', 0)
-                    is_retweet = tweet_data.get('is_retweet', False)
-                    original_author = tweet_data.get('original_author', None)
-                    tweet_url = tweet_data.get('href', f"https://x.com/{username}/status/{tweet_id}")
-
-                    # Validate
-                    if not text or len(text) < 10:
-                        continue
-
-                    if "Traducido de" in text or "Translated from" in text:
-                        continue
-
-                    tweets_found += 1
-
-                    # Insert
-                    cursor.execute("""
-                        INSERT INTO tweets (profile_id, tweet_id, tweet_text, tweet_url, author, timestamp, language, likes, retweets, replies, is_retweet, original_author)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        profile_id, tweet_id, text, tweet_url, username,
-                        datetime.now().isoformat(), lang, likes, retweets, replies,
-                        is_retweet, original_author
-                    ))
-                    tweets_new += 1
-
-                    rt_indicator = " [RT]" if is_retweet else ""
-                    if is_retweet and original_author:
-                        rt_indicator = f" [RT de @{original_author}]"
-                    logger.info(f"✓ Tweet {tweets_new} NEW{rt_indicator} (ID: {tweet_id}): {text[:60]}...")
-
-                except Exception as e:
-                    logger.error(f"Error processing tweet {idx+1} (ID: {tweet_id}): {e}")
+            for tweet_id in tweet_ids_full[:max_tweets]:
+                if tweet_id in seen_ids or tweet_id not in tweet_data_dict_full or not tweet_id.isdigit():
                     continue
+                seen_ids.add(tweet_id)
 
-            cursor.execute(
-                "UPDATE profiles SET last_scraped = ? WHERE id = ?",
-                (datetime.now().isoformat(), profile_id)
-            )
-            cursor.execute("""
-                INSERT INTO scrape_logs (profile_id, status, tweets_found, tweets_new)
-                VALUES (?, ?, ?, ?)
-            """, (profile_id, 'success', tweets_found, tweets_new))
-            conn.commit()
-            conn.close()
+                tweet_data = tweet_data_dict_full[tweet_id]
+                text = tweet_data.get('text', '').strip()
+                if not text or len(text) < 10:
+                    continue
+                if "Traducido de" in text or "Translated from" in text:
+                    continue
 
-            logger.info(f"Scrape complete: {tweets_new} new tweets from {tweets_found} processed")
+                rows.append([
+                    tweet_id, text,
+                    tweet_data.get('href', f"https://x.com/{username}/status/{tweet_id}"),
+                    tweet_data.get('language', ''),
+                    tweet_data.get('likes', 0),
+                    tweet_data.get('retweets', 0),
+                    tweet_data.get('replies', 0),
+                    tweet_data.get('is_retweet', False),
+                    tweet_data.get('original_author', None)
+                ])
 
-            return {
-                "status": "success",
-                "tweets_found": tweets_found,
-                "tweets_new": tweets_new
-            }
+            return batch('success', tweets=rows)
 
         except Exception as e:
             logger.error(f"Error scraping profile: {e}", exc_info=True)
+            return batch('error', str(e), error_class=classify_error(e))
 
-            try:
-                conn = sqlite3.connect(str(DATABASE_PATH))
-                cursor = conn.cursor()
-                cursor.execute("SELECT id FROM profiles WHERE username = ?", (username,))
-                result = cursor.fetchone()
-                if result:
-                    cursor.execute("""
-                        INSERT INTO scrape_logs (profile_id, status, error_message)
-                        VALUES (?, ?, ?)
-                    """, (result[0], 'error', str(e)))
-                    conn.commit()
-                conn.close()
-            except:
-                pass
-
-            return {"status": "error", "message": str(e)}
+    def persist_batches(self, batches):
+        """
+        Save collected batches (see collect_profile) in a single transaction.
+        Tweets already in the database are skipped, so replaying a batch
+        only duplicates its scrape_logs row.
+
+        Returns:
+            list: one scrape_profile-style result per batch
+        """
+        storage = get_storage()
+        with storage.transaction() as conn:
+            results = [self._persist_batch(storage, conn, batch) for batch in batches]
+            committing = time.perf_counter()
+
+        # Every batch also waited for the shared commit
+        commit = time.perf_counter() - committing
+        for result in results:
+            metrics = result['metrics']
+            metrics['durations']['persist'] = round(metrics['durations'].get('persist', 0) + commit, 6)
+            metrics['total'] = round(metrics['total'] + commit, 6)
+
+        prometheus_metrics.TWEETS_INSERTED.inc(sum(r.get('tweets_new', 0) for r in results))
+        return results
+
+    def _persist_batch(self, storage, conn, batch):
+        """Write one batch inside the caller's transaction"""
+        started = time.perf_counter()
+        username = batch['username']
+        metrics = dict(batch['metrics'])
+        metrics['durations'] = dict(metrics.get('durations', {}))
+
+        error_class = batch.get('error_class') or ERROR_UNKNOWN
+        profile_id = storage.get_profile_id(conn, username)
+        if profile_id is None:
+            if batch['status'] == 'error':
+                return {"status": "error", "message": batch['message'], "metrics": metrics,
+                        "error_class": error_class}
+            return {"status": "error", "message": "Profile not found in database", "metrics": metrics,
+                    "error_class": ERROR_UNKNOWN}
+
+        if batch['status'] == 'error':
+            storage.insert_scrape_log(conn, profile_id, 'error', metrics, error_message=batch['message'])
+            return {"status": "error", "message": batch['message'], "metrics": metrics,
+                    "error_class": error_class}
+
+        tweets_found = len(batch['tweets'])
+        tweets_new = storage.insert_tweets(conn, profile_id, batch['tweets'], batch['collected_at'])
+        storage.touch_profile(conn, profile_id, batch['collected_at'])
+
+        # The logged persist duration covers this batch's statements
+        persist = time.perf_counter() - started
+        metrics['durations']['persist'] = round(persist, 6)
+        metrics['total'] = round(metrics['total'] + persist, 6)
+        storage.insert_scrape_log(
+            conn, profile_id, 'success', metrics,
+            tweets_found=tweets_found, tweets_new=tweets_new
+        )
+
+        logger.info(f"Scrape saved for @{username}: {tweets_new} new tweets from {tweets_found} processed "
+                    f"in {metrics['total']:.1f}s")
+
+        return {
+            "status": "success",
+            "tweets_found": tweets_found,
+            "tweets_new": tweets_new,
+            "metrics": metrics
+        }
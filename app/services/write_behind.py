@@ -0,0 +1,73 @@
+"""
+Write-behind queue for scraped batches
+
+Scrape tasks push their collected batch to a Redis list and return; a
+single writer (the persist_batches_task on the 'persistence' queue, run
+with --concurrency=1) drains the list and saves many profiles' batches in
+one SQLite transaction, so scrapes never compete for the writer lock.
+
+Batches are removed from the list only after the transaction commits
+(at-least-once: a writer crash between commit and trim replays them).
+A batch that still fails on the writer's last retry, while the batches
+around it write fine, is moved to a dead-letter list, so one bad batch
+cannot block the queue behind it. When every batch fails (database down
+or locked) nothing is dead-lettered and the queue is left as it is.
+"""
+import json
+import time
+import logging
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = 'persistence:batches'
+DEAD_LETTER_KEY = 'persistence:dead'
+
+# Placeholder for batches acked out of order (LSET, then LREM)
+_ACKED = '__acked__'
+
+
+def enqueue(batch):
+    """Queue a collected batch (see TwitterScraperService.collect_profile)"""
+    batch = dict(batch, queued_at=time.time())
+    return get_redis().rpush(QUEUE_KEY, json.dumps(batch))
+
+
+def peek(limit):
+    """Oldest queued batches, left in the queue until ack()"""
+    return [json.loads(raw) for raw in get_redis().lrange(QUEUE_KEY, 0, limit - 1)]
+
+
+def ack(count, skip=0):
+    """
+    Drop count batches once they are committed: the oldest ones, or the
+    ones after the skip oldest (left queued after a failed write).
+    """
+    if not skip:
+        get_redis().ltrim(QUEUE_KEY, count, -1)
+        return
+
+    pipe = get_redis().pipeline()
+    for index in range(skip, skip + count):
+        pipe.lset(QUEUE_KEY, index, _ACKED)
+    pipe.lrem(QUEUE_KEY, count, _ACKED)
+    pipe.execute()
+
+
+def pending():
+    """Number of batches waiting to be written"""
+    return get_redis().llen(QUEUE_KEY)
+
+
+def dead_letter(batch, error):
+    """Move the oldest queued batch (which must be `batch`) to the dead-letter list"""
+    failed = dict(batch, error=str(error), failed_at=time.time())
+    pipe = get_redis().pipeline()
+    pipe.rpush(DEAD_LETTER_KEY, json.dumps(failed))
+    pipe.ltrim(QUEUE_KEY, 1, -1)
+    pipe.execute()
+
+
+def dead_letters():
+    """Number of batches the writer gave up on"""
+    return get_redis().llen(DEAD_LETTER_KEY)
@@ -0,0 +1,38 @@
+"""
+Storage backends (SQLite, PostgreSQL) behind one interface
+"""
+import os
+from threading import Lock
+
+_storage = None
+_storage_pid = None
+_storage_lock = Lock()
+
+
+def get_storage():
+    """
+    Get the process-wide storage selected by STORAGE_BACKEND.
+    Re-created after a fork so pooled connections are never shared.
+    """
+    global _storage, _storage_pid
+
+    if _storage is None or _storage_pid != os.getpid():
+        with _storage_lock:
+            if _storage is None or _storage_pid != os.getpid():
+                from config.settings import (
+                    STORAGE_BACKEND, DATABASE_PATH, DATABASE_URL,
+                    POSTGRES_POOL_MIN, POSTGRES_POOL_MAX
+                )
+
+                if STORAGE_BACKEND == 'postgresql':
+                    from app.storage.postgres import PostgresStorage
+                    _storage = PostgresStorage(DATABASE_URL, POSTGRES_POOL_MIN, POSTGRES_POOL_MAX)
+                elif STORAGE_BACKEND == 'sqlite':
+                    from app.storage.sqlite import SQLiteStorage
+                    _storage = SQLiteStorage(DATABASE_PATH)
+                else:
+                    raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+
+                _storage_pid = os.getpid()
+
+    return _storage
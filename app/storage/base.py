@@ -0,0 +1,656 @@
+"""
+Storage interface for profiles, tweets and scrape logs
+"""
+import json
+import logging
+from threading import Lock
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Version of the schema built by init_schema(). Bump it with every change
+# to init_schema() so existing databases are migrated on their next start.
+SCHEMA_VERSION = 1
+
+# Applied versions, one row each (Storage.ensure_schema)
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Timing columns added to scrape_logs (seconds unless noted)
+SCRAPE_LOG_METRIC_COLUMNS = (
+    ('duration_total', 'REAL'),
+    ('duration_navigate', 'REAL'),
+    ('duration_initial_wait', 'REAL'),
+    ('duration_scroll', 'REAL'),
+    ('duration_extract', 'REAL'),
+    ('duration_persist', 'REAL'),
+    ('scroll_iterations', 'INTEGER'),
+    ('articles_per_scroll', 'TEXT'),  # JSON list
+    ('extract_bytes', 'INTEGER'),
+)
+
+# Phases stored in the duration_* columns (ScrapeMetrics.PHASES)
+SCRAPE_PHASES = ('navigate', 'initial_wait', 'scroll', 'extract', 'persist')
+
+# Stored tweet columns; the URL and author are derived from tweet_id and
+# the profile on read (see tweet_url)
+TWEET_INSERT_COLUMNS = (
+    'tweet_id', 'profile_id', 'tweet_text', 'timestamp', 'language',
+    'likes', 'retweets', 'replies', 'is_retweet', 'original_author', 'change_seq'
+)
+
+# Rows of Storage.import_tweets: dumps carry their own scraped_date
+IMPORT_COLUMNS = TWEET_INSERT_COLUMNS + ('scraped_date',)
+
+# Columns behind Storage.iter_tweets (see _export_row)
+EXPORT_SELECT = """
+    SELECT t.tweet_id, t.tweet_text,
+           (SELECT username FROM profiles WHERE id = t.profile_id),
+           t.timestamp, t.language, t.likes, t.retweets, t.replies,
+           t.is_retweet, t.original_author, t.scraped_date, t.change_seq
+    FROM tweets t
+    WHERE 1=1
+"""
+
+# Snowflake IDs: milliseconds since this epoch in the bits above 22
+TWITTER_EPOCH_MS = 1288834974657
+
+
+def _text(value):
+    """Dates come back as str (SQLite) or datetime (PostgreSQL)"""
+    return str(value) if value is not None else None
+
+
+def tweet_url(username, tweet_id, is_retweet=False, original_author=None):
+    """Status URL of a tweet (reposts link to the original author)"""
+    author = original_author if is_retweet and original_author else username
+    return f"https://x.com/{author}/status/{tweet_id}"
+
+
+def snowflake_time(tweet_id):
+    """Creation time (UTC datetime) encoded in a tweet ID"""
+    from datetime import datetime, timezone
+    return datetime.fromtimestamp(((int(tweet_id) >> 22) + TWITTER_EPOCH_MS) / 1000, tz=timezone.utc)
+
+
+def tweet_rows(profile_id, rows, timestamp, first_seq):
+    """
+    Batch rows (BATCH_TWEET_FIELDS order) as TWEET_INSERT_COLUMNS tuples,
+    oldest first: timelines come newest first, and ascending keys append
+    to the right edge of the tweet_id B-tree instead of splitting pages.
+    Row i gets change_seq first_seq + i (see Storage.reserve_change_seq).
+    """
+    ordered = sorted((
+        (int(tweet_id), profile_id, text, timestamp, lang, likes, retweets, replies,
+         bool(is_retweet), original_author)
+        for tweet_id, text, _url, lang, likes, retweets, replies, is_retweet, original_author
+        in rows
+    ), key=lambda row: row[0])
+    return [row + (first_seq + i,) for i, row in enumerate(ordered)]
+
+
+def parse_change_position(value):
+    """
+    Change feed position: 'SEQ' (everything up to change_seq SEQ seen) or
+    'SEQ:TWEET_ID' as returned by Storage.tweet_changes. Rows written
+    before the change feed share change_seq 1, hence the tweet_id part.
+
+    Raises:
+        ValueError: malformed position
+    """
+    seq, _, tweet_id = str(value).partition(':')
+    return int(seq), (int(tweet_id) if tweet_id else None)
+
+
+def format_change_position(seq, tweet_id=None):
+    return f"{seq}:{tweet_id}" if tweet_id is not None else str(seq)
+
+
+def engagement_rows(rows):
+    """(likes, retweets, replies, change_seq, tweet_id) of tweet_rows() output"""
+    return [(row[5], row[6], row[7], row[10], row[0]) for row in rows]
+
+
+class Storage:
+    """
+    Tweet store behind TwitterScraperService and the dashboard routes.
+
+    Subclasses provide connect()/release() and the dialect-specific SQL
+    fragments; the queries themselves are shared. Readers return plain
+    dicts. Writes run inside transaction(), which yields the connection
+    to pass to the write methods, so a scrape or a write-behind flush
+    commits once.
+    """
+
+    name = None
+    placeholder = '?'
+
+    # ensure_schema() state, per instance once set
+    _schema_ready = False
+    _schema_lock = Lock()
+
+    # Dialect fragments
+    UTC_NOW = "CURRENT_TIMESTAMP"
+    TODAY = "CURRENT_DATE"
+    TODAY_FILTER = None
+    DATE_FROM_FILTER = None
+    DATE_TO_FILTER = None
+
+    def connect(self):
+        """Open (or check out) a DB-API connection"""
+        raise NotImplementedError
+
+    def release(self, conn):
+        """Close (or return) a connection from connect()"""
+        conn.close()
+
+    def init_schema(self):
+        """
+        Create tables and indexes, applying column migrations, and record
+        SCHEMA_VERSION (see record_schema_version). Idempotent; processes
+        call ensure_schema() instead.
+        """
+        raise NotImplementedError
+
+    def ensure_schema(self):
+        """
+        Run init_schema() only if the database does not record SCHEMA_VERSION
+        yet. Checked once per storage object, that is once per process
+        (get_storage); later calls cost nothing.
+        """
+        if self._schema_ready:
+            return
+
+        with self._schema_lock:
+            if not self._schema_ready:
+                version = self.schema_version()
+                if version != SCHEMA_VERSION:
+                    logger.info(f"Schema version {version} -> {SCHEMA_VERSION}, migrating")
+                    self.init_schema()
+                self._schema_ready = True
+
+    def schema_version(self):
+        """Latest applied schema version (0: new database or older than the registry)"""
+        try:
+            row = self._fetchone("SELECT MAX(version) FROM schema_version")
+        except Exception:  # No schema_version table yet
+            return 0
+        return row[0] or 0
+
+    def record_schema_version(self, cursor):
+        """Mark SCHEMA_VERSION as applied; the last step of init_schema()"""
+        cursor.execute(SCHEMA_VERSION_TABLE)
+        cursor.execute(f"INSERT INTO schema_version (version) VALUES ({SCHEMA_VERSION}) "
+                       "ON CONFLICT (version) DO NOTHING")
+
+    def insert_tweets(self, conn, profile_id, rows, timestamp):
+        """
+        Insert tweet rows (BATCH_TWEET_FIELDS order). Tweets already stored
+        only get their engagement counters refreshed, and a new change_seq
+        if any of them changed.
+
+        Returns:
+            int: number of new tweets
+        """
+        raise NotImplementedError
+
+    def import_tweets(self, conn, rows):
+        """
+        Insert complete rows (IMPORT_COLUMNS order), skipping tweet_ids
+        already stored.
+
+        Returns:
+            int: number of new tweets
+        """
+        cursor = conn.cursor()
+        cursor.executemany(self._sql(f"""
+            INSERT INTO tweets ({', '.join(IMPORT_COLUMNS)})
+            VALUES ({', '.join('?' * len(IMPORT_COLUMNS))})
+            ON CONFLICT (tweet_id) DO NOTHING
+        """), rows)
+        return max(cursor.rowcount, 0)
+
+    @contextmanager
+    def bulk_load(self):
+        """Wrap a large import (backends may defer index maintenance)"""
+        yield
+
+    def reserve_change_seq(self, conn, count):
+        """
+        Reserve count values of the tweets change sequence.
+
+        The sequence row stays locked until the transaction commits, so
+        writers take values in commit order and a change feed reader
+        never sees seq N+1 committed before N.
+
+        Returns:
+            int: first reserved value
+        """
+        self._execute(conn, "UPDATE sequences SET value = value + ? WHERE name = 'tweets'", (count,))
+        row = self._execute(conn, "SELECT value FROM sequences WHERE name = 'tweets'").fetchone()
+        return row[0] - count + 1
+
+    def text_filter(self, query):
+        """SQL condition and params matching tweet_text against a search query"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release pooled resources"""
+
+    @contextmanager
+    def transaction(self):
+        """Connection that commits on success and rolls back on error"""
+        conn = self.connect()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def _sql(self, sql):
+        return sql if self.placeholder == '?' else sql.replace('?', self.placeholder)
+
+    def _execute(self, conn, sql, params=()):
+        cursor = conn.cursor()
+        cursor.execute(self._sql(sql), params)
+        return cursor
+
+    def _fetchall(self, sql, params=()):
+        with self.transaction() as conn:
+            return self._execute(conn, sql, params).fetchall()
+
+    def _fetchone(self, sql, params=()):
+        with self.transaction() as conn:
+            return self._execute(conn, sql, params).fetchone()
+
+    # Profiles
+
+    def add_profile(self, username, interval_hours):
+        """
+        Returns:
+            bool: False if the profile already exists
+        """
+        with self.transaction() as conn:
+            cursor = self._execute(conn, """
+                INSERT INTO profiles (username, profile_url, scrape_interval_hours)
+                VALUES (?, ?, ?)
+                ON CONFLICT (username) DO NOTHING
+            """, (username, f"https://x.com/{username}", interval_hours))
+            return cursor.rowcount > 0
+
+    def delete_profile(self, profile_id):
+        """Delete a profile with its tweets and scrape logs"""
+        with self.transaction() as conn:
+            self._execute(conn, "DELETE FROM tweets WHERE profile_id = ?", (profile_id,))
+            self._execute(conn, "DELETE FROM scrape_logs WHERE profile_id = ?", (profile_id,))
+            self._execute(conn, "DELETE FROM profiles WHERE id = ?", (profile_id,))
+
+    def list_profiles(self):
+        """Profiles with their tweet counts, newest first"""
+        rows = self._fetchall("""
+            SELECT p.id, p.username, p.scrape_interval_hours, p.last_scraped, p.is_active,
+                   COUNT(t.tweet_id) as tweet_count
+            FROM profiles p
+            LEFT JOIN tweets t ON p.id = t.profile_id
+            GROUP BY p.id
+            ORDER BY p.added_date DESC
+        """)
+        return [{
+            'id': row[0],
+            'username': row[1],
+            'scrape_interval_hours': row[2],
+            'last_scraped': _text(row[3])[:16] if row[3] else None,
+            'is_active': row[4],
+            'tweet_count': row[5]
+        } for row in rows]
+
+    def profile_usernames(self):
+        return [row[0] for row in self._fetchall("SELECT DISTINCT username FROM profiles ORDER BY username")]
+
+    def get_profile_id(self, conn, username):
+        row = self._execute(conn, "SELECT id FROM profiles WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else None
+
+    def ensure_profile(self, conn, username):
+        """Id of a profile, created with the default interval if missing"""
+        self._execute(conn, """
+            INSERT INTO profiles (username, profile_url) VALUES (?, ?)
+            ON CONFLICT (username) DO NOTHING
+        """, (username, f"https://x.com/{username}"))
+        return self.get_profile_id(conn, username)
+
+    def mark_profile_changed(self, conn, profile_id, change_seq):
+        """Record the latest change to a profile's tweets (API ETag/Last-Modified)"""
+        self._execute(conn, f"""
+            UPDATE profiles SET last_change_seq = ?, last_changed = {self.UTC_NOW} WHERE id = ?
+        """, (change_seq, profile_id))
+
+    def profile_validators(self, username):
+        """
+        Returns:
+            tuple: (profile_id, last_change_seq, last_changed) or None if unknown
+        """
+        row = self._fetchone(
+            "SELECT id, last_change_seq, last_changed FROM profiles WHERE username = ?", (username,)
+        )
+        return (row[0], row[1] or 0, _text(row[2])) if row else None
+
+    def search_validators(self):
+        """
+        Returns:
+            tuple: (profile count, sum and max of last_change_seq, latest last_changed);
+            the count and the sum also change when a profile is deleted
+        """
+        row = self._fetchone(
+            "SELECT COUNT(*), COALESCE(SUM(last_change_seq), 0), COALESCE(MAX(last_change_seq), 0), "
+            "MAX(last_changed) FROM profiles"
+        )
+        return row[0], row[1], row[2], _text(row[3])
+
+    def dashboard_validators(self):
+        """
+        Returns:
+            tuple: everything the dashboard and search pages show besides the
+            tweets themselves (profile set and settings, last_change_seq,
+            last scrape) plus today's date for the tweets-today count
+        """
+        row = self._fetchone(f"""
+            SELECT COUNT(*), MAX(id), COALESCE(SUM(last_change_seq), 0),
+                   SUM(CASE WHEN is_active THEN 1 ELSE 0 END), SUM(scrape_interval_hours),
+                   MAX(last_scraped), {self.TODAY}
+            FROM profiles
+        """)
+        return tuple(row)
+
+    def touch_profile(self, conn, profile_id, scraped_at):
+        self._execute(conn, "UPDATE profiles SET last_scraped = ? WHERE id = ?", (scraped_at, profile_id))
+
+    # Tweets
+
+    def profile_tweets(self, username):
+        """All tweets of a profile, newest first"""
+        rows = self._fetchall("""
+            SELECT tweet_id, tweet_text, language, likes, retweets, replies,
+                   is_retweet, original_author, scraped_date
+            FROM tweets
+            WHERE profile_id = (SELECT id FROM profiles WHERE username = ?)
+            ORDER BY scraped_date DESC
+        """, (username,))
+        return [{
+            'tweet_text': row[1],
+            'tweet_url': tweet_url(username, row[0], row[6], row[7]),
+            'language': row[2] or 'unknown',
+            'likes': row[3],
+            'retweets': row[4],
+            'replies': row[5],
+            'is_retweet': bool(row[6]) if row[6] is not None else False,
+            'original_author': row[7],
+            'scraped_date': _text(row[8])
+        } for row in rows]
+
+    def search_tweets(self, query='', author='', lang='', date_from='', date_to='', sort='date', limit=100):
+        """Filtered tweets, newest (or most liked) first"""
+        sql = """
+            SELECT t.tweet_id, t.tweet_text,
+                   (SELECT username FROM profiles WHERE id = t.profile_id),
+                   t.language, t.likes, t.retweets, t.replies, t.scraped_date,
+                   t.is_retweet, t.original_author
+            FROM tweets t
+            WHERE 1=1
+        """
+        filters, params = self._search_filters(query, author, lang, date_from, date_to)
+        sql += filters
+
+        if sort == 'likes':
+            sql += " ORDER BY t.likes DESC"
+        else:
+            sql += " ORDER BY t.scraped_date DESC"
+
+        sql += " LIMIT ?"
+        params.append(limit)
+
+        return [{
+            'tweet_text': row[1],
+            'tweet_url': tweet_url(row[2], row[0], row[8], row[9]),
+            'author': row[2],
+            'language': row[3] or 'unknown',
+            'likes': row[4],
+            'retweets': row[5],
+            'replies': row[6],
+            'scraped_date': _text(row[7]),
+            'is_retweet': bool(row[8]) if row[8] is not None else False,
+            'original_author': row[9]
+        } for row in self._fetchall(sql, params)]
+
+    def _search_filters(self, query='', author='', lang='', date_from='', date_to=''):
+        sql = ""
+        params = []
+
+        if query:
+            condition, condition_params = self.text_filter(query)
+            sql += f" AND {condition}"
+            params.extend(condition_params)
+
+        if author:
+            sql += " AND t.profile_id = (SELECT id FROM profiles WHERE username = ?)"
+            params.append(author)
+
+        if lang:
+            sql += " AND t.language = ?"
+            params.append(lang)
+
+        if date_from:
+            sql += f" AND {self.DATE_FROM_FILTER}"
+            params.append(date_from)
+
+        if date_to:
+            sql += f" AND {self.DATE_TO_FILTER}"
+            params.append(date_to)
+
+        return sql, params
+
+    def page_tweets(self, query='', author='', lang='', date_from='', date_to='', sort='date',
+                    limit=50, after=None):
+        """
+        One page of search results (export rows) with keyset pagination:
+        `after` is the (sort value, tweet_id) of the last row of the
+        previous page, so deep pages cost the same as the first.
+        """
+        sort_column = 't.likes' if sort == 'likes' else 't.scraped_date'
+        filters, params = self._search_filters(query, author, lang, date_from, date_to)
+
+        if after is not None:
+            filters += f" AND ({sort_column} < ? OR ({sort_column} = ? AND t.tweet_id < ?))"
+            params.extend([after[0], after[0], after[1]])
+
+        rows = self._fetchall(
+            EXPORT_SELECT + filters + f" ORDER BY {sort_column} DESC, t.tweet_id DESC LIMIT ?",
+            params + [limit]
+        )
+        return [self._export_row(row) for row in rows]
+
+    def _export_filters(self, profiles=None, date_from='', date_to=''):
+        sql = ""
+        params = []
+
+        if profiles:
+            sql += f" AND t.profile_id IN (SELECT id FROM profiles WHERE username IN ({', '.join('?' * len(profiles))}))"
+            params.extend(profiles)
+
+        if date_from:
+            sql += f" AND {self.DATE_FROM_FILTER}"
+            params.append(date_from)
+
+        if date_to:
+            sql += f" AND {self.DATE_TO_FILTER}"
+            params.append(date_to)
+
+        return sql, params
+
+    def _export_row(self, row):
+        tweet_id = str(row[0])
+        return {
+            'tweet_id': tweet_id,
+            'author': row[2],
+            'text': row[1],
+            'url': tweet_url(row[2], tweet_id, row[8], row[9]),
+            'timestamp': row[3],
+            'created_at': snowflake_time(tweet_id).isoformat() if tweet_id.isdigit() else None,
+            'language': row[4],
+            'likes': row[5],
+            'retweets': row[6],
+            'replies': row[7],
+            'is_retweet': bool(row[8]),
+            'original_author': row[9],
+            'scraped_date': _text(row[10]),
+            'change_seq': row[11]
+        }
+
+    def iter_tweets(self, profiles=None, date_from='', date_to='', chunk_size=5000):
+        """
+        Tweets in tweet_id order as lists of up to chunk_size dicts.
+
+        Keyset pagination: every chunk is a short query resuming after the
+        last tweet_id, so no read transaction is held across the export and
+        memory does not grow with the result.
+        """
+        filters, params = self._export_filters(profiles, date_from, date_to)
+        last_id = None
+
+        while True:
+            sql = EXPORT_SELECT + filters
+            chunk_params = list(params)
+            if last_id is not None:
+                sql += " AND t.tweet_id > ?"
+                chunk_params.append(last_id)
+            sql += " ORDER BY t.tweet_id LIMIT ?"
+            chunk_params.append(chunk_size)
+
+            rows = self._fetchall(sql, chunk_params)
+            if not rows:
+                return
+
+            yield [self._export_row(row) for row in rows]
+            last_id = rows[-1][0]
+
+    # Change feed
+
+    def tweet_changes(self, since=(0, None), limit=1000, profiles=None):
+        """
+        Tweets inserted or updated after position `since` (see
+        parse_change_position), in (change_seq, tweet_id) order. Served
+        from idx_tweets_change_seq, so the cost follows the number of
+        changes, not the table size.
+
+        Returns:
+            tuple: (rows, position after the last row, as a string)
+        """
+        seq, tweet_id = since
+        filters, params = self._export_filters(profiles)
+        rows = []
+
+        # Rest of the current seq group, then the later groups: two index
+        # range seeks (a row-value comparison ends up scanning the group)
+        if tweet_id is not None:
+            rows = self._fetchall(
+                EXPORT_SELECT + filters + " AND t.change_seq = ? AND t.tweet_id > ? ORDER BY t.tweet_id LIMIT ?",
+                params + [seq, tweet_id, limit]
+            )
+        if len(rows) < limit:
+            rows += self._fetchall(
+                EXPORT_SELECT + filters + " AND t.change_seq > ? ORDER BY t.change_seq, t.tweet_id LIMIT ?",
+                params + [seq, limit - len(rows)]
+            )
+
+        if not rows:
+            return [], format_change_position(seq, tweet_id)
+        return [self._export_row(row) for row in rows], format_change_position(rows[-1][11], rows[-1][0])
+
+    def current_change_seq(self):
+        return self._fetchone("SELECT value FROM sequences WHERE name = 'tweets'")[0]
+
+    def get_cursor(self, consumer):
+        """Stored position of a named consumer ('0': nothing seen yet)"""
+        row = self._fetchone("SELECT position, position_tweet_id FROM consumer_cursors WHERE name = ?", (consumer,))
+        return format_change_position(*row) if row else '0'
+
+    def set_cursor(self, consumer, position):
+        seq, tweet_id = parse_change_position(position)
+        with self.transaction() as conn:
+            self._execute(conn, """
+                INSERT INTO consumer_cursors (name, position, position_tweet_id, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (name) DO UPDATE SET
+                    position = excluded.position,
+                    position_tweet_id = excluded.position_tweet_id,
+                    updated_at = excluded.updated_at
+            """, (consumer, seq, tweet_id))
+
+    def delete_cursor(self, consumer):
+        with self.transaction() as conn:
+            self._execute(conn, "DELETE FROM consumer_cursors WHERE name = ?", (consumer,))
+
+    def list_cursors(self):
+        """Consumers with their position and lag (in sequence values)"""
+        current = self.current_change_seq()
+        return [{
+            'name': row[0],
+            'position': format_change_position(row[1], row[2]),
+            'lag': max(current - row[1], 0),
+            'updated_at': _text(row[3])
+        } for row in self._fetchall(
+            "SELECT name, position, position_tweet_id, updated_at FROM consumer_cursors ORDER BY name"
+        )]
+
+    # Stats
+
+    def totals(self):
+        """
+        Returns:
+            tuple: (total_tweets, total_profiles)
+        """
+        row = self._fetchone("SELECT (SELECT COUNT(*) FROM tweets), (SELECT COUNT(*) FROM profiles)")
+        return row[0], row[1]
+
+    def dashboard_stats(self):
+        row = self._fetchone(f"""
+            SELECT (SELECT COUNT(*) FROM profiles),
+                   (SELECT COUNT(*) FROM profiles WHERE is_active),
+                   (SELECT COUNT(*) FROM tweets),
+                   (SELECT COUNT(*) FROM tweets WHERE {self.TODAY_FILTER})
+        """)
+        return {
+            'total_profiles': row[0],
+            'active_profiles': row[1],
+            'total_tweets': row[2],
+            'today_tweets': row[3]
+        }
+
+    # Scrape logs
+
+    def insert_scrape_log(self, conn, profile_id, status, metrics,
+                          tweets_found=None, tweets_new=None, error_message=None):
+        """Insert a scrape_logs row including per-phase timings (ScrapeMetrics.as_dict())"""
+        self._execute(conn, """
+            INSERT INTO scrape_logs (
+                profile_id, status, tweets_found, tweets_new, error_message,
+                duration_total, duration_navigate, duration_initial_wait,
+                duration_scroll, duration_extract, duration_persist,
+                scroll_iterations, articles_per_scroll, extract_bytes
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            profile_id, status, tweets_found, tweets_new, error_message,
+            metrics['total'],
+            *(metrics['durations'].get(phase) for phase in SCRAPE_PHASES),
+            metrics['scroll_iterations'],
+            json.dumps(metrics['articles_per_scroll']),
+            metrics['extract_bytes']
+        ))
@@ -0,0 +1,202 @@
+"""
+Online migration of a SQLite database to the compact tweets schema
+
+Copies the legacy tweets table (AUTOINCREMENT id, TEXT tweet_id, stored
+tweet_url/author) into tweets_compact in short chunked transactions, so
+scrapes and the dashboard keep working in between, then swaps the tables
+in one brief write transaction and VACUUMs to return the space.
+
+The copy is resumable: the last copied legacy id is kept in
+tweets_compact_progress, along with the change_seq at the start of the
+copy so engagement updates made to already copied rows are replayed
+during the swap.
+
+    python -m app.storage.migrate_compact [--chunk-size 50000] [--pause 0.05] [--no-vacuum]
+"""
+import os
+import sys
+import time
+import sqlite3
+import logging
+import argparse
+from app.storage.sqlite import SQLiteStorage, COMPACT_TWEETS_TABLE, COMPACT_TWEETS_INDEXES, is_compact
+
+logger = logging.getLogger(__name__)
+
+TARGET = 'tweets_compact'
+PROGRESS = 'tweets_compact_progress'
+
+# Schema before the compact migration (kept for benchmarks/generate_db --legacy-schema)
+LEGACY_TWEETS_TABLE = """
+    CREATE TABLE IF NOT EXISTS tweets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        profile_id INTEGER,
+        tweet_id TEXT UNIQUE,
+        tweet_text TEXT,
+        tweet_url TEXT,
+        author TEXT,
+        timestamp TEXT,
+        language TEXT,
+        likes INTEGER DEFAULT 0,
+        retweets INTEGER DEFAULT 0,
+        replies INTEGER DEFAULT 0,
+        is_retweet BOOLEAN DEFAULT 0,
+        original_author TEXT,
+        scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (profile_id) REFERENCES profiles (id)
+    )
+"""
+
+# Rows without a numeric tweet_id or a resolvable profile are dropped
+# (INSERT OR IGNORE also skips NOT NULL violations)
+COPY_SELECT = f"""
+    INSERT OR IGNORE INTO {TARGET} (
+        tweet_id, profile_id, tweet_text, timestamp, language,
+        likes, retweets, replies, is_retweet, original_author, scraped_date, change_seq
+    )
+    SELECT CAST(t.tweet_id AS INTEGER),
+           COALESCE(t.profile_id, (SELECT p.id FROM profiles p WHERE p.username = t.author)),
+           t.tweet_text, t.timestamp, t.language,
+           t.likes, t.retweets, t.replies, t.is_retweet, t.original_author, t.scraped_date,
+           t.change_seq
+    FROM tweets t
+    WHERE t.tweet_id <> '' AND t.tweet_id NOT GLOB '*[^0-9]*'
+"""
+
+COPY_SQL = COPY_SELECT + " AND t.id > ? AND t.id <= ?"
+
+# Engagement refreshes of rows copied in earlier chunks
+RESYNC_SQL = COPY_SELECT + """ AND t.change_seq > ?
+    ON CONFLICT (tweet_id) DO UPDATE SET
+        likes = excluded.likes, retweets = excluded.retweets,
+        replies = excluded.replies, change_seq = excluded.change_seq
+"""
+
+MAX_ROWID = 2 ** 63 - 1
+
+
+def migrate(path, chunk_size=50000, pause=0.05, vacuum=True, keep_legacy=False, progress=True):
+    """
+    Rewrite the tweets table of a SQLite database in the compact schema.
+
+    Returns:
+        dict: row counts, file sizes and elapsed seconds
+    """
+    started = time.perf_counter()
+    bytes_before = os.path.getsize(path)
+
+    conn = sqlite3.connect(str(path), timeout=60, isolation_level=None)
+    try:
+        if is_compact(conn):
+            logger.info(f"{path} already uses the compact schema")
+            return {'migrated': False, 'bytes_before': bytes_before, 'bytes_after': bytes_before}
+
+        # change_seq column and sequence on databases the app has not opened yet
+        SQLiteStorage(path).init_schema()
+
+        conn.execute(COMPACT_TWEETS_TABLE.format(table=TARGET))
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {PROGRESS} (last_id INTEGER NOT NULL, start_seq INTEGER NOT NULL)")
+        row = conn.execute(f"SELECT last_id, start_seq FROM {PROGRESS}").fetchone()
+        if row:
+            last_id, start_seq = row
+        else:
+            last_id = 0
+            start_seq = conn.execute("SELECT value FROM sequences WHERE name = 'tweets'").fetchone()[0]
+        total = conn.execute("SELECT COUNT(*) FROM tweets WHERE id > ?", (last_id,)).fetchone()[0]
+        copied = 0
+
+        # Chunked copy; each chunk is its own short write transaction
+        while True:
+            row = conn.execute(
+                "SELECT id FROM tweets WHERE id > ? ORDER BY id LIMIT 1 OFFSET ?",
+                (last_id, chunk_size - 1)
+            ).fetchone()
+            if row is None:
+                break  # the tail is copied during the swap
+
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(COPY_SQL, (last_id, row[0]))
+            conn.execute(f"DELETE FROM {PROGRESS}")
+            conn.execute(f"INSERT INTO {PROGRESS} (last_id, start_seq) VALUES (?, ?)", (row[0], start_seq))
+            conn.execute("COMMIT")
+
+            last_id = row[0]
+            copied += chunk_size
+            if progress:
+                print(f"\r  {min(copied, total):,}/{total:,} tweets copied", end='', file=sys.stderr, flush=True)
+            time.sleep(pause)
+
+        if progress:
+            print(file=sys.stderr)
+
+        # Built before the swap so the final transaction stays short
+        for statement in COMPACT_TWEETS_INDEXES:
+            conn.execute(statement.format(table=TARGET))
+
+        # Swap: copy the tail, replay engagement updates, drop rows of
+        # profiles deleted meanwhile, rename
+        conn.execute("BEGIN IMMEDIATE")
+        swap_started = time.perf_counter()
+        conn.execute(COPY_SQL, (last_id, MAX_ROWID))
+        conn.execute(RESYNC_SQL, (start_seq,))
+        conn.execute(f"DELETE FROM {TARGET} WHERE profile_id NOT IN (SELECT id FROM profiles)")
+        legacy_rows = conn.execute("SELECT COUNT(*) FROM tweets").fetchone()[0]
+        compact_rows = conn.execute(f"SELECT COUNT(*) FROM {TARGET}").fetchone()[0]
+
+        if keep_legacy:
+            conn.execute("ALTER TABLE tweets RENAME TO tweets_legacy")
+        else:
+            conn.execute("DROP TABLE tweets")
+        conn.execute(f"ALTER TABLE {TARGET} RENAME TO tweets")
+        conn.execute(f"DROP TABLE {PROGRESS}")
+        conn.execute("COMMIT")
+        swap_seconds = time.perf_counter() - swap_started
+
+        if vacuum:
+            conn.execute("VACUUM")
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    summary = {
+        'migrated': True,
+        'legacy_rows': legacy_rows,
+        'compact_rows': compact_rows,
+        'skipped_rows': legacy_rows - compact_rows,
+        'bytes_before': bytes_before,
+        'bytes_after': os.path.getsize(path),
+        'swap_seconds': round(swap_seconds, 3),
+        'seconds': round(time.perf_counter() - started, 2)
+    }
+    logger.info(f"Migrated {path} to the compact schema: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', help='SQLite file (default: DATABASE_PATH)')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='Legacy rows copied per transaction')
+    parser.add_argument('--pause', type=float, default=0.05, help='Seconds between chunks (lets writers in)')
+    parser.add_argument('--no-vacuum', action='store_true', help='Skip VACUUM (space is not returned to the OS)')
+    parser.add_argument('--keep-legacy', action='store_true', help='Keep the old table as tweets_legacy')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    path = args.database
+    if path is None:
+        from config.settings import DATABASE_PATH
+        path = str(DATABASE_PATH)
+
+    summary = migrate(path, args.chunk_size, args.pause, not args.no_vacuum, args.keep_legacy)
+    if summary['migrated']:
+        print(f"{path}: {summary['compact_rows']:,} tweets ({summary['skipped_rows']:,} skipped), "
+              f"{summary['bytes_before'] / 1e6:.1f} MB -> {summary['bytes_after'] / 1e6:.1f} MB "
+              f"in {summary['seconds']}s (swap {summary['swap_seconds']}s)")
+    else:
+        print(f"{path}: already compact")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+PostgreSQL storage (shared store for workers on several hosts)
+
+Connections come from a psycopg2 ThreadedConnectionPool, tweets are bulk
+loaded with COPY into a temporary table and merged with ON CONFLICT, and
+search uses a GIN full-text index over tweet_text.
+"""
+import io
+import csv
+import logging
+from app.storage.base import Storage, SCRAPE_LOG_METRIC_COLUMNS, TWEET_INSERT_COLUMNS, EXPORT_SELECT, tweet_rows
+
+try:
+    import psycopg2
+    from psycopg2.pool import ThreadedConnectionPool
+except ImportError:  # Only needed with STORAGE_BACKEND=postgresql
+    psycopg2 = None
+
+logger = logging.getLogger(__name__)
+
+# 'simple': no stemming or stop words, tweets come in many languages
+TS_CONFIG = 'simple'
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS profiles (
+        id SERIAL PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        profile_url TEXT,
+        scrape_interval_hours INTEGER DEFAULT 12,
+        last_scraped TIMESTAMP,
+        is_active BOOLEAN DEFAULT TRUE,
+        added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tweets (
+        tweet_id BIGINT PRIMARY KEY,
+        profile_id INTEGER NOT NULL REFERENCES profiles (id),
+        tweet_text TEXT,
+        timestamp TEXT,
+        language TEXT,
+        likes INTEGER DEFAULT 0,
+        retweets INTEGER DEFAULT 0,
+        replies INTEGER DEFAULT 0,
+        is_retweet BOOLEAN DEFAULT FALSE,
+        original_author TEXT,
+        scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        change_seq BIGINT NOT NULL DEFAULT 1
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scrape_logs (
+        id SERIAL PRIMARY KEY,
+        profile_id INTEGER REFERENCES profiles (id),
+        status TEXT,
+        tweets_found INTEGER,
+        tweets_new INTEGER,
+        error_message TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sequences (
+        name TEXT PRIMARY KEY,
+        value BIGINT NOT NULL
+    )
+    """,
+    "INSERT INTO sequences (name, value) VALUES ('tweets', 1) ON CONFLICT (name) DO NOTHING",
+    """
+    CREATE TABLE IF NOT EXISTS consumer_cursors (
+        name TEXT PRIMARY KEY,
+        position BIGINT NOT NULL DEFAULT 0,
+        position_tweet_id BIGINT,
+        updated_at TIMESTAMP
+    )
+    """,
+    # API validators (Storage.mark_profile_changed)
+    "ALTER TABLE profiles ADD COLUMN IF NOT EXISTS last_change_seq BIGINT",
+    "ALTER TABLE profiles ADD COLUMN IF NOT EXISTS last_changed TIMESTAMP",
+    # Constant default: existing rows start at seq 1 without a table rewrite
+    "ALTER TABLE tweets ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT 1",
+    "CREATE INDEX IF NOT EXISTS idx_tweets_change_seq ON tweets (change_seq, tweet_id)",
+    "CREATE INDEX IF NOT EXISTS idx_tweets_profile_date ON tweets (profile_id, scraped_date DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_tweets_scraped_date ON tweets (scraped_date)",
+    f"CREATE INDEX IF NOT EXISTS idx_tweets_text_fts ON tweets USING GIN (to_tsvector('{TS_CONFIG}', tweet_text))",
+)
+
+
+class PostgresStorage(Storage):
+    """PostgreSQL with a per-process connection pool"""
+
+    name = 'postgresql'
+    placeholder = '%s'
+
+    UTC_NOW = "(now() AT TIME ZONE 'utc')"
+    TODAY_FILTER = "scraped_date >= CURRENT_DATE"
+    DATE_FROM_FILTER = "scraped_date >= %s::date"
+    DATE_TO_FILTER = "scraped_date < %s::date + 1"
+
+    def __init__(self, dsn, minconn=1, maxconn=10):
+        if psycopg2 is None:
+            raise RuntimeError("psycopg2 is required for STORAGE_BACKEND=postgresql (pip install psycopg2-binary)")
+
+        self.dsn = dsn
+        self.pool = ThreadedConnectionPool(minconn, maxconn, dsn)
+
+    def connect(self):
+        return self.pool.getconn()
+
+    def release(self, conn):
+        self.pool.putconn(conn)
+
+    def close(self):
+        self.pool.closeall()
+
+    def text_filter(self, query):
+        # Must match the expression of idx_tweets_text_fts to use the index
+        return f"to_tsvector('{TS_CONFIG}', tweet_text) @@ plainto_tsquery('{TS_CONFIG}', %s)", [query]
+
+    def insert_tweets(self, conn, profile_id, rows, timestamp):
+        if not rows:
+            return 0
+
+        buffer = io.StringIO()
+        first_seq = self.reserve_change_seq(conn, len(rows))
+        csv.writer(buffer).writerows(tweet_rows(profile_id, rows, timestamp, first_seq))
+        buffer.seek(0)
+
+        columns = ', '.join(TWEET_INSERT_COLUMNS)
+        cursor = conn.cursor()
+
+        # Session-local staging table, emptied at every commit
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS tweets_incoming (
+                tweet_id BIGINT,
+                profile_id INTEGER,
+                tweet_text TEXT,
+                timestamp TEXT,
+                language TEXT,
+                likes INTEGER,
+                retweets INTEGER,
+                replies INTEGER,
+                is_retweet BOOLEAN,
+                original_author TEXT,
+                change_seq BIGINT
+            ) ON COMMIT DELETE ROWS
+        """)
+        cursor.execute("TRUNCATE tweets_incoming")
+        cursor.copy_expert(f"COPY tweets_incoming ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+        cursor.execute(f"""
+            INSERT INTO tweets ({columns})
+            SELECT {columns} FROM tweets_incoming
+            ON CONFLICT (tweet_id) DO NOTHING
+        """)
+        new = max(cursor.rowcount, 0)
+
+        # Engagement refresh; rows just inserted already match
+        cursor.execute("""
+            UPDATE tweets t
+            SET likes = i.likes, retweets = i.retweets, replies = i.replies, change_seq = i.change_seq
+            FROM tweets_incoming i
+            WHERE t.tweet_id = i.tweet_id
+              AND (t.likes, t.retweets, t.replies) IS DISTINCT FROM (i.likes, i.retweets, i.replies)
+        """)
+
+        if new or cursor.rowcount > 0:
+            self.mark_profile_changed(conn, profile_id, first_seq + len(rows) - 1)
+        return new
+
+    def iter_tweets(self, profiles=None, date_from='', date_to='', chunk_size=5000):
+        """Tweets in tweet_id order, streamed from a server-side (named) cursor"""
+        filters, params = self._export_filters(profiles, date_from, date_to)
+        conn = self.connect()
+        try:
+            cursor = conn.cursor(name='tweets_export')
+            cursor.itersize = chunk_size
+            cursor.execute(self._sql(EXPORT_SELECT + filters + " ORDER BY t.tweet_id"), params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield [self._export_row(row) for row in rows]
+        finally:
+            conn.rollback()
+            self.release(conn)
+
+    def init_schema(self):
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            for statement in SCHEMA:
+                cursor.execute(statement)
+
+            for column, column_type in SCRAPE_LOG_METRIC_COLUMNS:
+                cursor.execute(f"ALTER TABLE scrape_logs ADD COLUMN IF NOT EXISTS {column} {column_type}")
+
+            self.record_schema_version(cursor)
+
+        logger.info(f"Database initialized: PostgreSQL {self._dsn_label()}")
+
+    def _dsn_label(self):
+        """DSN without the password, for logs"""
+        params = psycopg2.extensions.parse_dsn(self.dsn)
+        return f"{params.get('host', 'localhost')}:{params.get('port', 5432)}/{params.get('dbname', '')}"
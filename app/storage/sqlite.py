@@ -0,0 +1,216 @@
+"""
+SQLite storage (single host, default)
+"""
+import sqlite3
+import logging
+from contextlib import contextmanager
+from app.storage.base import Storage, SCRAPE_LOG_METRIC_COLUMNS, TWEET_INSERT_COLUMNS, tweet_rows, engagement_rows
+
+logger = logging.getLogger(__name__)
+
+# tweet_id (snowflake) is the rowid: no surrogate key, no separate unique
+# index; URL and author are derived on read
+COMPACT_TWEETS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        tweet_id INTEGER PRIMARY KEY,
+        profile_id INTEGER NOT NULL,
+        tweet_text TEXT,
+        timestamp TEXT,
+        language TEXT,
+        likes INTEGER DEFAULT 0,
+        retweets INTEGER DEFAULT 0,
+        replies INTEGER DEFAULT 0,
+        is_retweet BOOLEAN DEFAULT 0,
+        original_author TEXT,
+        scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        change_seq INTEGER NOT NULL DEFAULT 1,
+        FOREIGN KEY (profile_id) REFERENCES profiles (id)
+    )
+"""
+COMPACT_TWEETS_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_tweets_profile_date ON {table} (profile_id, scraped_date)",
+    "CREATE INDEX IF NOT EXISTS idx_tweets_scraped_date ON {table} (scraped_date)",
+    "CREATE INDEX IF NOT EXISTS idx_tweets_change_seq ON {table} (change_seq)",  # + rowid = tweet_id
+)
+
+# Change feed index of a legacy table; its own name so that the compact
+# copy can build idx_tweets_change_seq before the migration swaps them
+LEGACY_CHANGE_SEQ_INDEX = "CREATE INDEX IF NOT EXISTS idx_tweets_legacy_change_seq ON tweets (change_seq, tweet_id)"
+
+# Tweets change sequence (Storage.reserve_change_seq) and the stored
+# positions of change feed consumers
+CHANGE_FEED_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS sequences (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO sequences (name, value) VALUES ('tweets', 1)",
+    """
+    CREATE TABLE IF NOT EXISTS consumer_cursors (
+        name TEXT PRIMARY KEY,
+        position INTEGER NOT NULL DEFAULT 0,
+        position_tweet_id INTEGER,
+        updated_at TIMESTAMP
+    )
+    """,
+)
+
+# Secondary tweets indexes, dropped during bulk_load and rebuilt by init_schema
+DEFERRED_INDEXES = (
+    'idx_tweets_profile_date', 'idx_tweets_scraped_date',
+    'idx_tweets_change_seq', 'idx_tweets_legacy_change_seq'
+)
+
+
+def is_compact(conn, table='tweets'):
+    """True if the tweets table uses the compact schema"""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    return bool(columns) and 'tweet_url' not in columns
+
+
+class SQLiteStorage(Storage):
+    """Local SQLite file; a new connection per transaction"""
+
+    name = 'sqlite'
+
+    TODAY = "DATE('now')"
+    TODAY_FILTER = "DATE(scraped_date) = DATE('now')"
+    DATE_FROM_FILTER = "DATE(scraped_date) >= ?"
+    DATE_TO_FILTER = "DATE(scraped_date) <= ?"
+
+    def __init__(self, path, timeout=30):
+        self.path = str(path)
+        self.timeout = timeout
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=self.timeout)
+
+    def text_filter(self, query):
+        return "tweet_text LIKE ?", [f'%{query}%']
+
+    def insert_tweets(self, conn, profile_id, rows, timestamp):
+        if not rows:
+            return 0
+
+        first_seq = self.reserve_change_seq(conn, len(rows))
+        rows = tweet_rows(profile_id, rows, timestamp, first_seq)
+        cursor = conn.cursor()
+        cursor.executemany(f"""
+            INSERT OR IGNORE INTO tweets ({', '.join(TWEET_INSERT_COLUMNS)})
+            VALUES ({', '.join('?' * len(TWEET_INSERT_COLUMNS))})
+        """, rows)
+        new = max(cursor.rowcount, 0)
+
+        # Engagement refresh; rows just inserted already match
+        cursor.executemany("""
+            UPDATE tweets SET likes = ?1, retweets = ?2, replies = ?3, change_seq = ?4
+            WHERE tweet_id = ?5 AND (likes IS NOT ?1 OR retweets IS NOT ?2 OR replies IS NOT ?3)
+        """, engagement_rows(rows))
+
+        if new or cursor.rowcount > 0:
+            self.mark_profile_changed(conn, profile_id, first_seq + len(rows) - 1)
+        return new
+
+    @contextmanager
+    def bulk_load(self):
+        """
+        Drop the secondary tweets indexes for the import and rebuild them
+        afterwards: one sorted build is much cheaper than a B-tree update
+        per row. Queries that need them are slow in the meantime.
+        """
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            for name in DEFERRED_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.commit()
+        finally:
+            conn.close()
+
+        try:
+            yield
+        finally:
+            self.init_schema()
+            logger.info("Tweets indexes rebuilt after bulk load")
+
+    def init_schema(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS profiles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE NOT NULL,
+                    profile_url TEXT,
+                    scrape_interval_hours INTEGER DEFAULT 12,
+                    last_scraped TIMESTAMP,
+                    is_active BOOLEAN DEFAULT 1,
+                    added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # API validators (Storage.mark_profile_changed)
+            for column, column_type in (('last_change_seq', 'INTEGER'), ('last_changed', 'TIMESTAMP')):
+                try:
+                    cursor.execute(f"ALTER TABLE profiles ADD COLUMN {column} {column_type}")
+                except sqlite3.OperationalError:
+                    pass
+
+            # Databases created before the compact schema keep the legacy
+            # tweets table until migrated (python -m app.storage.migrate_compact)
+            cursor.execute(COMPACT_TWEETS_TABLE.format(table='tweets'))
+
+            # Add columns if they don't exist
+            try:
+                cursor.execute("ALTER TABLE tweets ADD COLUMN is_retweet BOOLEAN DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass
+
+            try:
+                cursor.execute("ALTER TABLE tweets ADD COLUMN original_author TEXT")
+            except sqlite3.OperationalError:
+                pass
+
+            # Change feed: existing rows start at seq 1 (no table rewrite)
+            try:
+                cursor.execute("ALTER TABLE tweets ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 1")
+            except sqlite3.OperationalError:
+                pass
+
+            if is_compact(conn):
+                for statement in COMPACT_TWEETS_INDEXES:
+                    cursor.execute(statement.format(table='tweets'))
+            else:
+                cursor.execute(LEGACY_CHANGE_SEQ_INDEX)
+
+            for statement in CHANGE_FEED_TABLES:
+                cursor.execute(statement)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS scrape_logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    profile_id INTEGER,
+                    status TEXT,
+                    tweets_found INTEGER,
+                    tweets_new INTEGER,
+                    error_message TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (profile_id) REFERENCES profiles (id)
+                )
+            """)
+
+            # Per-phase timing columns for scrape_logs
+            for column, column_type in SCRAPE_LOG_METRIC_COLUMNS:
+                try:
+                    cursor.execute(f"ALTER TABLE scrape_logs ADD COLUMN {column} {column_type}")
+                except sqlite3.OperationalError:
+                    pass
+
+            self.record_schema_version(cursor)
+            conn.commit()
+        finally:
+            conn.close()
+
+        logger.info(f"Database initialized: {self.path}")
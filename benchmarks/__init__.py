@@ -0,0 +1 @@
+# Offline benchmarks (no network, no Chrome)
@@ -0,0 +1,314 @@
+"""
+Load test for the async scrape API with an in-memory Celery broker and a stub scrape task
+
+Serves the Flask app on a threaded local server and drives it with many
+concurrent HTTP clients. Each client queues scrapes through /api/scrape
+and /scrape_now/<username> and polls /api/task/<id> until the task is
+done. The real scrape_profile_task runs, but the driver pool and the
+scraper are replaced with stubs, so no browser or network is involved.
+
+Reports latency percentiles and throughput per route, plus result-backend
+operations (one Redis command each with the Redis backend) and broker
+publishes per request.
+
+    python -m benchmarks.bench_api --clients 200 --iterations 3
+    python -m benchmarks.bench_api --mode eager --clients 50
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import http.client
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_scrape import percentile
+
+# Backend primitives; with the Redis backend each is one round trip
+BACKEND_OPS = ('get', 'mget', 'set', 'delete', 'incr', 'expire')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=('worker', 'eager'), default='worker',
+                        help='worker: in-process worker on a memory broker; eager: tasks run inside the request')
+    parser.add_argument('--clients', type=int, default=100, help='Concurrent HTTP clients')
+    parser.add_argument('--iterations', type=int, default=3, help='Scrapes queued by each client')
+    parser.add_argument('--scrape-now-ratio', type=float, default=0.25,
+                        help='Fraction of scrapes queued through /scrape_now/<username>')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the endpoint mix')
+    parser.add_argument('--task-time', type=float, default=0.2, help='Seconds the stub scrape takes')
+    parser.add_argument('--poll-interval', type=float, default=0.1, help='Seconds between /api/task polls')
+    parser.add_argument('--max-polls', type=int, default=200, help='Give up on a task after this many polls')
+    parser.add_argument('--worker-concurrency', type=int, default=8, help='Worker threads (worker mode)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    return parser.parse_args(argv)
+
+
+class CallCounter:
+    """Counts backend operations and broker publishes per route"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.counts = defaultdict(lambda: defaultdict(int))
+
+    @property
+    def route(self):
+        return getattr(self.local, 'route', 'worker')
+
+    def add(self, name):
+        with self.lock:
+            self.counts[self.route][name] += 1
+
+    def wrap_wsgi(self, wsgi_app, url_map):
+        """Label everything a request does with its URL rule"""
+        adapter_for = url_map.bind_to_environ
+
+        def labelled(environ, start_response):
+            try:
+                rule, _ = adapter_for(environ).match(return_rule=True)
+                self.local.route = f"{environ['REQUEST_METHOD']} {rule.rule}"
+            except Exception:
+                self.local.route = 'unmatched'
+            try:
+                return wsgi_app(environ, start_response)
+            finally:
+                self.local.route = 'server'
+
+        return labelled
+
+    def instrument_backend(self, backend_cls):
+        for name in BACKEND_OPS:
+            original = getattr(backend_cls, name, None)
+            if original is None:
+                continue
+
+            def counted(backend, *args, _original=original, _name=name, **kwargs):
+                self.add(f'backend.{_name}')
+                return _original(backend, *args, **kwargs)
+
+            setattr(backend_cls, name, counted)
+
+
+class StubPool:
+    """Stands in for DriverPool; hands out no driver"""
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        yield None
+
+
+def make_stub_scraper(task_time):
+    class StubScraper:
+        """Stands in for TwitterScraperService; sleeps instead of scraping"""
+
+        def __init__(self, driver=None):
+            pass
+
+        def scrape_profile(self, username, max_tweets=100, progress=None):
+            if progress:
+                progress('navigate')
+            time.sleep(task_time)
+            if progress:
+                progress('persist', tweets=max_tweets)
+            return {
+                'status': 'success',
+                'tweets_found': max_tweets,
+                'tweets_new': 0,
+                'message': f'Stub scrape of @{username}',
+                'metrics': {}
+            }
+
+    return StubScraper
+
+
+def install_stubs(task_time):
+    from app.services import scraper_service, driver_pool
+
+    pool = StubPool()
+    driver_pool.get_driver_pool = lambda *args, **kwargs: pool
+    scraper_service.TwitterScraperService = make_stub_scraper(task_time)
+
+
+def request(port, method, path, body=None):
+    """One HTTP request on a fresh connection; returns (status, json, seconds)"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    started = time.perf_counter()
+    try:
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        payload = None
+    return response.status, payload, elapsed
+
+
+def endpoint_mix(total, ratio, seed):
+    """
+    Which of the total scrapes go through /scrape_now (True): exactly
+    round(total * ratio) of them, shuffled across the whole run so every
+    client and every phase of the run sees both endpoints.
+    """
+    scrape_now = round(total * ratio)
+    mix = [True] * scrape_now + [False] * (total - scrape_now)
+    random.Random(seed).shuffle(mix)
+    return mix
+
+
+def run_client(client_id, port, args, mix, record):
+    """Queue scrapes and poll each one until it finishes"""
+    for iteration in range(args.iterations):
+        username = f'user_{client_id:04d}_{iteration}'
+
+        if mix[client_id * args.iterations + iteration]:
+            route = 'POST /scrape_now/<username>'
+            status, payload, elapsed = request(port, 'POST', f'/scrape_now/{username}')
+        else:
+            route = 'POST /api/scrape'
+            status, payload, elapsed = request(port, 'POST', '/api/scrape', {'username': username, 'max_tweets': 20})
+        record(route, status, elapsed)
+
+        task_id = (payload or {}).get('task_id')
+        if not task_id:
+            continue
+
+        for _ in range(args.max_polls):
+            status, payload, elapsed = request(port, 'GET', f'/api/task/{task_id}')
+            record('GET /api/task/<task_id>', status, elapsed)
+            if (payload or {}).get('status') in ('success', 'failed'):
+                record('task completed', 200, 0.0)
+                break
+            time.sleep(args.poll_interval)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Must happen before config.settings is imported
+    workdir = tempfile.mkdtemp(prefix='bench_api_')
+    os.environ['DATABASE_PATH'] = os.path.join(workdir, 'bench.db')
+    os.environ['CELERY_BROKER_URL'] = 'memory://'
+    os.environ['CELERY_RESULT_BACKEND'] = 'cache+memory://'
+    os.environ.setdefault('ENABLE_METRICS', 'False')
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    from werkzeug.serving import make_server
+    from celery import signals
+    from celery_app.celery_config import celery_app
+    from app import create_app
+
+    mix = endpoint_mix(args.clients * args.iterations, args.scrape_now_ratio, args.seed)
+    if 0 < args.scrape_now_ratio < 1 and (all(mix) or not any(mix)):
+        print(f"warning: {len(mix)} scrapes are too few for a {args.scrape_now_ratio:.0%} /scrape_now mix; "
+              f"only one endpoint is measured (raise --clients or --iterations)", file=sys.stderr)
+
+    counter = CallCounter()
+    counter.instrument_backend(type(celery_app.backend))
+    signals.before_task_publish.connect(lambda **kwargs: counter.add('broker.publish'), weak=False)
+
+    if args.mode == 'eager':
+        celery_app.conf.update(task_always_eager=True, task_store_eager_result=True)
+
+    app = create_app()
+    install_stubs(args.task_time)  # after create_app, which initializes the database
+    app.wsgi_app = counter.wrap_wsgi(app.wsgi_app, app.url_map)
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    server.socket.listen(max(128, args.clients * 2))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+
+    def record(route, status, elapsed):
+        with lock:
+            latencies[route].append(elapsed)
+            if status >= 400:
+                errors[route] += 1
+
+    worker = None
+    if args.mode == 'worker':
+        from celery.contrib.testing.worker import start_worker
+        worker = start_worker(celery_app, pool='threads', concurrency=args.worker_concurrency,
+                              perform_ping_check=False, loglevel='error')
+        worker.__enter__()
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.clients) as executor:
+            futures = [executor.submit(run_client, i, server.server_port, args, mix, record)
+                       for i in range(args.clients)]
+            for future in futures:
+                future.result()
+    finally:
+        elapsed = time.perf_counter() - started
+        if worker is not None:
+            worker.__exit__(None, None, None)
+        server.shutdown()
+
+    completed = len(latencies.pop('task completed', []))
+    queued = args.clients * args.iterations
+    routes = {}
+    for route, values in sorted(latencies.items()):
+        ops = counter.counts.get(route, {})
+        routes[route] = {
+            'requests': len(values),
+            'errors': errors[route],
+            'rps': round(len(values) / elapsed, 1),
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round(max(values) * 1000, 2),
+            'calls_per_request': {name: round(n / len(values), 2) for name, n in sorted(ops.items())}
+        }
+
+    worker_ops = counter.counts.get('worker', {})
+    summary = {
+        'mode': args.mode,
+        'clients': args.clients,
+        'tasks_queued': queued,
+        'tasks_completed': completed,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(sum(r['requests'] for r in routes.values()) / elapsed, 1),
+        'routes': routes,
+        'worker_calls_per_task': {name: round(n / max(completed, 1), 2) for name, n in sorted(worker_ops.items())}
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print(f"{args.mode} mode, {args.clients} clients: {completed}/{queued} tasks completed "
+          f"in {elapsed:.2f}s ({summary['requests_per_second']} req/s)")
+    for route, stats in routes.items():
+        calls = ', '.join(f'{name} {n}' for name, n in stats['calls_per_request'].items()) or '-'
+        print(f"\n  {route}")
+        print(f"    {stats['requests']} requests ({stats['errors']} errors), {stats['rps']} req/s")
+        print(f"    p50 {stats['p50_ms']} ms   p95 {stats['p95_ms']} ms   "
+              f"p99 {stats['p99_ms']} ms   max {stats['max_ms']} ms")
+        print(f"    per request: {calls}")
+    if worker_ops:
+        calls = ', '.join(f'{name} {n}' for name, n in summary['worker_calls_per_task'].items())
+        print(f"\n  worker, per task: {calls}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Disk and query-time savings of the compact tweets schema
+
+Generates a database with the legacy schema, times the dashboard and
+search routes on it, migrates a copy with app.storage.migrate_compact and
+times the routes again.
+
+    python -m benchmarks.bench_compact --tweets 1000000
+"""
+import sys
+import json
+import shutil
+import argparse
+import subprocess
+
+from benchmarks.bench_routes import BENCH_DIR, DATA_DIR
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tweets', type=int, default=100000, help='Tweets in the generated database')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed requests per route')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    return parser.parse_args(argv)
+
+
+def time_routes(database, repeat):
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_routes', '--child', str(database), '--repeat', str(repeat)],
+        check=True, capture_output=True, text=True, cwd=BENCH_DIR.parent
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    legacy = DATA_DIR / f'legacy_{args.tweets}.db'
+    if not legacy.exists():
+        print(f"Generating {legacy} ...", file=sys.stderr)
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.generate_db', '--tweets', str(args.tweets),
+             '--output', str(legacy), '--legacy-schema'],
+            check=True, cwd=BENCH_DIR.parent
+        )
+
+    compact = DATA_DIR / f'compact_{args.tweets}.db'
+    shutil.copyfile(legacy, compact)
+
+    from app.storage.migrate_compact import migrate
+    migration = migrate(str(compact), progress=False)
+
+    before = time_routes(legacy, args.repeat)
+    after = time_routes(compact, args.repeat)
+
+    results = {
+        'tweets': args.tweets,
+        'migration': migration,
+        'routes': {
+            name: {'legacy_ms': before[name].get('median_ms'), 'compact_ms': after[name].get('median_ms')}
+            for name in before
+        }
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{args.tweets:,} tweets: {migration['bytes_before'] / 1e6:.1f} MB -> "
+          f"{migration['bytes_after'] / 1e6:.1f} MB "
+          f"({100 * (1 - migration['bytes_after'] / migration['bytes_before']):.0f}% smaller), "
+          f"migration {migration['seconds']}s (swap {migration['swap_seconds']}s)")
+    for name, stats in results['routes'].items():
+        if stats['legacy_ms'] is None or stats['compact_ms'] is None:
+            continue
+        print(f"  {name:<22} legacy {stats['legacy_ms']:>9.2f} ms   compact {stats['compact_ms']:>9.2f} ms   "
+              f"x{stats['legacy_ms'] / max(stats['compact_ms'], 0.001):.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
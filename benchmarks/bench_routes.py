@@ -0,0 +1,168 @@
+"""
+Dashboard and search route benchmark on synthetic databases
+
+Generates (once) a database per size with benchmarks.generate_db, times
+each route through the Flask test client and compares the medians with
+the stored baseline. Exits 1 on a regression.
+
+    python -m benchmarks.bench_routes                          # 10k tweets
+    python -m benchmarks.bench_routes --sizes 10000 1000000 10000000
+    python -m benchmarks.bench_routes --update-baseline
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+DATA_DIR = BENCH_DIR / '.data'
+BASELINE_FILE = BENCH_DIR / 'baselines' / 'routes.json'
+
+
+def routes_for(profiles):
+    """Routes to time; user_00000 is the largest profile, the last one the smallest"""
+    return {
+        'home': '/',
+        'view_tweets_large': '/tweets/user_00000',
+        'view_tweets_small': f'/tweets/user_{profiles - 1:05d}',
+        'search_text': '/search?q=rocket',
+        'search_text_by_likes': '/search?q=python&sort=likes',
+        'search_author_lang': '/search?author=user_00001&lang=es',
+        'search_date_range': '/search?date_from=2000-01-01&date_to=2100-01-01',
+        'search_form': '/search',
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000], help='Tweet counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed requests per route')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed slowdown vs baseline (0.5 = +50%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help='Ignore regressions smaller than this')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def run_child(database, repeat):
+    """Time every route against one database (runs in its own process)"""
+    os.environ['DATABASE_PATH'] = database
+    os.environ['ENABLE_METRICS'] = 'False'
+    os.environ['CACHE_ENABLED'] = 'False'  # time the queries, not cache hits
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    import sqlite3
+    from app import create_app
+
+    conn = sqlite3.connect(database)
+    profiles = conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+    conn.close()
+
+    client = create_app().test_client()
+    results = {}
+
+    for name, url in routes_for(profiles).items():
+        response = client.get(url)  # warm-up (page cache, template compile)
+        if response.status_code != 200:
+            results[name] = {'error': response.status_code}
+            continue
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        results[name] = {
+            'median_ms': round(statistics.median(timings), 2),
+            'max_ms': round(max(timings), 2),
+            'bytes': len(response.data)
+        }
+
+    print(json.dumps(results))
+
+
+def ensure_database(size):
+    """Path to the synthetic database for size, generating it if needed"""
+    path = DATA_DIR / f'tweets_{size}.db'
+    if not path.exists():
+        print(f"Generating {path} ...", file=sys.stderr)
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.generate_db', '--tweets', str(size), '--output', str(path)],
+            check=True, cwd=BENCH_DIR.parent
+        )
+    return path
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.child:
+        run_child(args.child, args.repeat)
+        return 0
+
+    results = {}
+    for size in args.sizes:
+        database = ensure_database(size)
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_routes', '--child', str(database), '--repeat', str(args.repeat)],
+            check=True, capture_output=True, text=True, cwd=BENCH_DIR.parent
+        )
+        results[str(size)] = json.loads(output.stdout.strip().splitlines()[-1])
+
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    regressions = []
+
+    for size, routes in results.items():
+        for name, stats in routes.items():
+            base = baseline.get(size, {}).get(name)
+            stats['baseline_ms'] = base['median_ms'] if base else None
+            if not base or 'median_ms' not in stats:
+                continue
+            limit = base['median_ms'] * (1 + args.tolerance)
+            if stats['median_ms'] > limit and stats['median_ms'] - base['median_ms'] > args.min_delta_ms:
+                regressions.append(f"{name} @ {int(size):,} tweets: {stats['median_ms']} ms "
+                                   f"(baseline {base['median_ms']} ms)")
+
+    if args.json:
+        print(json.dumps({'results': results, 'regressions': regressions}, indent=2))
+    else:
+        for size, routes in results.items():
+            print(f"\n{int(size):,} tweets")
+            for name, stats in routes.items():
+                if 'error' in stats:
+                    print(f"  {name:<22} HTTP {stats['error']}")
+                    continue
+                base = f"{stats['baseline_ms']:>9.2f}" if stats['baseline_ms'] is not None else '        -'
+                print(f"  {name:<22} median {stats['median_ms']:>9.2f} ms   max {stats['max_ms']:>9.2f} ms   "
+                      f"baseline {base} ms")
+
+    if args.update_baseline:
+        for size, routes in results.items():
+            baseline[size] = {
+                name: {'median_ms': stats['median_ms']}
+                for name, stats in routes.items() if 'median_ms' in stats
+            }
+        BASELINE_FILE.parent.mkdir(exist_ok=True)
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+        print(f"\nBaseline written to {BASELINE_FILE}")
+        return 0
+
+    if regressions:
+        print("\nRegressions:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+End-to-end scrape benchmark against the fake WebDriver (no network, no Chrome)
+
+Runs TwitterScraperService.scrape_profile - scrolling, extraction and
+SQLite persistence - over synthetic or recorded timelines and reports
+throughput and per-phase timings.
+
+    python -m benchmarks.bench_scrape --profiles 20 --tweets 120 --latency 0.002
+    python -m benchmarks.bench_scrape --fixtures
+    python -m benchmarks.bench_scrape --latency 0.05 --progress --progress-scrolls 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', type=int, default=10, help='Synthetic profiles to scrape')
+    parser.add_argument('--tweets', type=int, default=100, help='Tweets per synthetic timeline')
+    parser.add_argument('--fixtures', action='store_true', help='Use the recorded timelines in benchmarks/fixtures')
+    parser.add_argument('--passes', type=int, default=2, help='Scrapes per profile (later passes hit existing tweets)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to each WebDriver call')
+    parser.add_argument('--page-time-scale', type=float, default=0.0, help='Fraction of in-page scroll delays to sleep')
+    parser.add_argument('--max-tweets', type=int, default=None, help='max_tweets passed to scrape_profile')
+    parser.add_argument('--progress', action='store_true', help='Pass a progress callback, like scrape_profile_task')
+    parser.add_argument('--progress-scrolls', type=int, default=None,
+                        help='SCRAPE_PROGRESS_SCROLLS for this run (0: scroll in one round trip)')
+    parser.add_argument('--database', help='SQLite file to use (default: temporary file)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Must happen before config.settings is imported
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix='bench_scrape_'), 'bench.db')
+    os.environ['DATABASE_PATH'] = database
+    os.environ.setdefault('ENABLE_METRICS', 'False')
+    if args.progress_scrolls is not None:
+        os.environ['SCRAPE_PROGRESS_SCROLLS'] = str(args.progress_scrolls)
+
+    import logging
+    logging.disable(logging.INFO)
+
+    import sqlite3
+    from app.services.scraper_service import TwitterScraperService
+    from benchmarks.fake_driver import FakeWebDriver, FIXTURES_DIR, load_timeline, make_timeline
+
+    TwitterScraperService.INITIAL_LOAD_WAIT = 0
+    TwitterScraperService.TWEETS_SETTLE_WAIT = 0
+
+    if args.fixtures:
+        timelines = {}
+        for path in sorted(FIXTURES_DIR.glob('timeline_*.json')):
+            timeline = load_timeline(path.stem)
+            timelines[timeline['username']] = timeline
+    else:
+        timelines = {
+            f'bench_user_{i}': make_timeline(f'bench_user_{i}', args.tweets)
+            for i in range(args.profiles)
+        }
+
+    TwitterScraperService().init_database()
+    conn = sqlite3.connect(database)
+    conn.executemany(
+        "INSERT OR IGNORE INTO profiles (username, profile_url) VALUES (?, ?)",
+        [(username, f'https://x.com/{username}') for username in timelines]
+    )
+    conn.commit()
+    conn.close()
+
+    driver = FakeWebDriver(timelines, latency=args.latency, page_time_scale=args.page_time_scale)
+    passes = []
+
+    for pass_number in range(1, args.passes + 1):
+        driver.calls.clear()
+        phases = {}
+        totals = []
+        tweets_found = 0
+        tweets_new = 0
+        extract_bytes = 0
+        errors = 0
+        reports = []
+        progress = (lambda phase, **info: reports.append(phase)) if args.progress else None
+
+        started = time.perf_counter()
+        for username in timelines:
+            # New service per scrape, like scrape_profile_task
+            result = TwitterScraperService(driver=driver).scrape_profile(username, max_tweets=args.max_tweets,
+                                                                        progress=progress)
+            metrics = result.get('metrics', {})
+
+            if result['status'] != 'success':
+                errors += 1
+            tweets_found += result.get('tweets_found', 0)
+            tweets_new += result.get('tweets_new', 0)
+            extract_bytes += metrics.get('extract_bytes', 0)
+            totals.append(metrics.get('total', 0.0))
+            for phase, seconds in metrics.get('durations', {}).items():
+                phases.setdefault(phase, []).append(seconds)
+        elapsed = time.perf_counter() - started
+
+        scrapes = len(timelines)
+        passes.append({
+            'pass': pass_number,
+            'profiles': scrapes,
+            'errors': errors,
+            'seconds': round(elapsed, 4),
+            'profiles_per_second': round(scrapes / elapsed, 2) if elapsed else None,
+            'tweets_found': tweets_found,
+            'tweets_new': tweets_new,
+            'new_tweets_per_second': round(tweets_new / elapsed, 1) if elapsed else None,
+            'extract_bytes_per_scrape': extract_bytes // max(scrapes, 1),
+            'progress_reports_per_scrape': round(len(reports) / scrapes, 2),
+            'webdriver_calls_per_scrape': {
+                name: round(count / scrapes, 2) for name, count in sorted(driver.calls.items())
+            },
+            'scrape_ms': {
+                'mean': round(statistics.mean(totals) * 1000, 2) if totals else 0,
+                'p95': round(percentile(totals, 95) * 1000, 2)
+            },
+            'phase_ms': {
+                phase: {
+                    'mean': round(statistics.mean(values) * 1000, 3),
+                    'p95': round(percentile(values, 95) * 1000, 3)
+                }
+                for phase, values in phases.items()
+            }
+        })
+
+    if args.json:
+        print(json.dumps({'database': database, 'passes': passes}, indent=2))
+        return 0
+
+    print(f"Database: {database}")
+    for result in passes:
+        print(f"\nPass {result['pass']}: {result['profiles']} profiles in {result['seconds']:.3f}s "
+              f"({result['profiles_per_second']} profiles/s, {result['new_tweets_per_second']} new tweets/s)")
+        print(f"  tweets found/new: {result['tweets_found']}/{result['tweets_new']}  errors: {result['errors']}")
+        print(f"  scrape ms mean/p95: {result['scrape_ms']['mean']}/{result['scrape_ms']['p95']}  "
+              f"extract bytes/scrape: {result['extract_bytes_per_scrape']}")
+        print(f"  webdriver calls/scrape: {result['webdriver_calls_per_scrape']}")
+        if args.progress:
+            print(f"  progress reports/scrape: {result['progress_reports_per_scrape']}")
+        for phase, stats in result['phase_ms'].items():
+            print(f"    {phase:<14} mean {stats['mean']:>9.3f} ms   p95 {stats['p95']:>9.3f} ms")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Throughput of the web tier: Flask development server vs gunicorn
+
+Starts each server on a synthetic database (benchmarks.generate_db) with
+the response cache off, drives it with concurrent HTTP clients for a
+fixed time over a mix of dashboard, search and JSON API routes, and
+reports requests per second and latency percentiles.
+
+    python -m benchmarks.bench_server --clients 32 --seconds 15
+    python -m benchmarks.bench_server --workers 4 --threads 8
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+from collections import defaultdict
+
+from benchmarks.bench_routes import BENCH_DIR, ensure_database
+from benchmarks.bench_scrape import percentile
+
+ROUTES = (
+    '/',
+    '/tweets/user_00001',
+    '/search?q=rocket',
+    '/search?q=python&sort=likes',
+    '/api/search?q=python&limit=50',
+    '/api/profiles/user_00001/tweets?limit=50',
+)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tweets', type=int, default=100000, help='Tweets in the generated database')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent HTTP clients')
+    parser.add_argument('--seconds', type=float, default=10, help='Load duration per server')
+    parser.add_argument('--workers', type=int, help='gunicorn workers (default: WEB_WORKERS)')
+    parser.add_argument('--threads', type=int, help='Threads per gunicorn worker (default: WEB_THREADS)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    return parser.parse_args(argv)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_listening(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not listen on :{port} within {timeout}s")
+
+
+def get(port, path):
+    """One GET on a fresh connection; returns (status, seconds)"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    started = time.perf_counter()
+    try:
+        conn.request('GET', path)
+        response = conn.getresponse()
+        response.read()
+        return response.status, time.perf_counter() - started
+    finally:
+        conn.close()
+
+
+def load(port, clients, seconds):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(offset):
+        i = offset
+        while time.perf_counter() < deadline:
+            path = ROUTES[i % len(ROUTES)]
+            i += 1
+            try:
+                status, elapsed = get(port, path)
+            except OSError:
+                status, elapsed = 599, 0.0
+            with lock:
+                latencies[path].append(elapsed)
+                if status >= 400:
+                    errors[path] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    every = [value for values in latencies.values() for value in values]
+    return {
+        'requests': len(every),
+        'errors': sum(errors.values()),
+        'rps': round(len(every) / elapsed, 1),
+        'p50_ms': round(percentile(every, 50) * 1000, 2),
+        'p95_ms': round(percentile(every, 95) * 1000, 2),
+        'p99_ms': round(percentile(every, 99) * 1000, 2),
+        'routes': {
+            path: {'requests': len(values), 'p50_ms': round(percentile(values, 50) * 1000, 2)}
+            for path, values in latencies.items()
+        }
+    }
+
+
+def run_server(name, command, env, args):
+    port = free_port()
+    env = dict(env, FLASK_HOST='127.0.0.1', FLASK_PORT=str(port))
+    process = subprocess.Popen(command, env=env, cwd=BENCH_DIR.parent,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_listening(port, process)
+        for path in ROUTES:  # warm-up: imports, template compile, page cache
+            get(port, path)
+        return load(port, args.clients, args.seconds)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database = ensure_database(args.tweets)
+
+    env = dict(os.environ, DATABASE_PATH=str(database), CACHE_ENABLED='False',
+               ENABLE_METRICS='False', LOG_LEVEL='WARNING')
+    if args.workers:
+        env['WEB_WORKERS'] = str(args.workers)
+    if args.threads:
+        env['WEB_THREADS'] = str(args.threads)
+
+    servers = {
+        'flask_dev': [sys.executable, 'run.py'],
+        'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'config/gunicorn_conf.py', 'wsgi:app'],
+    }
+
+    results = {}
+    for name, command in servers.items():
+        print(f"Benchmarking {name} ...", file=sys.stderr)
+        try:
+            results[name] = run_server(name, command, env, args)
+        except RuntimeError as e:
+            results[name] = {'error': str(e)}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{args.tweets:,} tweets, {args.clients} clients, {args.seconds:g}s per server")
+    for name, stats in results.items():
+        if 'error' in stats:
+            print(f"  {name:<10} {stats['error']}")
+            continue
+        print(f"  {name:<10} {stats['rps']:>8} req/s   p50 {stats['p50_ms']:>8} ms   p95 {stats['p95_ms']:>8} ms   "
+              f"p99 {stats['p99_ms']:>8} ms   ({stats['requests']} requests, {stats['errors']} errors)")
+
+    dev, prod = results.get('flask_dev', {}), results.get('gunicorn', {})
+    if dev.get('rps') and prod.get('rps'):
+        print(f"  gunicorn x{prod['rps'] / dev['rps']:.2f} throughput")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
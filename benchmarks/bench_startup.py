@@ -0,0 +1,95 @@
+"""
+Cold start of the web tier: import time and memory of create_app()
+
+Runs create_app() in a fresh interpreter under -X importtime and reports
+the wall time, peak RSS, the slowest top-level imports and whether the
+worker-only stacks (Selenium, Celery) were loaded.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 5 --top 15
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+from benchmarks.bench_routes import BENCH_DIR
+
+CHILD = """
+import sys, time, json, resource
+started = time.perf_counter()
+from app import create_app
+create_app()
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    'seconds': elapsed,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modules': len(sys.modules),
+    'loaded': {name: name in sys.modules for name in ('selenium', 'celery', 'bs4', 'pyarrow')},
+}))
+"""
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters to time')
+    parser.add_argument('--top', type=int, default=10, help='Slowest top-level imports to list')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    return parser.parse_args(argv)
+
+
+def parse_importtime(stderr):
+    """Cumulative microseconds of each top-level import from -X importtime output"""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):  # nested imports are indented further
+            imports[name.strip()] = imports.get(name.strip(), 0) + int(cumulative)
+    return imports
+
+
+def run_once():
+    env = dict(os.environ, ENABLE_METRICS=os.getenv('ENABLE_METRICS', 'False'))
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        check=True, capture_output=True, text=True, cwd=BENCH_DIR.parent, env=env
+    )
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result['imports'] = parse_importtime(output.stderr)
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    runs = [run_once() for _ in range(args.runs)]
+
+    last = runs[-1]
+    top = sorted(last['imports'].items(), key=lambda item: item[1], reverse=True)[:args.top]
+    summary = {
+        'seconds_median': round(statistics.median(run['seconds'] for run in runs), 3),
+        'rss_mb_median': round(statistics.median(run['rss_mb'] for run in runs), 1),
+        'import_seconds': round(sum(last['imports'].values()) / 1e6, 3),
+        'modules': last['modules'],
+        'loaded': last['loaded'],
+        'top_imports_ms': {name: round(us / 1000, 1) for name, us in top},
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print(f"create_app(): {summary['seconds_median'] * 1000:.0f} ms, peak RSS {summary['rss_mb_median']} MB, "
+          f"{summary['modules']} modules (median of {args.runs} runs)")
+    print("  loaded: " + ', '.join(f"{name} {'yes' if loaded else 'no'}" for name, loaded in summary['loaded'].items()))
+    print("  slowest top-level imports:")
+    for name, ms in summary['top_imports_ms'].items():
+        print(f"    {name:<40} {ms:>8.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Fake WebDriver for offline benchmarks
+
+Implements the subset of the Selenium API that TwitterScraperService and
+DriverPool use, backed by JSON timeline fixtures. The page scripts are
+recognized by identity and answered the way the real page would; no JS
+is executed.
+"""
+import json
+import zlib
+import time
+from pathlib import Path
+from benchmarks.synthetic import (
+    RETWEET_RATE, make_rng, random_text, random_language, random_engagement
+)
+from app.services.scraper_service import EXTRACT_TWEETS_JS, SCROLL_TIMELINE_JS
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+EXTRACT_HEADER = ['tweet_id', 'username', 'text', 'language', 'likes', 'retweets', 'replies', 'is_retweet']
+
+
+def load_timeline(name):
+    """Load a fixture from benchmarks/fixtures/<name>.json"""
+    with open(FIXTURES_DIR / f'{name}.json', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def make_timeline(username, count, seed=0, first_id=1900000000000000000):
+    """
+    Synthesize a timeline fixture (same shape as the JSON fixtures).
+    Tweet ids are derived from the username so profiles never collide.
+    """
+    rng = make_rng(username, seed)
+    base = first_id + (zlib.crc32(username.encode()) % 10**6) * 10**6
+    tweets = []
+
+    for i in range(count):
+        is_retweet = rng.random() < RETWEET_RATE
+        likes, retweets, replies = random_engagement(rng)
+        tweets.append({
+            'tweet_id': str(base - i * 1000),
+            'username': f'user{rng.randint(1, 500)}' if is_retweet else username,
+            'text': random_text(rng),
+            'language': random_language(rng),
+            'likes': likes,
+            'retweets': retweets,
+            'replies': replies,
+            'is_retweet': is_retweet
+        })
+
+    return {'username': username, 'tweets': tweets}
+
+
+class FakeElement:
+    """Returned by find_element so WebDriverWait conditions succeed"""
+
+
+class FakeWebDriver:
+    """
+    In-memory stand-in for selenium.webdriver.Chrome.
+
+    Args:
+        timelines: dict username -> timeline fixture
+        latency: Seconds added to every WebDriver call (chromedriver round trip)
+        page_time_scale: Fraction of the in-page scroll delays actually slept
+        tweets_per_scroll: Articles revealed by each progressive scroll
+        initially_loaded: Articles present before scrolling
+    """
+
+    def __init__(self, timelines, latency=0.0, page_time_scale=0.0,
+                 tweets_per_scroll=12, initially_loaded=20):
+        self.timelines = timelines
+        self.latency = latency
+        self.page_time_scale = page_time_scale
+        self.tweets_per_scroll = tweets_per_scroll
+        self.initially_loaded = initially_loaded
+        self.calls = {}
+        self.cookies = []  # CDP Network.Cookie dicts
+        self._url = 'about:blank'
+        self._tweets = []
+        self._loaded = 0
+
+    def _call(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def current_url(self):
+        self._call('current_url')
+        return self._url
+
+    def get(self, url):
+        self._call('get')
+        self._url = url
+        username = url.rstrip('/').rsplit('/', 1)[-1]
+        timeline = self.timelines.get(username, {'tweets': []})
+        self._tweets = timeline['tweets']
+        self._loaded = min(self.initially_loaded, len(self._tweets))
+
+    def find_element(self, by=None, value=None):
+        self._call('find_element')
+        return FakeElement()
+
+    def execute_script(self, script, *args):
+        self._call('execute_script')
+        if script == EXTRACT_TWEETS_JS:
+            return [EXTRACT_HEADER] + [
+                [t['tweet_id'], t['username'], t['text'], t['language'],
+                 t['likes'], t['retweets'], t['replies'], int(t['is_retweet'])]
+                for t in self._tweets[:self._loaded]
+            ]
+        return None
+
+    def execute_async_script(self, script, *args):
+        self._call('execute_async_script')
+        if script != SCROLL_TIMELINE_JS:
+            return None
+
+        opts = args[0]
+        finished = bool(opts.get('final', True))
+        if self.page_time_scale:
+            in_page_ms = opts['warmupScrolls'] * opts['warmupDelay']
+            in_page_ms += opts['settleDelay'] if opts['warmupScrolls'] else 0
+            time.sleep(in_page_ms / 1000 * self.page_time_scale)
+
+        iterations = []
+        last_height = opts.get('lastHeight', 0)
+        stable = opts.get('stable', 0)
+        for _ in range(opts['maxScrolls']):
+            if self.page_time_scale:
+                time.sleep(opts['scrollDelay'] / 1000 * self.page_time_scale)
+
+            self._loaded = min(self._loaded + self.tweets_per_scroll, len(self._tweets))
+            height = 1080 + self._loaded * 600
+            iterations.append([height, self._loaded])
+            if height == last_height:
+                stable += 1
+                if stable >= 3:
+                    finished = True
+                    break
+            else:
+                stable = 0
+                last_height = height
+
+        if finished and self.page_time_scale:
+            time.sleep(opts['finalDelay'] / 1000 * self.page_time_scale)
+
+        return {'iterations': iterations, 'error': None, 'lastHeight': last_height,
+                'stable': stable, 'finished': finished}
+
+    def set_script_timeout(self, seconds):
+        self._call('set_script_timeout')
+
+    def set_page_load_timeout(self, seconds):
+        self._call('set_page_load_timeout')
+
+    def execute_cdp_cmd(self, cmd, params):
+        self._call('execute_cdp_cmd')
+        if cmd == 'Network.getAllCookies':
+            return {'cookies': [dict(cookie) for cookie in self.cookies]}
+        if cmd == 'Network.clearBrowserCookies':
+            self.cookies = []
+        elif cmd == 'Network.setCookies':
+            self.cookies += [dict(cookie) for cookie in params['cookies']]
+        return {}
+
+    def delete_all_cookies(self):
+        self._call('delete_all_cookies')
+
+    def quit(self):
+        self._call('quit')
@@ -0,0 +1,162 @@
+"""
+Synthetic database generator
+
+Fills the profiles, tweets and scrape_logs tables to a target size with
+realistic text, language mix and heavy-tailed engagement, using the
+application's own schema.
+
+    python -m benchmarks.generate_db --tweets 1000000 --output benchmarks/.data/tweets_1000000.db
+"""
+import os
+import sys
+import time
+import argparse
+import itertools
+import sqlite3
+from datetime import datetime, timedelta
+
+CHUNK_SIZE = 20000
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tweets', type=int, default=10000, help='Tweets to generate')
+    parser.add_argument('--profiles', type=int, default=None, help='Profiles (default: tweets / 2000, at least 20)')
+    parser.add_argument('--days', type=int, default=365, help='Spread scraped_date over this many days')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True, help='SQLite file to create (must not exist)')
+    parser.add_argument('--legacy-schema', action='store_true',
+                        help='Use the pre-compact tweets table (TEXT tweet_id, stored tweet_url/author)')
+    return parser.parse_args(argv)
+
+
+def generate(output, tweets, profiles=None, days=365, seed=0, progress=True, legacy_schema=False):
+    """
+    Create output with the application schema and fill it.
+
+    Returns:
+        dict: row counts and elapsed seconds
+    """
+    if os.path.exists(output):
+        raise FileExistsError(f"{output} already exists")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    # The schema comes from the app; config reads DATABASE_PATH at import
+    os.environ['DATABASE_PATH'] = os.path.abspath(output)
+    from app.services.scraper_service import TwitterScraperService
+    from benchmarks.synthetic import (
+        RETWEET_RATE, make_rng, random_text, random_language, random_engagement
+    )
+
+    if legacy_schema:
+        from app.storage.migrate_compact import LEGACY_TWEETS_TABLE
+        conn = sqlite3.connect(output)
+        conn.execute(LEGACY_TWEETS_TABLE)
+        conn.close()
+    TwitterScraperService().init_database()
+
+    rng = make_rng('generate_db', seed)
+    profiles = profiles or max(20, tweets // 2000)
+    usernames = [f'user_{i:05d}' for i in range(profiles)]
+    # A few accounts hold most of the tweets
+    profile_cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(profiles)))
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(output)
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+
+    now = datetime.now()
+    first_day = now - timedelta(days=days)
+    conn.executemany(
+        "INSERT INTO profiles (username, profile_url, last_scraped, added_date) VALUES (?, ?, ?, ?)",
+        [(username, f'https://x.com/{username}', now.isoformat(), first_day.isoformat(sep=' '))
+         for username in usernames]
+    )
+
+    columns = ('tweet_id, profile_id, tweet_text, timestamp, language, likes, retweets, replies, '
+               'is_retweet, original_author, scraped_date')
+    if legacy_schema:
+        columns += ', tweet_url, author'
+    insert_sql = f"INSERT INTO tweets ({columns}) VALUES ({', '.join('?' * (columns.count(',') + 1))})"
+
+    # IDs grow with time, like snowflakes (and appends keep B-tree pages full)
+    tweet_id = 1500000000000000000
+    step = timedelta(days=days) / max(tweets, 1)
+    inserted = 0
+
+    while inserted < tweets:
+        batch = []
+        chunk = min(CHUNK_SIZE, tweets - inserted)
+        for profile_index in rng.choices(range(profiles), cum_weights=profile_cum_weights, k=chunk):
+            username = usernames[profile_index]
+            is_retweet = rng.random() < RETWEET_RATE
+            likes, retweets, replies = random_engagement(rng)
+            scraped = (first_day + step * inserted).isoformat(sep=' ', timespec='seconds')
+            tweet_id += rng.randint(1000, 10**9)
+
+            original_author = f'user_{rng.randrange(profiles):05d}' if is_retweet else None
+            row = (
+                tweet_id, profile_index + 1, random_text(rng), scraped,
+                random_language(rng), likes, retweets, replies, is_retweet,
+                original_author, scraped
+            )
+            if legacy_schema:
+                url_author = original_author if is_retweet else username
+                row = (str(tweet_id),) + row[1:] + (f'https://x.com/{url_author}/status/{tweet_id}', username)
+            batch.append(row)
+            inserted += 1
+
+        conn.executemany(insert_sql, batch)
+        conn.commit()
+
+        if progress:
+            rate = inserted / (time.perf_counter() - started)
+            print(f"\r  {inserted:,}/{tweets:,} tweets ({rate:,.0f}/s)", end='', file=sys.stderr, flush=True)
+
+    # Roughly one scrape per 50 tweets, mostly successful
+    logs = []
+    for _ in range(max(profiles, tweets // 50)):
+        ok = rng.random() < 0.9
+        found = rng.randint(0, 100) if ok else 0
+        logs.append((
+            rng.randint(1, profiles), 'success' if ok else 'error', found, rng.randint(0, found),
+            None if ok else 'No tweets found in DOM',
+            (first_day + timedelta(seconds=rng.uniform(0, days * 86400))).isoformat(sep=' ', timespec='seconds')
+        ))
+    conn.executemany("""
+        INSERT INTO scrape_logs (profile_id, status, tweets_found, tweets_new, error_message, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, logs)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+    if progress:
+        print(file=sys.stderr)
+
+    return {
+        'profiles': profiles,
+        'tweets': tweets,
+        'scrape_logs': len(logs),
+        'seconds': round(time.perf_counter() - started, 2),
+        'bytes': os.path.getsize(output)
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    import logging
+    logging.disable(logging.INFO)
+
+    summary = generate(args.output, args.tweets, args.profiles, args.days, args.seed,
+                       legacy_schema=args.legacy_schema)
+    print(f"{args.output}: {summary['profiles']:,} profiles, {summary['tweets']:,} tweets, "
+          f"{summary['scrape_logs']:,} scrape logs, {summary['bytes'] / 1e6:.1f} MB "
+          f"in {summary['seconds']}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
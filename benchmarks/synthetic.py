@@ -0,0 +1,46 @@
+"""
+Synthetic tweet content shared by the benchmark generators
+"""
+import random
+
+# Zipf-ish vocabulary: earlier words are picked more often
+WORDS = (
+    'the to and of a in is for on that with this it we are new be at you our '
+    'launch update model data open source release today team feature performance '
+    'fast build ship api users thanks great news announcing beta scale latency '
+    'python rust web mobile search video live community election economy market '
+    'price policy football music space rocket science climate energy health '
+    'gobierno libertad país economía inflación mercado hoy gracias equipo nuevo'
+).split()
+WORD_WEIGHTS = [1 / (rank + 1) ** 0.9 for rank in range(len(WORDS))]
+
+LANGUAGES = ['en', 'es', 'pt', 'ja', 'fr', 'de', 'und']
+LANGUAGE_WEIGHTS = [55, 22, 8, 6, 4, 3, 2]
+
+RETWEET_RATE = 0.15
+
+
+def random_text(rng, min_words=6, max_words=45):
+    """Tweet-like text of realistic length"""
+    words = rng.choices(WORDS, weights=WORD_WEIGHTS, k=rng.randint(min_words, max_words))
+    if rng.random() < 0.3:
+        words.append(f'#{rng.choice(WORDS)}')
+    if rng.random() < 0.2:
+        words.append(f'https://t.co/{rng.getrandbits(40):010x}')
+    return ' '.join(words)
+
+
+def random_language(rng):
+    return rng.choices(LANGUAGES, weights=LANGUAGE_WEIGHTS)[0]
+
+
+def random_engagement(rng):
+    """(likes, retweets, replies) with heavy-tailed distributions"""
+    likes = int(rng.paretovariate(1.1) * 5) - 5
+    retweets = int(likes * rng.uniform(0.05, 0.4))
+    replies = int(likes * rng.uniform(0.01, 0.15))
+    return likes, retweets, replies
+
+
+def make_rng(*seed_parts):
+    return random.Random('-'.join(str(part) for part in seed_parts))
@@ -14,11 +14,15 @@ from config.settings import (
     CELERY_RESULT_BACKEND,
     CELERY_TASK_TRACK_STARTED,
     CELERY_TASK_TIME_LIMIT,
-    CELERY_WORKER_PREFETCH_MULTIPLIER
+    CELERY_WORKER_PREFETCH_MULTIPLIER,
+    CLUSTER_STATUS_INTERVAL,
+    CELERY_RESULT_EXPIRES,
+    RESULT_JANITOR_INTERVAL
 )
 
-# Create Celery app
-celery_app = Celery('twitter_scraper')
+# Create Celery app. Tasks and worker signal handlers are imported by the
+# worker and beat (include); the web tier only sends tasks by name.
+celery_app = Celery('twitter_scraper', include=['celery_app.tasks', 'celery_app.signals'])
 
 # Configure Celery
 celery_app.conf.update(
@@ -39,16 +43,34 @@ celery_app.conf.update(
     task_routes={
         'celery_app.tasks.scrape_profile_task': {'queue': 'scraping'},
         'celery_app.tasks.scrape_multiple_profiles_task': {'queue': 'scraping'},
+        'celery_app.tasks.persist_batches_task': {'queue': 'persistence'},
     },
 
     # Task queues
     task_queues=(
         Queue('scraping', routing_key='scraping'),
         Queue('default', routing_key='default'),
+        Queue('persistence', routing_key='persistence'),  # single writer
     ),
+    task_default_queue='default',
 
-    # Result expiration
-    result_expires=3600,  # 1 hour
+    # Periodic tasks (run celery beat)
+    beat_schedule={
+        'collect-cluster-status': {
+            'task': 'celery_app.tasks.collect_cluster_status',
+            'schedule': CLUSTER_STATUS_INTERVAL,
+            # Skip stale runs instead of piling up while workers are busy
+            'options': {'expires': CLUSTER_STATUS_INTERVAL},
+        },
+        'cleanup-task-results': {
+            'task': 'celery_app.tasks.cleanup_old_tasks',
+            'schedule': RESULT_JANITOR_INTERVAL,
+            'options': {'expires': RESULT_JANITOR_INTERVAL},
+        },
+    },
+
+    # Result expiration (keys left without a TTL are removed by cleanup_old_tasks)
+    result_expires=CELERY_RESULT_EXPIRES,
 
     # Task acks late (for reliability)
     task_acks_late=True,
@@ -57,11 +79,8 @@ celery_app.conf.update(
     worker_max_tasks_per_child=50,  # Restart worker after 50 tasks
     worker_disable_rate_limits=False,
 
-    # Task result settings
-    result_extended=True,  # Store task args/kwargs
+    # Task result settings: no args/kwargs/name in every result key
+    result_extended=False,
 )
 
-# Import tasks (must be after app configuration)
-from celery_app import tasks
-
 __all__ = ['celery_app']
@@ -0,0 +1,58 @@
+"""
+Task client for the web tier
+
+Tasks are sent by name (celery_app.send_task), so the web process never
+imports celery_app.tasks or the scraping code behind it: celery_config
+only lists it in `include`, which workers and beat import. Celery itself
+is only imported by the first request that queues a task or reads a result.
+"""
+from threading import Lock
+
+_celery_app = None
+_celery_app_lock = Lock()
+
+
+def get_celery_app():
+    """The configured Celery app, imported on first use"""
+    global _celery_app
+
+    if _celery_app is None:
+        with _celery_app_lock:
+            if _celery_app is None:
+                from celery_app.celery_config import celery_app
+                _celery_app = celery_app
+
+    return _celery_app
+
+
+class TaskProxy:
+    """Stand-in for a task object: delay() and apply_async() by task name"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def delay(self, *args, **kwargs):
+        return self.apply_async(args, kwargs)
+
+    def apply_async(self, args=(), kwargs=None, **options):
+        app = get_celery_app()
+
+        # send_task ignores task_always_eager; eager setups (benchmarks) run
+        # the real task, so its module is imported here as a worker would
+        if app.conf.task_always_eager:
+            app.loader.import_default_modules()
+            return app.tasks[self.name].apply_async(args, kwargs, **options)
+
+        return app.send_task(self.name, args=args, kwargs=kwargs, **options)
+
+    def __repr__(self):
+        return f"<TaskProxy {self.name}>"
+
+
+def async_result(task_id):
+    """AsyncResult of a task on the configured result backend"""
+    from celery.result import AsyncResult
+    return AsyncResult(task_id, app=get_celery_app())
+
+
+scrape_profile_task = TaskProxy('celery_app.tasks.scrape_profile_task')
@@ -0,0 +1,29 @@
+"""
+Celery worker signal handlers
+"""
+import os
+import logging
+from celery.signals import worker_init, worker_process_shutdown
+
+logger = logging.getLogger(__name__)
+
+
+@worker_init.connect
+def start_metrics_server(**kwargs):
+    """Expose worker metrics from the main process (before children fork)"""
+    from app.services.metrics import reset_multiprocess_dir, start_worker_server
+    from config.settings import METRICS_WORKER_PORT
+
+    try:
+        reset_multiprocess_dir()
+        start_worker_server(METRICS_WORKER_PORT)
+    except OSError as e:
+        logger.error(f"Could not start worker metrics server: {e}")
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    """Stop counting an exiting child's live gauges"""
+    from app.services.metrics import mark_process_dead
+
+    mark_process_dead(pid or os.getpid())
@@ -2,16 +2,122 @@
 Celery tasks for async scraping operations
 """
 import logging
+import random
 import time
 from datetime import datetime
 from celery import Task
+from celery.exceptions import Ignore
 from celery_app.celery_config import celery_app
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Seconds between the scrapes queued by one scrape_multiple_profiles_task
+BATCH_STAGGER = 5
+
+# Seconds the write-behind writer lock lasts; renewed before every chunk
+WRITER_LOCK_TIMEOUT = 300
+
+
+class RateLimited(Exception):
+    """Raised inside the driver block so the driver is released before re-queueing"""
+
+    def __init__(self, wait, scope):
+        super().__init__(f"rate limited by the {scope} bucket for {wait:.1f}s")
+        self.wait = wait
+        self.scope = scope
+
+
+# Retry budget per error class (see scraper_service.ERROR_*):
+# (max retries, base delay, max delay) in seconds
+RETRY_POLICY = {
+    'transient': (4, 15, 600),        # network hiccups, timeouts
+    'driver': (3, 5, 120),            # driver evicted, a fresh one is ready soon
+    'rate_limited': (3, 300, 3600),   # X throttling: back off hard
+    'empty_timeline': (1, 300, 300),  # maybe a bad render, one late look
+    'auth_wall': (0, 0, 0),           # needs a new login, retrying cannot help
+    'unknown': (1, 60, 60),
+}
+
+
+def retry_delay(error_class, retries_by_class):
+    """
+    Seconds before the next attempt after an error of this class, or None
+    when its retry budget is spent. Exponential backoff with equal jitter:
+    half the capped delay is fixed, the other half random, so profiles that
+    failed together do not retry together.
+    """
+    max_retries, base, cap = RETRY_POLICY.get(error_class, RETRY_POLICY['unknown'])
+    attempt = retries_by_class.get(error_class, 0)
+    if attempt >= max_retries:
+        return None
+
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class ProgressReporter:
+    """
+    Progress callback for TwitterScraperService that turns reports into
+    update_state calls, coalesced: the state is written on every phase
+    change and at most once every `interval` seconds within a phase.
+    """
+
+    # (percent when the phase starts, status); scroll fills up to 'extract'
+    PHASES = {
+        'initializing': (0, 'Initializing scraper for'),
+        'acquire': (5, 'Acquiring driver for'),
+        'navigate': (10, 'Loading'),
+        'initial_wait': (15, 'Waiting for tweets of'),
+        'scroll': (20, 'Scrolling'),
+        'extract': (80, 'Extracting tweets of'),
+        'persist': (90, 'Saving tweets of'),
+    }
+
+    def __init__(self, task, username, interval):
+        self.task = task
+        self.username = username
+        self.interval = interval
+        self.phase = None
+        self.last_write = 0.0
+        self.writes = 0
+        self.skipped = 0
+
+    def __call__(self, phase, tweets=None, iteration=None, iterations=None):
+        now = time.monotonic()
+        if phase == self.phase and now - self.last_write < self.interval:
+            self.skipped += 1
+            return
+
+        current, label = self.PHASES.get(phase, (0, phase))
+        status = f'{label} @{self.username}'
+        if phase == 'scroll' and iterations:
+            span = self.PHASES['extract'][0] - current
+            current += span * min(iteration or 0, iterations) // iterations
+            status += f' (scroll {iteration or 0}/{iterations})'
+        if tweets is not None:
+            status += f', {tweets} tweets'
+
+        try:
+            self.task.update_state(
+                state='PROGRESS',
+                meta={
+                    'current': current,
+                    'total': 100,
+                    'status': status,
+                    'phase': phase,
+                    'tweets': tweets,
+                    'iteration': iteration
+                }
+            )
+        except Exception as e:
+            # Progress is best effort, it must not fail the scrape
+            logger.warning(f"Could not report progress of @{self.username}: {e}")
+        self.phase = phase
+        self.last_write = now
+        self.writes += 1
+
+
 class ScraperTask(Task):
     """Base task with error handling and driver management"""
 
@@ -33,113 +139,299 @@ class ScraperTask(Task):
     base=ScraperTask,
     bind=True,
     name='celery_app.tasks.scrape_profile_task',
-    max_retries=3,
-    default_retry_delay=60
+    max_retries=None  # budgets are per error class, see RETRY_POLICY
 )
-def scrape_profile_task(self, username, max_tweets=100):
+def scrape_profile_task(self, username, max_tweets=100, retries_by_class=None):
     """
     Scrape a single Twitter/X profile asynchronously.
 
     Args:
         username: Twitter username to scrape
         max_tweets: Maximum number of tweets to scrape
+        retries_by_class: Retries already spent per error class (set by retries)
 
     Returns:
         dict: Scraping results with status, tweets_found, tweets_new
+              and error_class
     """
-    from app.services.scraper_service import TwitterScraperService
+    from app.services.scraper_service import TwitterScraperService, classify_error, ERROR_DRIVER
     from app.services.driver_pool import get_driver_pool
-    from config.settings import DRIVER_POOL_SIZE, HEADLESS, CHROME_PROFILE_DIR
+    from app.services import metrics, rate_limit
+    from config.settings import (
+        DRIVER_POOL_SIZE, HEADLESS, CHROME_PROFILE_DIR,
+        CHROME_PROFILE_TEMPLATE_DIR, CHROME_PROFILE_TEMPLATE_MAX_AGE,
+        POOL_STATS_HEARTBEAT, WRITE_BEHIND, SCRAPE_PROGRESS_INTERVAL
+    )
 
     logger.info(f"Starting scrape task for @{username}")
-
-    # Update task state to show progress
-    self.update_state(
-        state='PROGRESS',
-        meta={
-            'current': 0,
-            'total': 100,
-            'status': f'Initializing scraper for @{username}...'
-        }
-    )
+    started = time.perf_counter()
+    progress = ProgressReporter(self, username, SCRAPE_PROGRESS_INTERVAL)
+    progress('initializing')
 
     try:
         # Get driver pool
         driver_pool = get_driver_pool(
             pool_size=DRIVER_POOL_SIZE,
             headless=HEADLESS,
-            profile_dir=str(CHROME_PROFILE_DIR)
-        )
-
-        # Update state
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'current': 10,
-                'total': 100,
-                'status': f'Acquiring driver from pool...'
-            }
+            profile_dir=str(CHROME_PROFILE_DIR),
+            template_dir=str(CHROME_PROFILE_TEMPLATE_DIR),
+            template_max_age=CHROME_PROFILE_TEMPLATE_MAX_AGE,
+            stats_heartbeat=POOL_STATS_HEARTBEAT
         )
 
         # Acquire driver from pool
+        progress('acquire')
         with driver_pool.acquire(timeout=60) as driver:
             logger.info(f"Acquired driver for @{username}")
 
-            # Update state
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    'current': 20,
-                    'total': 100,
-                    'status': f'Scraping @{username}...'
-                }
-            )
+            # Global, per-session and per-profile buckets, all or nothing
+            wait, scope = rate_limit.acquire(username, getattr(driver, 'rate_limit_session', None))
+            if wait:
+                raise RateLimited(wait, scope)
 
             # Create scraper instance with this driver
             scraper = TwitterScraperService(driver=driver)
 
-            # Scrape profile
-            result = scraper.scrape_profile(username, max_tweets=max_tweets)
-
-            # Update state
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    'current': 90,
-                    'total': 100,
-                    'status': f'Finalizing scrape for @{username}...'
-                }
-            )
+            # Scrape profile (write-behind: only the browser work, the
+            # batch is saved by persist_batches_task)
+            if WRITE_BEHIND:
+                result = queue_batch(scraper.collect_profile(username, max_tweets=max_tweets, progress=progress))
+            else:
+                result = scraper.scrape_profile(username, max_tweets=max_tweets, progress=progress)
 
             logger.info(f"Scrape completed for @{username}: {result}")
+            logger.debug(f"Progress of @{username}: {progress.writes} state writes, {progress.skipped} coalesced")
+
+            # Dead session: replace the driver instead of returning it to the pool
+            if result.get('error_class') == ERROR_DRIVER:
+                driver_pool.evict(driver)
 
             # Return result
-            return {
+            task_result = {
                 'status': result.get('status', 'unknown'),
                 'username': username,
                 'tweets_found': result.get('tweets_found', 0),
                 'tweets_new': result.get('tweets_new', 0),
+                'persistence': result.get('persistence', 'done'),
                 'message': result.get('message', ''),
+                'metrics': result.get('metrics', {}),
+                'error_class': result.get('error_class'),
                 'completed_at': datetime.now().isoformat()
             }
 
+    except RateLimited as limited:
+        metrics.observe_scrape({'status': 'deferred'}, time.perf_counter() - started)
+        return defer(self, username, limited)
+
     except Exception as exc:
         logger.error(f"Error scraping @{username}: {exc}", exc_info=True)
 
-        # Retry on certain errors
-        if 'timeout' in str(exc).lower() or 'connection' in str(exc).lower():
-            raise self.retry(exc=exc)
-
         # Return error result
-        return {
+        task_result = {
             'status': 'error',
             'username': username,
             'tweets_found': 0,
             'tweets_new': 0,
             'message': str(exc),
+            'error_class': classify_error(exc),
             'completed_at': datetime.now().isoformat()
         }
 
+    # Retried outside the try block, so Retry is not handled as a scrape error
+    if task_result['status'] == 'error':
+        return retry_or_fail(self, username, task_result, retries_by_class or {}, started)
+
+    metrics.observe_scrape(task_result, time.perf_counter() - started)
+    return task_result
+
+
+def retry_or_fail(task, username, task_result, retries_by_class, started):
+    """
+    Retry a failed scrape within the budget of its error class, or return
+    the error result once it is spent.
+
+    Eager runs (task_always_eager) cannot be re-queued and get a
+    'retrying' result with the delay and the updated counts instead,
+    like defer().
+    """
+    from app.services import metrics
+
+    error_class = task_result['error_class'] or 'unknown'
+    delay = retry_delay(error_class, retries_by_class)
+    if delay is None:
+        metrics.SCRAPE_ERRORS.labels(error_class=error_class, action='failed').inc()
+        metrics.observe_scrape(task_result, time.perf_counter() - started)
+        return task_result
+
+    retries_by_class = dict(retries_by_class, **{error_class: retries_by_class.get(error_class, 0) + 1})
+    metrics.SCRAPE_ERRORS.labels(error_class=error_class, action='retried').inc()
+    metrics.observe_scrape({'status': 'retry'}, time.perf_counter() - started)
+    logger.warning(f"@{username} failed ({error_class}), retry "
+                   f"{retries_by_class[error_class]} of this class in {delay:.1f}s")
+
+    if task.request.is_eager:
+        return dict(task_result, status='retrying', retry_in=delay, retries_by_class=retries_by_class)
+
+    kwargs = dict(task.request.kwargs or {}, retries_by_class=retries_by_class)
+    raise task.retry(args=task.request.args, kwargs=kwargs, countdown=delay,
+                     exc=RuntimeError(f"{error_class}: {task_result['message']}"))
+
+
+def defer(task, username, limited):
+    """
+    Re-queue a rate-limited scrape (same task id and arguments) for the
+    moment its buckets have a token again. Nothing is retried or failed:
+    pollers keep seeing PROGRESS until it runs.
+
+    The worker never sleeps on the limiter, however long the wait: it
+    only schedules the next run. Eager runs (task_always_eager) cannot be
+    re-queued and get a 'rate_limited' result with the delay instead.
+    """
+    from app.services import rate_limit
+
+    countdown = rate_limit.countdown(limited.wait)
+    logger.info(f"@{username} {limited}, re-queued in {countdown:.1f}s")
+
+    if task.request.is_eager:
+        return {'status': 'rate_limited', 'username': username, 'retry_in': countdown,
+                'message': str(limited), 'completed_at': datetime.now().isoformat()}
+
+    task.update_state(
+        state='PROGRESS',
+        meta={
+            'current': 0,
+            'total': 100,
+            'status': f'Rate limited ({limited.scope}), @{username} starts in {countdown:.0f}s'
+        }
+    )
+    task.apply_async(args=task.request.args, kwargs=task.request.kwargs,
+                     task_id=task.request.id, countdown=countdown)
+    raise Ignore()
+
+
+def queue_batch(batch):
+    """
+    Hand a collected batch to the write-behind writer.
+    Falls back to a direct write if Redis is unavailable.
+
+    Returns:
+        dict: scrape result ('tweets_new' is unknown until the batch is written)
+    """
+    from app.services import write_behind
+    from app.services.scraper_service import TwitterScraperService
+
+    if not batch['log']:
+        return {'status': 'error', 'message': batch['message'], 'metrics': batch['metrics'],
+                'error_class': batch['error_class']}
+
+    try:
+        write_behind.enqueue(batch)
+        persist_batches_task.delay()
+    except Exception as e:
+        logger.warning(f"Write-behind queue unavailable, saving @{batch['username']} directly: {e}")
+        return TwitterScraperService().persist_batches([batch])[0]
+
+    return {
+        'status': batch['status'],
+        'tweets_found': batch['tweets_found'],
+        'tweets_new': None,
+        'persistence': 'queued',
+        'message': batch['message'],
+        'metrics': batch['metrics'],
+        'error_class': batch['error_class']
+    }
+
+
+@celery_app.task(
+    bind=True,
+    name='celery_app.tasks.persist_batches_task',
+    ignore_result=True,
+    autoretry_for=(Exception,),  # batches stay queued; retry the drain
+    retry_backoff=True,
+    max_retries=5
+)
+def persist_batches_task(self):
+    """
+    Write-behind writer: save every queued batch, many per transaction.
+
+    Several of these messages pile up while a write is in progress; the
+    first one drains the whole queue and the rest find it empty. A Redis
+    lock keeps writers serialized even if the persistence queue is
+    consumed with concurrency > 1.
+
+    On the last retry a failing group is written one batch at a time and
+    the batches that still fail go to the dead-letter list, so the queue
+    keeps moving. If none of them can be written the failure is not the
+    batches' own (database down or locked): the task fails and they stay
+    queued for the next writer.
+    """
+    from app.services import write_behind
+    from app.services.redis_client import get_redis
+    from app.services.scraper_service import TwitterScraperService
+    from config.settings import WRITE_BEHIND_MAX_BATCHES
+
+    with get_redis().lock('persistence:writer', timeout=WRITER_LOCK_TIMEOUT,
+                          blocking_timeout=WRITER_LOCK_TIMEOUT) as lock:
+        scraper = None
+        while True:
+            # A fresh timeout per chunk: the drain is unbounded, and a lock
+            # that expired mid-drain would let a second writer re-write and
+            # ack the same batches. Raises LockNotOwnedError if it was lost.
+            lock.reacquire()
+            batches = write_behind.peek(WRITE_BEHIND_MAX_BATCHES)
+            if not batches:
+                break
+
+            scraper = scraper or TwitterScraperService()
+            try:
+                write_batches(scraper, batches)
+            except Exception:
+                if self.request.retries < self.max_retries:
+                    raise
+                write_one_by_one(scraper, batches)
+
+
+def write_batches(scraper, batches, skip=0):
+    """
+    Save batches in one transaction and drop them from the queue; skip
+    oldest queued batches are not among them and stay queued.
+    """
+    from app.services import write_behind, metrics
+
+    started = time.perf_counter()
+    results = scraper.persist_batches(batches)
+    elapsed = time.perf_counter() - started
+    write_behind.ack(len(batches), skip=skip)
+
+    metrics.observe_write(batches, elapsed)
+    tweets_new = sum(r.get('tweets_new') or 0 for r in results)
+    logger.info(f"Wrote {len(batches)} batches ({tweets_new} new tweets) in {elapsed:.3f}s")
+
+
+def write_one_by_one(scraper, batches):
+    """
+    Last attempt: isolate the failing batches and dead-letter them, but
+    only if some other batch wrote; when all fail, re-raise and keep them.
+    """
+    from app.services import write_behind, metrics
+
+    failed = []  # (batch, error), still at the head of the queue
+    for batch in batches:
+        try:
+            write_batches(scraper, [batch], skip=len(failed))
+        except Exception as e:
+            failed.append((batch, e))
+
+    if len(failed) == len(batches):
+        logger.error(f"None of {len(batches)} batches could be written, leaving them queued")
+        raise failed[-1][1]
+
+    for batch, e in failed:
+        logger.error(f"Batch of @{batch['username']} failed every write retry, "
+                     f"moved to {write_behind.DEAD_LETTER_KEY}: {e}", exc_info=e)
+        write_behind.dead_letter(batch, e)
+        metrics.PERSIST_DEAD_LETTERS.inc()
+
 
 @celery_app.task(
     base=ScraperTask,
@@ -148,62 +440,74 @@ def scrape_profile_task(self, username, max_tweets=100):
 )
 def scrape_multiple_profiles_task(self, usernames, max_tweets=100):
     """
-    Scrape multiple profiles sequentially.
+    Queue one scrape_profile_task per profile, staggered by BATCH_STAGGER
+    seconds. Nothing waits in here: each child defers itself when rate
+    limited and retries with its own countdown, so a long wait never holds
+    a worker slot or runs into the task time limit.
 
     Args:
         usernames: List of Twitter usernames
         max_tweets: Max tweets per profile
 
     Returns:
-        dict: Results for all profiles
+        dict: profile count and {username: child task id}; each child's
+        result is stored under its own id
     """
-    logger.info(f"Starting batch scrape for {len(usernames)} profiles")
-
-    results = []
-    total = len(usernames)
+    logger.info(f"Queueing batch scrape for {len(usernames)} profiles")
 
+    children = {}
     for idx, username in enumerate(usernames):
-        # Update progress
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'current': idx,
-                'total': total,
-                'status': f'Scraping @{username} ({idx+1}/{total})...'
-            }
-        )
-
-        # Scrape this profile
-        result = scrape_profile_task.apply(args=[username, max_tweets])
-        results.append(result.get())
-
-        # Small delay between profiles
-        if idx < total - 1:
-            time.sleep(5)
+        child = scrape_profile_task.apply_async(args=[username, max_tweets], countdown=idx * BATCH_STAGGER)
+        children[username] = child.id
 
     return {
-        'status': 'completed',
-        'total_profiles': total,
-        'results': results,
-        'completed_at': datetime.now().isoformat()
+        'status': 'queued',
+        'total_profiles': len(usernames),
+        'children': children,
+        'queued_at': datetime.now().isoformat()
     }
 
 
 @celery_app.task(name='celery_app.tasks.cleanup_old_tasks')
 def cleanup_old_tasks():
     """
-    Periodic task to clean up old task results from Redis.
-    Run this daily via celery beat.
+    Periodic task (celery beat) that sweeps the result backend: stale
+    celery-task-meta-* keys are deleted or given a TTL, in SCAN batches.
+    Only the Redis result backend is swept, and only when results expire.
     """
-    from celery.result import AsyncResult
-    from celery_app.celery_config import celery_app
-
-    logger.info("Running cleanup of old task results")
-
-    # This would iterate through old task IDs and forget them
-    # Implementation depends on your task tracking strategy
+    from celery.backends.redis import RedisBackend
+    from app.services import result_janitor
+    from config.settings import RESULT_JANITOR_BATCH
+
+    backend = celery_app.backend
+    if not isinstance(backend, RedisBackend):
+        logger.info(f"Result cleanup skipped: {type(backend).__name__} is not a Redis backend")
+        return {'status': 'cleanup_skipped', 'timestamp': datetime.now().isoformat()}
+
+    # result_expires in seconds; 0 or None means results never expire
+    max_age = backend.expires
+    if not max_age:
+        logger.info("Result cleanup skipped: result_expires is 0, results are kept forever")
+        return {'status': 'cleanup_skipped', 'timestamp': datetime.now().isoformat()}
+
+    prefix = backend.task_keyprefix  # includes the global key prefix, if any
+    if isinstance(prefix, bytes):
+        prefix = prefix.decode()
+
+    started = time.perf_counter()
+    stats = result_janitor.sweep(
+        backend.client,
+        prefix=prefix,
+        max_age=max_age,
+        batch_size=RESULT_JANITOR_BATCH
+    )
+    logger.info(
+        f"Result cleanup: {stats['scanned']} keys scanned, {stats['deleted']} deleted "
+        f"({stats['reclaimed_bytes'] / 1024:.1f} KiB reclaimed), {stats['expired']} given a TTL "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
 
-    return {'status': 'cleanup_completed', 'timestamp': datetime.now().isoformat()}
+    return dict(stats, status='cleanup_completed', timestamp=datetime.now().isoformat())
 
 
 @celery_app.task(name='celery_app.tasks.health_check')
@@ -216,3 +520,24 @@ def health_check():
         'timestamp': datetime.now().isoformat(),
         'worker': 'celery'
     }
+
+
+@celery_app.task(
+    bind=True,
+    name='celery_app.tasks.collect_cluster_status',
+    ignore_result=True
+)
+def collect_cluster_status(self):
+    """
+    Periodic task (celery beat) that snapshots worker health and task
+    queues into Redis, so /api/health and /monitoring never block on
+    a broadcast to the workers.
+    """
+    from app.services import cluster_status
+    from config.settings import CLUSTER_STATUS_INTERVAL
+
+    status = cluster_status.collect(celery_app, hostname=self.request.hostname)
+    status['health'] = dict(health_check(), worker=self.request.hostname)
+
+    cluster_status.store(status, ttl=CLUSTER_STATUS_INTERVAL * 4)
+    logger.debug(f"Cluster status collected: {len(status['workers'])} workers")
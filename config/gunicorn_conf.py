@@ -0,0 +1,57 @@
+"""
+Gunicorn settings for the web tier
+
+    gunicorn -c config/gunicorn_conf.py wsgi:app
+
+Worker processes (WEB_WORKERS) with a thread pool each (WEB_THREADS), so a
+slow request ties up one thread instead of the whole server. Set
+PROMETHEUS_MULTIPROC_DIR so /metrics aggregates all workers.
+"""
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Loaded by path: make the project importable and read .env like run.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+from config.settings import (
+    FLASK_HOST, FLASK_PORT, LOG_LEVEL,
+    WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT, WEB_GRACEFUL_TIMEOUT, WEB_MAX_REQUESTS
+)
+
+bind = f"{FLASK_HOST}:{FLASK_PORT}"
+workers = WEB_WORKERS
+threads = WEB_THREADS
+worker_class = 'gthread'
+timeout = WEB_TIMEOUT
+graceful_timeout = WEB_GRACEFUL_TIMEOUT
+keepalive = 5
+
+# Recycle workers now and then; the jitter keeps them from restarting together
+max_requests = WEB_MAX_REQUESTS
+max_requests_jitter = WEB_MAX_REQUESTS // 10
+
+# No preload: each worker opens its own storage and Redis connections
+preload_app = False
+
+accesslog = '-'
+loglevel = LOG_LEVEL.lower()
+
+
+def on_starting(server):
+    from app.services import metrics
+    metrics.reset_multiprocess_dir()
+
+
+def worker_exit(server, worker):
+    """Graceful shutdown: close the worker's browsers, if it ever started any"""
+    driver_pool = sys.modules.get('app.services.driver_pool')
+    if driver_pool is not None:
+        driver_pool.shutdown_driver_pool()
+
+
+def child_exit(server, worker):
+    from app.services import metrics
+    metrics.mark_process_dead(worker.pid)
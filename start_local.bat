@@ -56,6 +56,12 @@ start "Celery Worker" cmd /k "celery -A celery_app.celery_config worker --loglev
 timeout /t 3 /nobreak >nul
 echo.
 
+REM Start Celery beat
+echo Starting Celery beat...
+start "Celery Beat" cmd /k "celery -A celery_app.celery_config beat --loglevel=info"
+timeout /t 2 /nobreak >nul
+echo.
+
 REM Start Flower
 echo [4/4] Starting Flower monitoring...
 start "Flower" cmd /k "celery -A celery_app.celery_config flower --port=5555"
@@ -58,6 +58,15 @@ gnome-terminal -- bash -c "source venv/bin/activate 2>/dev/null; celery -A celer
 
 sleep 2
 
+# Start Celery beat (periodic health/queue snapshots)
+echo "Starting Celery beat..."
+gnome-terminal -- bash -c "source venv/bin/activate 2>/dev/null; celery -A celery_app.celery_config beat --loglevel=info; exec bash" 2>/dev/null || \
+    osascript -e 'tell app "Terminal" to do script "cd '$(pwd)' && celery -A celery_app.celery_config beat --loglevel=info"' 2>/dev/null || \
+    start cmd /k "celery -A celery_app.celery_config beat --loglevel=info" 2>/dev/null || \
+    echo "⚠️  Please start Celery beat manually: celery -A celery_app.celery_config beat --loglevel=info"
+
+sleep 2
+
 # Start Flower (optional)
 echo "Starting Flower monitoring dashboard..."
 gnome-terminal -- bash -c "source venv/bin/activate 2>/dev/null; celery -A celery_app.celery_config flower --port=5555; exec bash" 2>/dev/null || \
@@ -73,6 +73,11 @@ echo      Iniciando Celery Worker...
 start "Celery Worker" cmd /k "title Celery Worker && color 0E && python -m celery -A celery_app.celery_config worker --loglevel=info --pool=solo --concurrency=3"
 timeout /t 3 /nobreak >nul
 
+REM Iniciar Celery Beat (snapshots de salud y colas)
+echo      Iniciando Celery Beat...
+start "Celery Beat" cmd /k "title Celery Beat && color 0B && python -m celery -A celery_app.celery_config beat --loglevel=info"
+timeout /t 2 /nobreak >nul
+
 REM Iniciar Flower (opcional)
 echo      Iniciando Flower (monitor)...
 start "Flower Monitor" cmd /k "title Flower Monitor && color 0D && python -m celery -A celery_app.celery_config flower --port=5555"
@@ -0,0 +1,14 @@
+"""
+Test settings: in-memory Celery transport, no metrics server, a throwaway
+SQLite database. Set before config.settings is first imported.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('CELERY_BROKER_URL', 'memory://')
+os.environ.setdefault('CELERY_RESULT_BACKEND', 'cache+memory://')
+os.environ.setdefault('ENABLE_METRICS', 'False')
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(prefix='tests_'), 'test.db'))
@@ -0,0 +1,121 @@
+"""
+DriverPool keeps the x.com login across releases and only snapshots
+logged-in profiles into the golden template; per-process profiles are
+only deleted once a template holds the login
+"""
+import os
+import socket
+from queue import Queue
+from threading import Event, Lock
+
+import pytest
+
+from app.services.driver_pool import DriverPool
+from benchmarks.fake_driver import FakeWebDriver
+
+
+def cookie(name, **extra):
+    return dict({'name': name, 'value': f'{name}-value', 'domain': '.x.com', 'path': '/',
+                 'secure': True, 'httpOnly': True, 'expires': 1900000000, 'session': False,
+                 'size': 10, 'priority': 'Medium'}, **extra)
+
+
+class StubTemplate:
+    def __init__(self, seeded=True, stale=True):
+        self.seeded = seeded
+        self.stale = stale
+        self.refreshed_from = []
+
+    def exists(self):
+        return self.seeded
+
+    def is_stale(self):
+        return self.stale
+
+    def refresh_from(self, profile_path):
+        self.refreshed_from.append(profile_path)
+        self.seeded = True
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = DriverPool.__new__(DriverPool)
+    pool.pool_size = 2
+    pool.profile_dir = str(tmp_path)
+    pool.namespace = 'test'
+    pool.template = StubTemplate()
+    pool.drivers = Queue()
+    pool.lock = Lock()
+    pool.active_count = pool.total_created = pool.total_acquired = pool.total_released = 0
+    pool.stats_heartbeat = None
+    pool._stop_heartbeat = Event()
+    pool._observe = lambda: None
+    for driver_id in range(pool.pool_size):
+        os.makedirs(pool._profile_path(driver_id))
+    return pool
+
+
+def make_driver(driver_id, *cookies):
+    driver = FakeWebDriver({})
+    driver.driver_id = driver_id
+    driver.cookies = list(cookies)
+    return driver
+
+
+def test_release_keeps_auth_cookies(pool):
+    driver = make_driver(0, cookie('auth_token'), cookie('ct0'), cookie('guest_id'),
+                         cookie('personalization_id', session=True))
+
+    pool.release_driver(driver)
+
+    assert sorted(c['name'] for c in driver.cookies) == ['auth_token', 'ct0']
+    assert driver.cookies[0]['value'] == 'auth_token-value'
+    assert 'size' not in driver.cookies[0]  # only fields setCookies accepts
+    assert driver.current_url == 'about:blank'
+
+
+def test_template_refreshed_only_from_logged_in_driver(pool, monkeypatch):
+    pool.drivers.put(make_driver(0, cookie('guest_id')))
+    pool.drivers.put(make_driver(1, cookie('auth_token')))
+    monkeypatch.setattr('app.services.metrics.observe_pool', lambda stats: None)
+
+    pool.shutdown()
+
+    assert pool.template.refreshed_from == [pool._profile_path(1)]
+
+
+def test_template_kept_when_no_driver_is_logged_in(pool, monkeypatch):
+    pool.drivers.put(make_driver(0, cookie('guest_id')))
+    monkeypatch.setattr('app.services.metrics.observe_pool', lambda stats: None)
+
+    pool.shutdown()
+
+    assert pool.template.refreshed_from == []
+
+
+def test_empty_template_is_seeded_from_logged_in_driver(pool, monkeypatch):
+    pool.template = StubTemplate(seeded=False, stale=False)
+    pool.drivers.put(make_driver(0, cookie('auth_token')))
+    monkeypatch.setattr('app.services.metrics.observe_pool', lambda stats: None)
+
+    pool.shutdown()
+
+    assert pool.template.refreshed_from == [pool._profile_path(0)]
+    assert not os.path.exists(os.path.join(pool.profile_dir, pool.namespace))
+
+
+def test_profiles_kept_while_no_template_is_seeded(pool, monkeypatch):
+    pool.template = StubTemplate(seeded=False, stale=False)
+    pool.drivers.put(make_driver(0, cookie('guest_id')))
+    monkeypatch.setattr('app.services.metrics.observe_pool', lambda stats: None)
+
+    pool.shutdown()
+
+    assert pool.template.refreshed_from == []
+    assert os.path.isdir(pool._profile_path(0))
+
+    # Not pruned as stale by the next process either
+    stale = os.path.join(pool.profile_dir, f'{socket.gethostname()}_999999')
+    os.makedirs(stale)
+    pool._prune_stale_namespaces()
+    assert os.path.isdir(stale)
@@ -0,0 +1,54 @@
+"""
+/api/health and the memoized fleet snapshot (app/services/pool_stats.py)
+"""
+import time
+
+import pytest
+from redis.exceptions import ConnectionError
+
+fakeredis = pytest.importorskip('fakeredis')
+
+from app import create_app
+from app.services import cluster_status, pool_stats
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(pool_stats, '_local', {'expires': 0.0, 'fleet': None})
+    status = {'collected_at': time.time(), 'workers': ['celery@w1'], 'health': {'celery@w1': 'ok'}}
+    monkeypatch.setattr(cluster_status, 'get_status', lambda: (status, 0.5))
+    return create_app().test_client()
+
+
+def publish(namespace, available):
+    stats = {'namespace': namespace, 'pool_size': 3, 'available': available, 'active': 3 - available,
+             'total_created': 3, 'total_acquired': 0, 'total_released': 0}
+    pool_stats.publish(stats, ttl=60)
+
+
+def test_fleet_is_read_once_per_ttl(monkeypatch):
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(pool_stats, 'get_redis', lambda: redis)
+    monkeypatch.setattr(pool_stats, '_local', {'expires': 0.0, 'fleet': None})
+
+    publish('w1', available=2)
+    assert pool_stats.get_fleet()['available'] == 2
+
+    publish('w1', available=0)
+    assert pool_stats.get_fleet()['available'] == 2
+
+    pool_stats._local['expires'] = 0.0
+    assert pool_stats.get_fleet()['available'] == 0
+
+
+def test_health_survives_redis_errors_in_fleet(client, monkeypatch):
+    def down():
+        raise ConnectionError('Connection refused')
+    monkeypatch.setattr(pool_stats, 'read_fleet', down)
+
+    response = client.get('/api/health')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['status'] == 'healthy'
+    assert body['driver_pool'] == {'status': 'unavailable', 'error': 'Connection refused'}
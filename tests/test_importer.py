@@ -0,0 +1,45 @@
+"""
+Bulk importer (app/services/importer.py): re-importing a source only
+marks the profiles that gained tweets as changed
+"""
+import json
+
+import pytest
+
+from app.services.importer import Importer
+from app.storage.sqlite import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(tmp_path / 'import.db')
+    storage.init_schema()
+    return storage
+
+
+def write_ndjson(path, tweets):
+    path.write_text(''.join(json.dumps(tweet) + '\n' for tweet in tweets), encoding='utf-8')
+    return str(path)
+
+
+def last_change_seq(storage):
+    with storage.transaction() as conn:
+        return dict(conn.execute("SELECT username, last_change_seq FROM profiles").fetchall())
+
+
+def test_duplicates_do_not_mark_profile_changed(storage, tmp_path):
+    alice = [{'tweet_id': 100 + i, 'username': 'alice', 'text': f'tweet {i}'} for i in range(3)]
+    first = write_ndjson(tmp_path / 'first.ndjson', alice)
+    second = write_ndjson(tmp_path / 'second.ndjson',
+                          alice + [{'tweet_id': 200, 'username': 'bob', 'text': 'new'}])
+
+    Importer(storage, progress=False).run([first])
+    before = last_change_seq(storage)
+
+    summary = Importer(storage, progress=False).run([second])
+    after = last_change_seq(storage)
+
+    assert summary['inserted'] == 1
+    assert summary['skipped'] == 3
+    assert after['alice'] == before['alice']
+    assert after['bob'] is not None
@@ -0,0 +1,72 @@
+"""
+Rate-limited scrapes are re-queued, never waited out inside a worker
+"""
+import time
+from contextlib import contextmanager
+
+import pytest
+from celery.exceptions import Ignore
+
+from celery_app import tasks
+from config.settings import CELERY_TASK_TIME_LIMIT
+
+
+class StubPool:
+    @contextmanager
+    def acquire(self, timeout=None):
+        yield None
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    def sleep(seconds):
+        raise AssertionError(f"worker slept {seconds}s")
+    monkeypatch.setattr(time, 'sleep', sleep)
+
+
+def test_wait_longer_than_time_limit_is_deferred(monkeypatch, no_sleep):
+    from app.services import driver_pool, rate_limit
+
+    wait = CELERY_TASK_TIME_LIMIT * 3
+    monkeypatch.setattr(driver_pool, 'get_driver_pool', lambda *args, **kwargs: StubPool())
+    monkeypatch.setattr(rate_limit, 'acquire', lambda username, session=None: (wait, 'profile'))
+
+    queued = []
+    task = tasks.scrape_profile_task
+    monkeypatch.setattr(task, 'update_state', lambda *args, **kwargs: None)
+    monkeypatch.setattr(task, 'apply_async', lambda *args, **kwargs: queued.append(kwargs))
+
+    task.push_request(id='task-1', args=['someone', 20], kwargs={}, is_eager=False)
+    try:
+        started = time.perf_counter()
+        with pytest.raises(Ignore):
+            task.run('someone', 20)
+        assert time.perf_counter() - started < 5
+    finally:
+        task.pop_request()
+
+    assert len(queued) == 1
+    assert queued[0]['task_id'] == 'task-1'
+    assert queued[0]['args'] == ['someone', 20]
+    assert queued[0]['countdown'] >= wait
+
+
+def test_batch_hands_profiles_to_their_own_tasks(monkeypatch, no_sleep):
+    queued = []
+
+    class Result:
+        def __init__(self, id):
+            self.id = id
+
+    def apply_async(args=None, kwargs=None, **options):
+        queued.append((args, options))
+        return Result(f'child-{len(queued)}')
+
+    monkeypatch.setattr(tasks.scrape_profile_task, 'apply_async', apply_async)
+
+    result = tasks.scrape_multiple_profiles_task.run(['a', 'b', 'c'], 20)
+
+    assert result['status'] == 'queued'
+    assert result['children'] == {'a': 'child-1', 'b': 'child-2', 'c': 'child-3'}
+    assert [args for args, _ in queued] == [['a', 20], ['b', 20], ['c', 20]]
+    assert [options['countdown'] for _, options in queued] == [0, tasks.BATCH_STAGGER, 2 * tasks.BATCH_STAGGER]
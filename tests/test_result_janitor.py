@@ -0,0 +1,88 @@
+"""
+Result backend janitor (app/services/result_janitor.py, cleanup_old_tasks)
+"""
+import json
+import types
+from datetime import datetime, timedelta
+
+import pytest
+
+fakeredis = pytest.importorskip('fakeredis')
+
+from app.services import result_janitor
+from celery_app import tasks
+
+PREFIX = 'celery-task-meta-'
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis()
+
+
+def store(client, task_id, status, age=None, ttl=None):
+    """A result as Celery writes it; non-ready states have date_done None"""
+    date_done = (datetime.utcnow() - timedelta(seconds=age)).isoformat() if age is not None else None
+    value = json.dumps({'status': status, 'result': None, 'traceback': None,
+                        'children': [], 'date_done': date_done, 'task_id': task_id})
+    client.set(f'{PREFIX}{task_id}', value, ex=ttl)
+
+
+def test_old_results_without_ttl_are_deleted(client):
+    store(client, 'old', 'SUCCESS', age=7200)
+    store(client, 'young', 'SUCCESS', age=600)
+    store(client, 'long', 'SUCCESS', age=10, ttl=86400)
+    client.set('other', 'kept')
+
+    stats = result_janitor.sweep(client, PREFIX, max_age=3600, batch_size=2)
+
+    assert stats['scanned'] == 3
+    assert stats['deleted'] == 1
+    assert stats['reclaimed_bytes'] > 0
+    assert not client.exists(f'{PREFIX}old')
+    assert 2990 <= client.ttl(f'{PREFIX}young') <= 3001
+    assert client.ttl(f'{PREFIX}long') == 3600
+    assert client.get('other') == b'kept'
+
+
+def test_zero_max_age_is_rejected(client):
+    with pytest.raises(ValueError):
+        result_janitor.sweep(client, PREFIX, max_age=0)
+
+
+def test_cleanup_skipped_when_results_never_expire(monkeypatch, client):
+    from celery.backends.redis import RedisBackend
+
+    backend = RedisBackend(app=tasks.celery_app, url='redis://localhost:6379/0', expires=0)
+    backend.__dict__['client'] = client
+    monkeypatch.setattr(tasks, 'celery_app', types.SimpleNamespace(backend=backend))
+    store(client, 'kept', 'SUCCESS', age=10 ** 6)
+
+    result = tasks.cleanup_old_tasks.run()
+
+    assert result['status'] == 'cleanup_skipped'
+    assert client.exists(f'{PREFIX}kept')
+
+
+def test_tasks_in_flight_are_kept(client):
+    # ProgressReporter writes PROGRESS with date_done None, possibly without a TTL
+    store(client, 'scraping', 'PROGRESS')
+    store(client, 'started', 'STARTED')
+    store(client, 'failed', 'FAILURE', age=7200)
+
+    stats = result_janitor.sweep(client, PREFIX, max_age=3600)
+
+    assert stats['deleted'] == 1
+    assert client.exists(f'{PREFIX}scraping')
+    assert client.ttl(f'{PREFIX}scraping') == -1
+    assert client.exists(f'{PREFIX}started')
+    assert not client.exists(f'{PREFIX}failed')
+
+
+def test_unreadable_results_are_kept(client):
+    client.set(f'{PREFIX}junk', 'not json')
+
+    stats = result_janitor.sweep(client, PREFIX, max_age=3600)
+
+    assert stats['deleted'] == 0
+    assert client.exists(f'{PREFIX}junk')
@@ -0,0 +1,25 @@
+"""
+The web process sends tasks by name and never imports the worker code
+"""
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import sys, json
+from app import create_app
+from celery_app.client import get_celery_app
+create_app()
+get_celery_app()
+print(json.dumps({name: name in sys.modules for name in ('celery_app.tasks', 'selenium')}))
+"""
+
+
+def test_create_app_and_celery_client_do_not_load_tasks():
+    output = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=dict(os.environ),
+                            check=True, capture_output=True, text=True)
+    loaded = json.loads(output.stdout.strip().splitlines()[-1])
+    assert loaded == {'celery_app.tasks': False, 'selenium': False}
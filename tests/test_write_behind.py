@@ -0,0 +1,133 @@
+"""
+Write-behind writer (persist_batches_task) with a batch that always fails
+and with a database that is down
+"""
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip('fakeredis')
+
+from app.services import redis_client, scraper_service, write_behind
+from celery_app import tasks
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_client, 'get_redis', lambda: client)
+    monkeypatch.setattr(write_behind, 'get_redis', lambda: client)
+    return client
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """
+    Usernames saved by the stub scraper; a 'poison' batch always raises,
+    and every write does while TwitterScraperService.down is set
+    """
+    saved = []
+
+    class StubScraper:
+        down = False
+
+        def persist_batches(self, batches):
+            if StubScraper.down:
+                raise RuntimeError('database is locked')
+            if any(batch['username'] == 'poison' for batch in batches):
+                raise ValueError('constraint failed')
+            saved.extend(batch['username'] for batch in batches)
+            return [{'status': 'success', 'tweets_new': 1} for _ in batches]
+
+    monkeypatch.setattr(scraper_service, 'TwitterScraperService', StubScraper)
+    return saved
+
+
+def queue(*usernames):
+    for username in usernames:
+        write_behind.enqueue({'username': username, 'status': 'success', 'tweets': []})
+
+
+def run_writer(retries):
+    task = tasks.persist_batches_task
+    task.push_request(retries=retries)
+    try:
+        task.run()
+    finally:
+        task.pop_request()
+
+
+def test_poison_batch_is_retried_while_retries_remain(redis, written):
+    queue('a', 'poison', 'b')
+
+    with pytest.raises(ValueError):
+        run_writer(retries=0)
+
+    assert write_behind.pending() == 3
+    assert written == []
+
+
+def test_poison_batch_is_dead_lettered_on_last_retry(redis, written):
+    queue('a', 'poison', 'b')
+
+    run_writer(retries=tasks.persist_batches_task.max_retries)
+
+    assert written == ['a', 'b']
+    assert write_behind.pending() == 0
+    assert write_behind.dead_letters() == 1
+    dead = json.loads(redis.lindex(write_behind.DEAD_LETTER_KEY, 0))
+    assert dead['username'] == 'poison'
+    assert 'constraint failed' in dead['error']
+
+    # The queue keeps moving afterwards
+    queue('c')
+    run_writer(retries=0)
+    assert written == ['a', 'b', 'c']
+
+
+def test_poison_batch_at_the_head_is_dead_lettered(redis, written):
+    queue('poison', 'a', 'b')
+
+    run_writer(retries=tasks.persist_batches_task.max_retries)
+
+    assert written == ['a', 'b']
+    assert write_behind.pending() == 0
+    assert json.loads(redis.lindex(write_behind.DEAD_LETTER_KEY, 0))['username'] == 'poison'
+
+
+def test_database_down_for_every_retry_keeps_the_queue(redis, written):
+    queue('a', 'b', 'c')
+    scraper_service.TwitterScraperService.down = True
+
+    for retries in range(tasks.persist_batches_task.max_retries + 1):
+        with pytest.raises(RuntimeError):
+            run_writer(retries=retries)
+
+    assert write_behind.pending() == 3
+    assert write_behind.dead_letters() == 0
+
+    scraper_service.TwitterScraperService.down = False
+    run_writer(retries=0)
+    assert written == ['a', 'b', 'c']
+    assert write_behind.pending() == 0
+
+
+def test_writer_lock_is_renewed_every_chunk(redis, monkeypatch):
+    """Each chunk starts with the full lock timeout, however long the drain runs"""
+    monkeypatch.setattr('config.settings.WRITE_BEHIND_MAX_BATCHES', 1)
+    ttls = []
+
+    class SlowScraper:
+        def persist_batches(self, batches):
+            ttls.append(redis.pttl('persistence:writer'))
+            redis.pexpire('persistence:writer', 1000)  # most of the timeout spent
+            return [{'status': 'success', 'tweets_new': 0} for _ in batches]
+
+    monkeypatch.setattr(scraper_service, 'TwitterScraperService', SlowScraper)
+    queue('a', 'b', 'c')
+
+    run_writer(retries=0)
+
+    assert write_behind.pending() == 0
+    assert len(ttls) == 3
+    assert all(ttl > 1000 for ttl in ttls)
@@ -0,0 +1,28 @@
+"""
+WSGI entry point for production servers
+
+    gunicorn -c config/gunicorn_conf.py wsgi:app
+
+run.py starts the Flask development server instead (single process,
+for local use).
+"""
+import logging
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from app import create_app
+from config.settings import LOG_LEVEL
+
+# Configure logging
+logging.basicConfig(
+    level=getattr(logging, LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(process)d - %(message)s',
+    handlers=[
+        logging.FileHandler('logs/app.log'),
+        logging.StreamHandler()
+    ]
+)
+
+app = create_app()